@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks for Metsuke's core and TUI on seeded synthetic plans.
+
+Run `python -m benchmarks --help` from the repository root; see
+`benchmarks.run` for the measured operations and the results format.
+"""
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Seeded generator of synthetic plans.
+
+The same arguments always produce the same plans, so benchmark results of
+different commits measure the same input. Dependencies only point to
+earlier tasks (plans are acyclic) and mostly to recent ones, giving chains
+like real backlogs rather than one wide layer.
+"""
+
+import random
+from pathlib import Path
+from typing import List, Optional
+
+from src.metsuke.core import DEFAULT_PLAN_FILENAME, PLANS_DIR_NAME, save_plan
+from src.metsuke.models import Project, ProjectMeta, Task
+
+STATUSES = ("Done", "in_progress", "pending", "blocked")
+STATUS_WEIGHTS = (0.4, 0.1, 0.45, 0.05)
+PRIORITIES = ("high", "medium", "low")
+PRIORITY_WEIGHTS = (0.2, 0.5, 0.3)
+# Dependencies are drawn from this many preceding tasks
+DEPENDENCY_WINDOW = 50
+
+_WORDS = (
+    "parse", "plan", "task", "schema", "cache", "render", "load", "merge", "index", "queue",
+    "worker", "table", "widget", "status", "focus", "export", "import", "archive", "lease",
+    "validate", "repair", "module", "config", "test", "release", "handler", "event", "panel",
+)
+
+
+def _description(rng: random.Random, chars: int) -> Optional[str]:
+    """Markdown of about `chars` characters: a heading, a list and a paragraph."""
+    if chars <= 0:
+        return None
+    lines = [f"**Plan:** {rng.choice(_WORDS)} the {rng.choice(_WORDS)}"]
+    length = len(lines[0])
+    step = 1
+    while length < chars:
+        words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(4, 12)))
+        line = f"{step}. {words.capitalize()}." if step <= 5 else words.capitalize() + "."
+        lines.append(line)
+        length += len(line) + 1
+        step += 1
+    return "\n".join(lines)
+
+
+def generate_plan(task_count: int, seed: int = 0, dependency_density: float = 0.3,
+                  max_dependencies: int = 3, description_chars: int = 200,
+                  name: str = "Synthetic") -> Project:
+    """Builds a plan of `task_count` tasks.
+
+    `dependency_density` is the share of tasks with dependencies (1 to
+    `max_dependencies` each); `description_chars` the approximate length of
+    every description (0 for none).
+    """
+    rng = random.Random(f"{seed}:{name}")
+    tasks: List[Task] = []
+    for task_id in range(1, task_count + 1):
+        dependencies: List[int] = []
+        if task_id > 1 and rng.random() < dependency_density:
+            low = max(1, task_id - DEPENDENCY_WINDOW)
+            count = min(rng.randint(1, max_dependencies), task_id - low)
+            dependencies = sorted(rng.sample(range(low, task_id), count))
+        tasks.append(Task(
+            id=task_id,
+            title=f"{rng.choice(_WORDS).capitalize()} {rng.choice(_WORDS)} {task_id}",
+            description=_description(rng, description_chars),
+            status=rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+            priority=rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0],
+            dependencies=dependencies,
+        ))
+    return Project(
+        project=ProjectMeta(name=name, version="0.1.0"),
+        context=f"Synthetic plan with {task_count} tasks (seed {seed}).",
+        tasks=tasks,
+    )
+
+
+def write_plans(directory: Path, plan_count: int, task_count: int, seed: int = 0,
+                dependency_density: float = 0.3, max_dependencies: int = 3,
+                description_chars: int = 200) -> List[Path]:
+    """Writes plans as Metsuke would lay them out and returns their paths.
+
+    One plan is written to `directory/PROJECT_PLAN.yaml`, several to
+    `directory/plans/PROJECT_PLAN_<n>.yaml`; the first one has focus.
+    """
+    if plan_count == 1:
+        paths = [directory / DEFAULT_PLAN_FILENAME]
+    else:
+        paths = [directory / PLANS_DIR_NAME / f"PROJECT_PLAN_{n}.yaml" for n in range(plan_count)]
+    for n, path in enumerate(paths):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        plan = generate_plan(task_count, seed, dependency_density, max_dependencies, description_chars,
+                             name=f"Synthetic {n}")
+        plan.focus = n == 0
+        if not save_plan(plan, path):
+            raise RuntimeError(f"Could not write synthetic plan {path}")
+    return paths
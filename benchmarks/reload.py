@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""File-change-to-repaint latency harness: `python -m benchmarks.reload [options]`.
+
+Runs the TUI headless (Textual's `run_test` pilot) on a synthetic plan and,
+from a writer thread, rewrites the plan file in bursts: `--burst-size` saves
+`--burst-gap` seconds apart, one burst every `--interval` seconds. A burst
+of one is a steady edit rate; larger bursts look like editors that save
+several times in a row. `--save-style atomic` replaces the file with a
+renamed temp file (as Metsuke itself saves), `inplace` truncates and
+rewrites it (so the watcher may see a half-written file).
+
+Every save bumps a revision number in the first task's title. The app is
+instrumented to record, for each reload that updates the table, the
+revision shown and when the reload reached `handle_file_change`, when
+`update_ui` finished and when the next frame was drawn. The report gives:
+
+* latency from each save to the first repaint showing that revision or a
+  later one, overall and per stage (watch, debounce and dispatch; reload
+  and table update; repaint);
+* `superseded`: saves never shown themselves because a later one was;
+* `lost`: saves after the last repaint, i.e. the table ended up stale;
+* `duplicate`: repaints of a revision that was already on screen;
+* `failed`: reloads that could not parse the file (partial writes);
+* `unchanged`: file events that did not reload (the file matched the plan).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.metsuke.core import DEFAULT_PLAN_FILENAME, save_plan
+from src.metsuke.tui.app import TaskViewer
+
+from .generator import generate_plan
+
+# Fixed width, so every revision of the file has the same size
+REVISION_PLACEHOLDER = "rev-000000"
+_REVISION_PATTERN = re.compile(r"rev-(\d{6})")
+SAVE_STYLES = ("atomic", "inplace")
+
+
+@dataclass
+class Repaint:
+    """One reload that updated the task table (times from `time.perf_counter`)."""
+
+    revision: Optional[int]  # None if the file could not be loaded
+    handled: float
+    updated: float
+    repainted: Optional[float] = None
+
+
+def plan_template(task_count: int, seed: int, description_chars: int) -> str:
+    """Plan YAML whose first task title holds `REVISION_PLACEHOLDER`."""
+    plan = generate_plan(task_count, seed, description_chars=description_chars, name="Reload probe")
+    plan.tasks[0].title = f"Reload probe {REVISION_PLACEHOLDER}"
+    plan.focus = True
+    with tempfile.TemporaryDirectory(prefix="metsuke-reload-") as tmp:
+        path = Path(tmp) / DEFAULT_PLAN_FILENAME
+        if not save_plan(plan, path):
+            raise RuntimeError("Could not render the probe plan")
+        return path.read_text(encoding="utf-8")
+
+
+def render_revision(template: str, revision: int) -> bytes:
+    return template.replace(REVISION_PLACEHOLDER, f"rev-{revision:06d}").encode("utf-8")
+
+
+def write_revision(path: Path, data: bytes, style: str) -> None:
+    if style == "atomic":
+        temp = path.with_name(f".{path.name}.tmp")
+        temp.write_bytes(data)
+        os.replace(temp, path)
+    else:
+        with open(path, "wb") as handle:
+            handle.write(data)
+
+
+class ProbeViewer(TaskViewer):
+    """TaskViewer recording a `Repaint` for every reload that updates the UI."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.repaints: List[Repaint] = []
+        self.file_changes = 0
+        self._handling: Optional[float] = None
+
+    def handle_file_change(self, event_type: str, path: Path) -> None:
+        self.file_changes += 1
+        self._handling = time.perf_counter()
+        try:
+            super().handle_file_change(event_type, path)
+        finally:
+            self._handling = None
+
+    def update_ui(self) -> None:
+        super().update_ui()
+        if self._handling is None:
+            return
+        repaint = Repaint(self.displayed_revision(), self._handling, time.perf_counter())
+        self.repaints.append(repaint)
+        self.call_after_refresh(self._repainted, repaint)
+
+    def _repainted(self, repaint: Repaint) -> None:
+        repaint.repainted = time.perf_counter()
+
+    def displayed_revision(self) -> Optional[int]:
+        plan = self.all_plans.get(self.current_plan_path)
+        if plan is None or not plan.tasks:
+            return None
+        match = _REVISION_PATTERN.search(plan.tasks[0].title)
+        return int(match.group(1)) if match else None
+
+
+def _distribution(seconds: List[float]) -> Dict[str, float]:
+    if not seconds:
+        return {"count": 0}
+    ordered = sorted(seconds)
+
+    def rank(percent: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p90_ms": round(rank(90) * 1000, 3),
+        "p99_ms": round(rank(99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def analyze(writes: List[Tuple[int, float]], repaints: List[Repaint],
+            file_changes: int) -> Dict[str, Any]:
+    """Latency distributions and reload counts from the writer's `(revision, time)`
+    records and the app's repaints (see module docstring)."""
+    shown = [r for r in repaints if r.revision is not None and r.repainted is not None]
+    write_times = dict(writes)
+
+    latencies: List[float] = []
+    lost = 0
+    for revision, written in writes:
+        # First repaint after the save that shows it or a newer revision
+        first = next((r for r in shown if r.revision >= revision and r.repainted >= written), None)
+        if first is None:
+            lost += 1
+        else:
+            latencies.append(first.repainted - written)
+
+    stages: Dict[str, List[float]] = {"watch": [], "reload": [], "repaint": []}
+    duplicate = 0
+    seen = set()
+    for repaint in shown:
+        if repaint.revision in seen:
+            duplicate += 1
+            continue
+        seen.add(repaint.revision)
+        written = write_times.get(repaint.revision)
+        if written is None:
+            continue
+        stages["watch"].append(repaint.handled - written)
+        stages["reload"].append(repaint.updated - repaint.handled)
+        stages["repaint"].append(repaint.repainted - repaint.updated)
+
+    return {
+        "writes": len(writes),
+        "repaints": len(repaints),
+        "superseded": len([rev for rev, _ in writes if rev not in seen]) - lost,
+        "lost": lost,
+        "duplicate": duplicate,
+        "failed": len([r for r in repaints if r.revision is None]),
+        "unchanged": max(0, file_changes - len(repaints)),
+        "latency": _distribution(latencies),
+        "stages": {name: _distribution(values) for name, values in stages.items()},
+    }
+
+
+def _write_bursts(path: Path, template: str, bursts: int, burst_size: int, burst_gap: float,
+                  interval: float, style: str, writes: List[Tuple[int, float]]) -> None:
+    revision = 0
+    for _ in range(bursts):
+        burst_start = time.perf_counter()
+        for n in range(burst_size):
+            revision += 1
+            data = render_revision(template, revision)
+            if n:
+                time.sleep(burst_gap)
+            writes.append((revision, time.perf_counter()))
+            write_revision(path, data, style)
+        time.sleep(max(0.0, interval - (time.perf_counter() - burst_start)))
+
+
+async def _run(path: Path, workdir: Path, template: str, bursts: int, burst_size: int,
+               burst_gap: float, interval: float, style: str, settle: float) -> Dict[str, Any]:
+    app = ProbeViewer([path], snapshot_path=workdir / "tui_snapshot.json")
+    writes: List[Tuple[int, float]] = []
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        async with app.run_test(size=(160, 50)) as pilot:
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            # The watcher starts once the initial load has finished
+            while app.observer is None:
+                await asyncio.sleep(0.05)
+            writer = threading.Thread(
+                target=_write_bursts,
+                args=(path, template, bursts, burst_size, burst_gap, interval, style, writes),
+                daemon=True,
+            )
+            writer.start()
+            while writer.is_alive():
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(settle)
+            await pilot.pause()
+    finally:
+        os.chdir(previous)
+    return analyze(writes, app.repaints, app.file_changes)
+
+
+def run(task_count: int, bursts: int, burst_size: int, burst_gap: float, interval: float,
+        style: str, settle: float, seed: int = 0, description_chars: int = 200) -> Dict[str, Any]:
+    """Runs the harness once and returns the parameters and `analyze` report."""
+    template = plan_template(task_count, seed, description_chars)
+    with tempfile.TemporaryDirectory(prefix="metsuke-reload-") as tmp:
+        workdir = Path(tmp)
+        path = workdir / DEFAULT_PLAN_FILENAME
+        path.write_bytes(render_revision(template, 0))
+        report = asyncio.run(_run(path, workdir, template, bursts, burst_size, burst_gap,
+                                  interval, style, settle))
+    return {
+        "parameters": {
+            "tasks": task_count, "bursts": bursts, "burst_size": burst_size,
+            "burst_gap": burst_gap, "interval": interval, "save_style": style,
+            "settle": settle, "seed": seed, "description_chars": description_chars,
+        },
+        "report": report,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> List[str]:
+    lines = [
+        "writes {writes}, repaints {repaints}, superseded {superseded}, lost {lost}, "
+        "duplicate {duplicate}, failed {failed}, unchanged {unchanged}".format(**report)
+    ]
+    rows = [("save -> repaint", report["latency"])]
+    rows += [(f"  {name}", stats) for name, stats in report["stages"].items()]
+    for label, stats in rows:
+        if not stats["count"]:
+            lines.append(f"{label:<16} (no samples)")
+            continue
+        lines.append(
+            f"{label:<16} n={stats['count']:<4} p50 {stats['p50_ms']:>9.2f} ms  "
+            f"p90 {stats['p90_ms']:>9.2f} ms  p99 {stats['p99_ms']:>9.2f} ms  max {stats['max_ms']:>9.2f} ms"
+        )
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.reload", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=1000, help="Tasks in the plan (default: %(default)s).")
+    parser.add_argument("--bursts", type=int, default=10, help="Number of bursts (default: %(default)s).")
+    parser.add_argument("--burst-size", type=int, default=1, help="Saves per burst (default: %(default)s).")
+    parser.add_argument("--burst-gap", type=float, default=0.05,
+                        help="Seconds between saves in a burst (default: %(default)s).")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="Seconds from one burst to the next (default: %(default)s).")
+    parser.add_argument("--save-style", choices=SAVE_STYLES, default="atomic",
+                        help="How the plan is rewritten (default: %(default)s).")
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="Seconds to wait for reloads after the last save (default: %(default)s).")
+    parser.add_argument("--description-chars", type=int, default=200,
+                        help="Approximate description length (default: %(default)s).")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed (default: %(default)s).")
+    parser.add_argument("--output", type=Path, default=None, help="Also write the results as JSON.")
+    args = parser.parse_args(argv)
+
+    document = run(args.tasks, args.bursts, args.burst_size, args.burst_gap, args.interval,
+                   args.save_style, args.settle, seed=args.seed, description_chars=args.description_chars)
+    if args.output is not None:
+        args.output.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    print("\n".join(format_report(document["report"])))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""Benchmark runner: `python -m benchmarks [options]` from the repository root.
+
+For every plan size it writes synthetic plans (see `benchmarks.generator`)
+into a temporary directory and measures:
+
+* core: `load_plans` (full and lazy descriptions), `save_plan`,
+  `repair_yaml_file` (on a copy with invalid statuses), `manage_focus`
+  (switching the focus plan, which saves two files), the `update-plan`
+  command, and `TaskTable.dependency_metrics` (the dashboard's
+  dependency metrics);
+* TUI, through Textual's headless `run_test` pilot: `update_ui` with the
+  plan's view model cached and rebuilt, and the Ctrl+S status toggle from
+  key press to the next frame.
+
+Results are written as JSON (median, min and max seconds per operation and
+size, plus the commit and parameters); `--compare OLD.json` prints the
+change of every median against an earlier run.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from click.testing import CliRunner
+
+from src.metsuke.cli import update_plan
+from src.metsuke.core import load_plans, manage_focus, repair_yaml_file, save_plan
+from src.metsuke.table import TaskTable
+
+from .generator import write_plans
+
+DEFAULT_SIZES = (10, 1_000, 10_000)
+RESULTS_VERSION = 1
+# Tasks whose status is made invalid before each repair run
+REPAIR_CORRUPTIONS = 20
+
+Results = Dict[str, Dict[str, Dict[str, float]]]
+
+
+def measure(operation: Callable[[], Any], repeat: int,
+            setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """Times `operation` `repeat` times, running the untimed `setup` before each."""
+    durations: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        operation()
+        durations.append(time.perf_counter() - start)
+    return {
+        "repeat": repeat,
+        "median_s": statistics.median(durations),
+        "min_s": min(durations),
+        "max_s": max(durations),
+    }
+
+
+@contextmanager
+def _working_directory(path: Path) -> Iterator[None]:
+    previous = Path.cwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _corrupt(source: bytes, count: int) -> bytes:
+    """Replaces the first `count` pending statuses with an invalid one."""
+    return source.replace(b"status: pending", b"status: todo", count)
+
+
+def bench_core(paths: List[Path], workdir: Path, repeat: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    results["load_plans"] = measure(lambda: load_plans(paths), repeat)
+    results["load_plans_lazy"] = measure(lambda: load_plans(paths, lazy_descriptions=True), repeat)
+
+    plan = load_plans([paths[0]])[paths[0]]
+    results["save_plan"] = measure(lambda: save_plan(plan, paths[0]), repeat)
+    results["dependency_metrics"] = measure(
+        lambda: TaskTable.from_project(plan).dependency_metrics(), repeat
+    )
+
+    broken = workdir / "repair" / paths[0].name
+    broken.parent.mkdir(exist_ok=True)
+    corrupted = _corrupt(paths[0].read_bytes(), REPAIR_CORRUPTIONS)
+    results["repair_yaml_file"] = measure(
+        lambda: repair_yaml_file(broken), repeat, setup=lambda: broken.write_bytes(corrupted)
+    )
+
+    loaded = load_plans(paths)
+    targets = iter(paths[(n + 1) % len(paths)] for n in range(repeat))
+    results["manage_focus"] = measure(lambda: manage_focus(loaded, next(targets)), repeat)
+
+    target = paths[0].parent if len(paths) > 1 else paths[0]
+    runner = CliRunner()
+
+    def run_update_plan() -> None:
+        result = runner.invoke(update_plan, [str(target)])
+        if result.exit_code != 0:
+            raise RuntimeError(f"update-plan failed: {result.output}")
+
+    with _working_directory(workdir):
+        results["update_plan"] = measure(run_update_plan, repeat)
+    return results
+
+
+async def _bench_tui(paths: List[Path], workdir: Path, repeat: int) -> Dict[str, Dict[str, float]]:
+    # Imported here so core benchmarks run without the TUI dependencies
+    from src.metsuke.tui.app import TaskViewer
+
+    results: Dict[str, Dict[str, float]] = {}
+    with _working_directory(workdir):
+        app = TaskViewer(paths, snapshot_path=workdir / "tui_snapshot.json")
+        async with app.run_test(size=(160, 50)) as pilot:
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            results["tui_update_ui"] = measure(app.update_ui, repeat)
+
+            def drop_view_model() -> None:
+                app.all_plans[app.current_plan_path].invalidate_cache()
+
+            results["tui_update_ui_uncached"] = measure(app.update_ui, repeat, setup=drop_view_model)
+
+            durations: List[float] = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                await pilot.press("ctrl+s")
+                await pilot.pause()
+                durations.append(time.perf_counter() - start)
+            results["tui_toggle_status"] = {
+                "repeat": repeat,
+                "median_s": statistics.median(durations),
+                "min_s": min(durations),
+                "max_s": max(durations),
+            }
+            await app.workers.wait_for_complete()
+    return results
+
+
+def bench_tui(paths: List[Path], workdir: Path, repeat: int) -> Dict[str, Dict[str, float]]:
+    return asyncio.run(_bench_tui(paths, workdir, repeat))
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: List[int], plan_count: int, dependency_density: float, description_chars: int,
+        repeat: int, seed: int, include_tui: bool = True,
+        progress: Callable[[str], None] = lambda message: None) -> Dict[str, Any]:
+    """Runs every benchmark for every size and returns the results document."""
+    results: Results = {}
+    with tempfile.TemporaryDirectory(prefix="metsuke-bench-") as tmp:
+        for size in sizes:
+            workdir = Path(tmp) / f"tasks-{size}"
+            workdir.mkdir()
+            progress(f"Generating {plan_count} plan(s) of {size} tasks...")
+            paths = write_plans(workdir, plan_count, size, seed=seed,
+                                dependency_density=dependency_density,
+                                description_chars=description_chars)
+            progress(f"Benchmarking {size} tasks...")
+            results[str(size)] = bench_core(paths, workdir, repeat)
+            if include_tui:
+                results[str(size)].update(bench_tui(paths, workdir, repeat))
+    return {
+        "version": RESULTS_VERSION,
+        "commit": _git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "sizes": sizes, "plans": plan_count, "dependency_density": dependency_density,
+            "description_chars": description_chars, "repeat": repeat, "seed": seed,
+            "tui": include_tui,
+        },
+        "results": results,
+    }
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """One line per operation and size: old and new median and the change."""
+    lines = []
+    if old.get("parameters") != new["parameters"]:
+        lines.append(f"Note: parameters differ (old: {old.get('parameters')}, new: {new['parameters']})")
+    lines.append(f"{'size':>8}  {'operation':<24} {'old (ms)':>10} {'new (ms)':>10} {'change':>8}")
+    for size, operations in new["results"].items():
+        for name, stats in operations.items():
+            before = old.get("results", {}).get(size, {}).get(name)
+            after_ms = stats["median_s"] * 1000
+            if before is None:
+                lines.append(f"{size:>8}  {name:<24} {'-':>10} {after_ms:>10.2f} {'new':>8}")
+                continue
+            before_ms = before["median_s"] * 1000
+            change = (after_ms / before_ms - 1) * 100 if before_ms else 0.0
+            lines.append(f"{size:>8}  {name:<24} {before_ms:>10.2f} {after_ms:>10.2f} {change:>+7.1f}%")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated task counts per plan (default: %(default)s).")
+    parser.add_argument("--plans", type=int, default=3, help="Plans per size (default: %(default)s).")
+    parser.add_argument("--dependency-density", type=float, default=0.3,
+                        help="Share of tasks with dependencies (default: %(default)s).")
+    parser.add_argument("--description-chars", type=int, default=200,
+                        help="Approximate description length, 0 for none (default: %(default)s).")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per operation (default: %(default)s).")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed (default: %(default)s).")
+    parser.add_argument("--no-tui", action="store_true", help="Skip the TUI benchmarks.")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Results file (default: benchmark-<commit>.json).")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier results file to compare with.")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    document = run(sizes, args.plans, args.dependency_density, args.description_chars, args.repeat,
+                   args.seed, include_tui=not args.no_tui,
+                   progress=lambda message: print(message, file=sys.stderr))
+    output = args.output or Path(f"benchmark-{document['commit'] or 'local'}.json")
+    output.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.compare is not None:
+        old = json.loads(args.compare.read_text(encoding="utf-8"))
+        print("\n".join(compare(old, document)))
+    else:
+        for size, operations in document["results"].items():
+            for name, stats in operations.items():
+                print(f"{size:>8}  {name:<24} {stats['median_s'] * 1000:>10.2f} ms")
+    return 0
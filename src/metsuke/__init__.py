@@ -9,19 +9,25 @@ __version__ = "0.1.1"
 
 # Expose core functionalities and models
 from .core import find_plan_files, load_plans, save_plan, manage_focus
-from .models import Project, ProjectMeta, Task
-from .exceptions import MetsukeError, PlanLoadingError, PlanValidationError
+from .models import Estimate, Project, ProjectMeta, Task
+from .reachability import ReachabilityIndex
+from .session import PlanSession
+from .exceptions import MetsukeError, PlanLoadingError, PlanValidationError, PlanConflictError
 
 __all__ = [
     "find_plan_files",
     "load_plans",
     "save_plan",
     "manage_focus",
+    "PlanSession",
+    "ReachabilityIndex",
     "Project",
     "ProjectMeta",
     "Task",
+    "Estimate",
     "MetsukeError",
     "PlanLoadingError",
     "PlanValidationError",
+    "PlanConflictError",
     "__version__",
 ] 
\ No newline at end of file
@@ -6,12 +6,15 @@ from pathlib import Path
 from typing import Optional
 
 # Import commands from cli.py
-from .cli import show_info, list_tasks, run_tui, init, add_plan, update_plan, repair
+from .profiling import CommandProfile, default_profile_dir
+from .cli import show_info, list_tasks, run_tui, init, add_plan, update_plan, repair, stats, critical_path_cmd, forecast_cmd, deps, claim, heartbeat, release, apply, import_cmd, export, archive, diagnostics, validate
 
 @click.group()
 @click.version_option()
 @click.option('--plan', 'plan_path_option', type=click.Path(exists=False, path_type=Path), default=None, help='Specify a plan file or directory.')
-def main(plan_path_option: Optional[Path]):
+@click.option('--profile', is_flag=True, help='Profile the command and write .pstats and .collapsed (flamegraph) files to .metsuke/profiles/.')
+@click.pass_context
+def main(ctx: click.Context, plan_path_option: Optional[Path], profile: bool):
     """Metsuke: Manage project plans for robust AI collaboration.
 
     This CLI helps manage project plans stored in YAML files (like
@@ -22,7 +25,15 @@ def main(plan_path_option: Optional[Path]):
     Use `metsuke init` to create a starting plan file.
     Use `metsuke tui` to launch the interactive interface.
     """
-    pass
+    if profile:
+        command_profile = CommandProfile(default_profile_dir(Path.cwd()), ctx.invoked_subcommand or "metsuke")
+
+        def write_profile() -> None:
+            for path in command_profile.stop():
+                click.echo(f"Profile written to {path}", err=True)
+
+        command_profile.start()
+        ctx.call_on_close(write_profile)
 
 # Add commands to the main group
 main.add_command(show_info)
@@ -32,6 +43,19 @@ main.add_command(init)
 main.add_command(add_plan)
 main.add_command(update_plan)
 main.add_command(repair)
+main.add_command(stats)
+main.add_command(critical_path_cmd)
+main.add_command(forecast_cmd)
+main.add_command(deps)
+main.add_command(claim)
+main.add_command(heartbeat)
+main.add_command(release)
+main.add_command(apply)
+main.add_command(import_cmd)
+main.add_command(export)
+main.add_command(archive)
+main.add_command(diagnostics)
+main.add_command(validate)
 
 if __name__ == "__main__":
     main() # pragma: no cover 
\ No newline at end of file
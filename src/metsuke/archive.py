@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Moving finished tasks out of hot plans into compressed archive files.
+
+`archive_done_tasks` moves every Done task that no open task depends on into
+a gzip or lzma compressed JSON Lines file next to the plan, and records
+`task id -> archive file name` in the plan's `archived` map. Dependencies on
+archived tasks count as Done (see `TaskTable.archived_ids`), and the full
+task is read back from its archive only when asked for
+(`load_archived_task`).
+"""
+
+import gzip
+import json
+import lzma
+import os
+import tempfile
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .core import save_plan
+from .exceptions import MetsukeError
+from .models import Project, Task
+
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_LZMA = "lzma"
+COMPRESSIONS = {COMPRESSION_GZIP: ".jsonl.gz", COMPRESSION_LZMA: ".jsonl.xz"}
+_OPENERS = {".gz": gzip.open, ".xz": lzma.open}
+
+
+def archivable_ids(project: Project) -> List[int]:
+    """Ids of Done tasks that no unfinished task depends on."""
+    needed = {dep for task in project.tasks if task.status != "Done" for dep in task.dependencies}
+    return [task.id for task in project.tasks if task.status == "Done" and task.id not in needed]
+
+
+def _new_archive_path(plan_path: Path, compression: str) -> Path:
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    suffix = COMPRESSIONS[compression]
+    path = plan_path.with_name(f"{plan_path.stem}.archive.{stamp}{suffix}")
+    counter = 1
+    while path.exists():
+        counter += 1
+        path = plan_path.with_name(f"{plan_path.stem}.archive.{stamp}_{counter}{suffix}")
+    return path
+
+
+def _write_archive(path: Path, tasks: List[Task]) -> None:
+    opener = _OPENERS[path.suffix]
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    os.close(fd)
+    try:
+        with opener(tmp_name, "wt", encoding="utf-8") as f:
+            for task in tasks:
+                row = task.model_dump(mode="json", exclude_none=True)
+                # exclude_none drops a lazy description before it is read
+                description = task.description
+                if description is not None:
+                    row["description"] = description
+                f.write(json.dumps(row, ensure_ascii=False))
+                f.write("\n")
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def archive_done_tasks(plan_path: Path, project: Project,
+                       compression: str = COMPRESSION_GZIP) -> Tuple[Optional[Path], List[int]]:
+    """Moves archivable tasks of `project` into a new archive file and saves the plan.
+
+    Returns the archive path (None if there was nothing to archive) and the
+    archived ids. The archive is written before the plan, and removed again
+    if the plan cannot be saved, so no task is ever lost.
+    """
+    ids = set(archivable_ids(project))
+    if not ids:
+        return None, []
+
+    archive_path = _new_archive_path(plan_path, compression)
+    _write_archive(archive_path, [task for task in project.tasks if task.id in ids])
+
+    project.tasks = [task for task in project.tasks if task.id not in ids]
+    project.archived = {**project.archived, **{task_id: archive_path.name for task_id in sorted(ids)}}
+    project.invalidate_cache()
+    if not save_plan(project, plan_path):
+        archive_path.unlink()
+        raise MetsukeError(f"Could not save {plan_path.name}; nothing was archived (see log)")
+    return archive_path, sorted(ids)
+
+
+@lru_cache(maxsize=8)
+def _read_archive(path: str, mtime: float) -> Dict[int, Task]:
+    """All tasks of one archive file; cached per file version."""
+    tasks: Dict[int, Task] = {}
+    with _OPENERS[Path(path).suffix](path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                task = Task.model_validate_json(line)
+                tasks[task.id] = task
+    return tasks
+
+
+def load_archived_task(plan_path: Path, project: Project, task_id: int) -> Optional[Task]:
+    """Reads one archived task from its archive file, or None if it is not archived.
+
+    Raises `MetsukeError` if the archive file is missing or unreadable.
+    """
+    name = project.archived.get(task_id)
+    if name is None:
+        return None
+    path = plan_path.parent / name
+    try:
+        return _read_archive(str(path), path.stat().st_mtime).get(task_id)
+    except (OSError, EOFError, lzma.LZMAError, ValueError) as e:
+        raise MetsukeError(f"Could not read archived task {task_id} from {name}: {e}") from e
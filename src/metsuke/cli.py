@@ -5,7 +5,7 @@ import click
 import sys
 import os
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List
 import importlib.util
 import toml
 import yaml
@@ -13,13 +13,29 @@ import yaml
 from ruamel.yaml import YAML
 import logging
 import io
+import time
+import json
+import tracemalloc
 
 # Import core functions and exceptions
-from .core import find_plan_files, load_plans, manage_focus, save_plan, repair_yaml_file, PLANS_DIR_NAME, PLAN_FILE_PATTERN, DEFAULT_PLAN_FILENAME
+from .core import find_plan_files, load_plans, manage_focus, save_plan, repair_yaml_file, plan_lock, PLANS_DIR_NAME, PLAN_FILE_PATTERN, DEFAULT_PLAN_FILENAME
 from .exceptions import PlanLoadingError, PlanValidationError
 from .models import Project, ProjectMeta, Task
+from .table import TaskTable
+from .schedule import critical_path, forecast, WEIGHTS, WEIGHT_TASKS, WEIGHT_TIME, WEIGHT_ESTIMATE, DEFAULT_PERCENTILES
+from .exceptions import MetsukeError
+from .reachability import ReachabilityIndex
+from .leases import LeaseStore, DEFAULT_LEASE_TTL
+from .session import PlanSession
+from .operations import apply_operations
+from .streaming import validate_plan_stream, DEFAULT_MAX_ISSUES
+from .salvage import salvage_plan
+from .exporter import export_plans, FORMATS as EXPORT_FORMATS, DEFAULT_CHUNK_SIZE as EXPORT_CHUNK_SIZE
+from .archive import archivable_ids, archive_done_tasks, load_archived_task, COMPRESSIONS, COMPRESSION_GZIP
+from .importer import import_tasks, existing_outputs, FORMATS as IMPORT_FORMATS, IMPORT_FIELDS
 # Import the template from core
-from .core import collaboration_guide_template
+from .core import collaboration_guide_template, _atomic_write
+from . import memory, timing
 
 # Need ValidationError for checking updated schema
 from pydantic import ValidationError
@@ -157,6 +173,639 @@ def list_tasks(ctx):
         sys.exit(1)
 
 
+def _echo_table_stats(table: TaskTable) -> None:
+    """Prints counts, progress and dependency metrics for a TaskTable."""
+    status_counts = table.status_counts()
+    priority_counts = table.priority_counts()
+    click.echo(f"Tasks: {len(table)}")
+    click.echo(
+        f"Progress: {status_counts.get('Done', 0)}/{len(table)} ({table.progress_percent():.1f}%)"
+    )
+    click.echo(
+        "Status: "
+        + " | ".join(f"{status}: {status_counts.get(status, 0)}" for status in ("Done", "in_progress", "pending", "blocked"))
+    )
+    click.echo(
+        "Priority: "
+        + " | ".join(f"{priority}: {priority_counts.get(priority, 0)}" for priority in ("high", "medium", "low"))
+    )
+    metrics = table.dependency_metrics()
+    if not metrics:
+        return
+    click.echo(f"Ready to work on: {metrics['ready_to_work']}")
+    click.echo(f"Blocked by dependencies: {metrics['blocked_by_deps']}")
+    click.echo(f"Without dependencies: {metrics['no_deps']}")
+    click.echo(f"Avg dependencies per task: {metrics['avg_deps']:.1f}")
+    if metrics["most_depended_id"] is not None:
+        click.echo(
+            f"Most depended-on task: #{metrics['most_depended_id']} ({metrics['most_depended_count']} dependents)"
+        )
+    next_task_id = metrics["next_task_id"]
+    if next_task_id is not None:
+        click.echo(f"Next task: #{next_task_id} {table.titles[table.row_of(next_task_id)]}")
+    else:
+        click.echo("Next task: N/A")
+
+
+@click.command("stats")
+@click.option("--all", "all_plans", is_flag=True, help="Report every plan plus combined totals instead of only the focus plan.")
+@click.pass_context
+def stats(ctx, all_plans: bool):
+    """Show task statistics for the focus plan (or all plans).
+
+    Statistics are computed over a compact columnar copy of the tasks, which
+    keeps this fast even for very large plans. Install the optional
+    `analytics` extra (NumPy) for vectorized aggregation.
+    """
+    plan_path_option = ctx.parent.params.get('plan_path_option')
+    try:
+        if not all_plans:
+            project_data, focus_path = _get_focus_plan(plan_path_option)
+            if not project_data or not focus_path:
+                sys.exit(1)
+            click.echo(f"--- Stats for Focus Plan: {focus_path.name} ---")
+            _echo_table_stats(TaskTable.from_project(project_data))
+            return
+
+        plan_files = find_plan_files(Path.cwd(), plan_path_option)
+        if not plan_files:
+            click.echo("Error: No plan files found.", err=True)
+            sys.exit(1)
+        loaded_plans = load_plans(plan_files)
+
+        total_tasks = 0
+        total_done = 0
+        for path in sorted(loaded_plans):
+            project = loaded_plans[path]
+            if project is None:
+                click.echo(f"--- {path.name}: failed to load ---", err=True)
+                continue
+            table = TaskTable.from_project(project)
+            click.echo(f"--- Stats for Plan: {path.name} ---")
+            _echo_table_stats(table)
+            click.echo("")
+            total_tasks += len(table)
+            total_done += table.status_counts().get("Done", 0)
+
+        percent = (total_done / total_tasks * 100) if total_tasks else 0.0
+        click.echo("--- Totals ---")
+        click.echo(f"Plans: {sum(1 for plan in loaded_plans.values() if plan)}/{len(loaded_plans)} loaded")
+        click.echo(f"Tasks: {total_tasks} ({total_done} Done, {percent:.1f}%)")
+
+    except Exception as e:
+        click.echo(f"An unexpected error occurred: {e}", err=True)
+        logging.exception("Unexpected error in stats")
+        sys.exit(1)
+
+
+@click.command("critical-path")
+@click.option("--weight", type=click.Choice(WEIGHTS), default=WEIGHT_TASKS, show_default=True,
+              help="Duration of an unfinished task: one unit per task, its recorded time_spent_seconds, or its likely estimate (hours).")
+@click.option("--slack", "show_slack", is_flag=True, help="Also list earliest start/finish and slack for every unfinished task.")
+@click.pass_context
+def critical_path_cmd(ctx, weight: str, show_slack: bool):
+    """Show the critical path of unfinished work in the focus plan.
+
+    The critical path is the longest dependency chain of unfinished tasks; it
+    bounds how soon the plan can be finished. Done tasks count as zero work.
+    """
+    plan_path_option = ctx.parent.params.get('plan_path_option')
+    try:
+        project_data, focus_path = _get_focus_plan(plan_path_option)
+        if not project_data or not focus_path:
+            sys.exit(1)
+
+        table = TaskTable.from_project(project_data)
+        try:
+            schedule = critical_path(table, weight=weight)
+        except PlanValidationError as e:
+            click.echo(f"Error: {e}", err=True)
+            sys.exit(1)
+
+        unit = {WEIGHT_TIME: "s", WEIGHT_ESTIMATE: "h"}.get(weight, " task(s)")
+        click.echo(f"--- Critical Path for Focus Plan: {focus_path.name} ---")
+        if not schedule.critical_path:
+            click.echo("No unfinished work on any dependency chain.")
+            return
+        click.echo(f"Length: {schedule.length:g}{unit} across {len(schedule.critical_path)} task(s)")
+        for task_id in schedule.critical_path:
+            row = table.row_of(task_id)
+            click.echo(
+                f"  #{task_id:<5} {schedule.earliest_start[row]:>8g} -> {schedule.earliest_finish[row]:<8g} {table.titles[row]}"
+            )
+
+        if show_slack:
+            click.echo("\n-- Slack per unfinished task --")
+            click.echo(f"{'ID':<6} {'Start':>8} {'Finish':>8} {'Slack':>8}  Title")
+            for row in sorted(range(len(table)), key=lambda r: (schedule.slack[r], table.ids[r])):
+                if schedule.duration[row] <= 0:
+                    continue
+                click.echo(
+                    f"{table.ids[row]:<6} {schedule.earliest_start[row]:>8g} {schedule.earliest_finish[row]:>8g} "
+                    f"{schedule.slack[row]:>8g}  {table.titles[row]}"
+                )
+
+    except Exception as e:
+        click.echo(f"An unexpected error occurred: {e}", err=True)
+        logging.exception("Unexpected error in critical-path")
+        sys.exit(1)
+
+
+def _parse_estimate(ctx, param, value: Optional[str]):
+    """Click callback turning 'MIN,LIKELY,MAX' into a tuple of floats."""
+    if value is None:
+        return None
+    try:
+        low, likely, high = (float(part) for part in value.split(","))
+    except ValueError:
+        raise click.BadParameter("expected three comma-separated numbers: MIN,LIKELY,MAX")
+    if not (0 <= low <= likely <= high):
+        raise click.BadParameter("expected 0 <= MIN <= LIKELY <= MAX")
+    return low, likely, high
+
+
+@click.command("forecast")
+@click.option("--simulations", "-n", type=click.IntRange(min=1), default=10000, show_default=True, help="Number of simulated schedules.")
+@click.option("--percentile", "-p", "percentiles", type=click.FloatRange(0, 100), multiple=True,
+              help="Percentile of the completion time to report (repeatable). Defaults to 50 and 90.")
+@click.option("--default-estimate", callback=_parse_estimate, default=None, metavar="MIN,LIKELY,MAX",
+              help="Estimate (hours) used for open tasks without one. Without it they count as zero work.")
+@click.option("--batch-size", type=click.IntRange(min=1), default=None, help="Simulations per batch (default: sized to a fixed memory budget).")
+@click.option("--seed", type=int, default=None, help="Random seed for reproducible forecasts.")
+@click.pass_context
+def forecast_cmd(ctx, simulations, percentiles, default_estimate, batch_size, seed):
+    """Forecast completion of the focus plan by Monte Carlo simulation.
+
+    Each task may carry a three-point `estimate` (min/likely/max, in hours).
+    Durations are sampled from a triangular distribution and pushed through
+    the dependency graph; the reported figures are hours of remaining work
+    assuming unlimited parallelism. Requires NumPy (`metsuke[analytics]`).
+    """
+    plan_path_option = ctx.parent.params.get('plan_path_option')
+    try:
+        project_data, focus_path = _get_focus_plan(plan_path_option)
+        if not project_data or not focus_path:
+            sys.exit(1)
+
+        table = TaskTable.from_project(project_data)
+        try:
+            result = forecast(
+                table,
+                simulations=simulations,
+                percentiles=percentiles or DEFAULT_PERCENTILES,
+                seed=seed,
+                batch_size=batch_size,
+                default_estimate=default_estimate,
+            )
+        except (MetsukeError, PlanValidationError) as e:
+            click.echo(f"Error: {e}", err=True)
+            sys.exit(1)
+
+        click.echo(f"--- Forecast for Focus Plan: {focus_path.name} ---")
+        click.echo(f"Open tasks: {result.open_tasks} ({result.unestimated} without estimate)")
+        if result.unestimated and default_estimate is None:
+            click.echo("Warning: tasks without an estimate count as zero work (see --default-estimate).", err=True)
+        click.echo(f"Simulations: {result.simulations}")
+        for percentile, hours in result.percentiles.items():
+            click.echo(f"P{percentile:g}: {hours:.1f} h")
+        click.echo(f"Mean: {result.mean:.1f} h")
+
+    except Exception as e:
+        click.echo(f"An unexpected error occurred: {e}", err=True)
+        logging.exception("Unexpected error in forecast")
+        sys.exit(1)
+
+
+@click.command("deps")
+@click.argument("task_id", type=int)
+@click.option("--transitive", is_flag=True, help="Follow dependencies transitively instead of listing only direct ones.")
+@click.option("--reverse", is_flag=True, help="List tasks that depend on TASK_ID (what it unblocks) instead of its prerequisites.")
+@click.pass_context
+def deps(ctx, task_id: int, transitive: bool, reverse: bool):
+    """List the dependencies of a task in the focus plan.
+
+    By default shows TASK_ID's direct prerequisites. `--reverse` shows the
+    tasks waiting on it, and `--transitive` expands either direction to the
+    full chain.
+    """
+    plan_path_option = ctx.parent.params.get('plan_path_option')
+    try:
+        project_data, focus_path = _get_focus_plan(plan_path_option)
+        if not project_data or not focus_path:
+            sys.exit(1)
+
+        index = ReachabilityIndex.for_project(project_data)
+        if task_id not in index:
+            if task_id in project_data.archived:
+                click.echo(f"Error: Task {task_id} is archived in {project_data.archived[task_id]}.", err=True)
+            else:
+                click.echo(f"Error: Task {task_id} not found in {focus_path.name}.", err=True)
+            sys.exit(1)
+
+        table = index.table
+        if transitive:
+            related = index.transitive_dependents(task_id) if reverse else index.transitive_dependencies(task_id)
+        elif reverse:
+            related = [table.ids[row] for row in range(len(table)) if task_id in table.dependencies_of(row)]
+        else:
+            related = list(table.dependencies_of(table.row_of(task_id)))
+
+        scope = "transitive" if transitive else "direct"
+        relation = "dependents of" if reverse else "dependencies of"
+        click.echo(f"--- {len(related)} {scope} {relation} task {task_id} ({focus_path.name}) ---")
+        for related_id in related:
+            row = table.row_of(related_id)
+            if row is None:
+                archived_task = load_archived_task(focus_path, project_data, related_id)
+                if archived_task is not None:
+                    click.echo(f"{related_id:<6} {'(archived)':<12} {archived_task.title}")
+                else:
+                    click.echo(f"{related_id:<6} {'(missing)':<12}")
+                continue
+            task = project_data.tasks[row]
+            click.echo(f"{related_id:<6} {task.status:<12} {task.title}")
+
+    except Exception as e:
+        click.echo(f"An unexpected error occurred: {e}", err=True)
+        logging.exception("Unexpected error in deps")
+        sys.exit(1)
+
+
+def _lease_store(plan_path: Path, ttl: float) -> LeaseStore:
+    return LeaseStore.for_plan(plan_path, ttl=ttl)
+
+
+def _format_expiry(expires_at: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(expires_at))
+
+
+@click.command("claim")
+@click.option("--agent", required=True, help="Name of the agent taking the task.")
+@click.option("--ttl", type=click.FloatRange(min=1), default=DEFAULT_LEASE_TTL, show_default=True,
+              help="Lease lifetime in seconds; renew it with `heartbeat`.")
+@click.pass_context
+def claim(ctx, agent: str, ttl: float):
+    """Lease the next ready task in the focus plan for AGENT.
+
+    Picks the highest-priority task whose dependencies are Done and that no
+    other agent currently holds (the same order as the TUI's next task).
+    Exits with status 2 when nothing is available.
+    """
+    plan_path_option = ctx.parent.params.get('plan_path_option')
+    try:
+        project_data, focus_path = _get_focus_plan(plan_path_option)
+        if not project_data or not focus_path:
+            sys.exit(1)
+
+        lease = _lease_store(focus_path, ttl).claim(focus_path, project_data, agent)
+        if lease is None:
+            click.echo(f"No unclaimed ready tasks in {focus_path.name}.")
+            sys.exit(2)
+
+        task = next(t for t in project_data.tasks if t.id == lease.task_id)
+        click.echo(f"Claimed task {task.id} for {agent} until {_format_expiry(lease.expires_at)}")
+        click.echo(f"{task.id:<6} {task.priority:<8} {task.title}")
+
+    except MetsukeError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"An unexpected error occurred: {e}", err=True)
+        logging.exception("Unexpected error in claim")
+        sys.exit(1)
+
+
+@click.command("heartbeat")
+@click.option("--agent", required=True, help="Name of the agent holding the lease.")
+@click.option("--ttl", type=click.FloatRange(min=1), default=DEFAULT_LEASE_TTL, show_default=True,
+              help="New lease lifetime in seconds, counted from now.")
+@click.argument("task_id", type=int)
+@click.pass_context
+def heartbeat(ctx, agent: str, ttl: float, task_id: int):
+    """Extend AGENT's lease on TASK_ID in the focus plan."""
+    plan_path_option = ctx.parent.params.get('plan_path_option')
+    try:
+        project_data, focus_path = _get_focus_plan(plan_path_option)
+        if not project_data or not focus_path:
+            sys.exit(1)
+
+        lease = _lease_store(focus_path, ttl).heartbeat(focus_path, task_id, agent)
+        if lease is None:
+            click.echo(f"Error: {agent} does not hold a lease on task {task_id} (it may have expired).", err=True)
+            sys.exit(1)
+        click.echo(f"Extended lease on task {task_id} for {agent} until {_format_expiry(lease.expires_at)}")
+
+    except MetsukeError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"An unexpected error occurred: {e}", err=True)
+        logging.exception("Unexpected error in heartbeat")
+        sys.exit(1)
+
+
+@click.command("release")
+@click.option("--agent", required=True, help="Name of the agent holding the lease.")
+@click.argument("task_id", type=int)
+@click.pass_context
+def release(ctx, agent: str, task_id: int):
+    """Give up AGENT's lease on TASK_ID in the focus plan."""
+    plan_path_option = ctx.parent.params.get('plan_path_option')
+    try:
+        project_data, focus_path = _get_focus_plan(plan_path_option)
+        if not project_data or not focus_path:
+            sys.exit(1)
+
+        if not _lease_store(focus_path, DEFAULT_LEASE_TTL).release(focus_path, task_id, agent):
+            click.echo(f"Error: {agent} does not hold a lease on task {task_id}.", err=True)
+            sys.exit(1)
+        click.echo(f"Released task {task_id} for {agent}.")
+
+    except MetsukeError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"An unexpected error occurred: {e}", err=True)
+        logging.exception("Unexpected error in release")
+        sys.exit(1)
+
+
+@click.command("apply")
+@click.argument("ops_file", type=click.File("r", encoding="utf-8"))
+@click.option("--dry-run", is_flag=True, help="Validate and apply the operations in memory without saving.")
+@click.pass_context
+def apply(ctx, ops_file, dry_run: bool):
+    """Apply a JSON Lines operation log (OPS_FILE, or - for stdin) to the focus plan.
+
+    Operations are add, update, set_status, add_dependency and delete; ids
+    may be single ids, ranges like "10..250", lists, or "@name" references
+    to tasks added earlier in the log. All operations are applied or none
+    are: the plan is saved once, only if every line succeeds.
+    """
+    plan_path_option = ctx.parent.params.get('plan_path_option')
+    try:
+        project_data, focus_path = _get_focus_plan(plan_path_option)
+        if not project_data or not focus_path:
+            sys.exit(1)
+
+        session = PlanSession(focus_path, project=project_data)
+        session.begin()
+        counts = apply_operations(session, ops_file)
+        if dry_run:
+            session.rollback()
+        else:
+            session.commit()
+
+        summary = ", ".join(f"{outcome} {count}" for outcome, count in sorted(counts.items())) or "nothing to do"
+        verb = "Would apply" if dry_run else "Applied"
+        click.echo(f"{verb} {sum(counts.values())} operation(s) to {focus_path.name}: {summary}")
+
+    except MetsukeError as e:
+        click.echo(f"Error: {e}", err=True)
+        click.echo("No changes were saved.", err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"An unexpected error occurred: {e}", err=True)
+        logging.exception("Unexpected error in apply")
+        sys.exit(1)
+
+
+def _parse_column_map(ctx, param, values) -> Dict[str, str]:
+    columns = {}
+    for value in values:
+        field, sep, column = value.partition("=")
+        if not sep or field not in IMPORT_FIELDS or not column:
+            raise click.BadParameter(f"expected FIELD=COLUMN with FIELD one of {', '.join(IMPORT_FIELDS)}, got {value!r}")
+        columns[field] = column
+    return columns
+
+
+@click.command("import")
+@click.option("--from", "source", type=click.Path(exists=True, dir_okay=False, path_type=Path), required=True,
+              help="CSV or JSON Lines file with one task per row.")
+@click.option("--format", "fmt", type=click.Choice(IMPORT_FORMATS), default=None,
+              help="Input format (default: from the file extension).")
+@click.option("--name", default=None, help="Name of the new plan (default: the input file name).")
+@click.option("--map", "columns", multiple=True, callback=_parse_column_map, metavar="FIELD=COLUMN",
+              help="Read a task field from a differently named column, e.g. --map title=Summary. Repeatable.")
+@click.option("--shard-size", type=click.IntRange(min=1), default=None,
+              help="Split the tasks across several plan files of at most this many tasks.")
+@click.option("--output", type=click.Path(dir_okay=False, path_type=Path), default=None,
+              help="Plan file to create (default: plans/PROJECT_PLAN_<name>.yaml, multi-plan mode only).")
+def import_cmd(source: Path, fmt: Optional[str], name: Optional[str], columns: Dict[str, str],
+               shard_size: Optional[int], output: Optional[Path]):
+    """Create a plan from an existing backlog in CSV or JSON Lines.
+
+    Columns named like task fields (id, title, description, status,
+    priority, dependencies, time_spent_seconds) are used directly; rename
+    others with --map. `id` is the backlog's own ticket id: it is only used
+    to resolve `dependencies` (a list, or ids separated by commas,
+    semicolons or spaces), and tasks are numbered 1, 2, ... in input order.
+    Missing status and priority default to pending and medium. With
+    --shard-size, tasks linked by dependencies are kept in the same shard
+    (a larger one if needed).
+    """
+    name = name or source.stem
+    if output is None:
+        # Creating plans/ next to a root plan would switch discovery to plans/ and hide the root plan
+        if not Path(PLANS_DIR_NAME).is_dir() and Path(DEFAULT_PLAN_FILENAME).is_file():
+            click.echo(f"Error: Directory '{PLANS_DIR_NAME}' not found and '{DEFAULT_PLAN_FILENAME}' is in use.", err=True)
+            click.echo("Importing into plans/ requires multi-plan mode; pass --output to choose the file instead.",
+                       err=True)
+            sys.exit(1)
+        safe_name = name.lower().replace(" ", "_").replace("/", "_").replace("\\", "_")
+        output = Path(PLANS_DIR_NAME) / f"PROJECT_PLAN_{safe_name}.yaml"
+    existing = existing_outputs(output, sharded=bool(shard_size))
+    if existing:
+        click.echo(f"Error: Plan file '{existing[0]}' already exists.", err=True)
+        sys.exit(1)
+
+    try:
+        written = import_tasks(source, output, name, fmt=fmt, columns=columns, shard_size=shard_size)
+    except MetsukeError as e:
+        click.echo(f"Error: {e}", err=True)
+        click.echo("No plan files were written.", err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"An unexpected error occurred: {e}", err=True)
+        logging.exception("Unexpected error in import")
+        sys.exit(1)
+
+    for path, count in written:
+        click.echo(f"Wrote {count} task(s) to {path}")
+    if len(written) > 1:
+        click.echo(f"Imported {sum(count for _, count in written)} task(s) into {len(written)} plan files.")
+
+
+@click.command("export")
+@click.option("--format", "fmt", type=click.Choice(EXPORT_FORMATS), required=True,
+              help="csv / jsonl rows (re-importable with `metsuke import`) or a memory-mappable columnar file (.mtc).")
+@click.option("--all", "all_plans", is_flag=True, help="Export every plan instead of only the focus plan.")
+@click.option("--output-dir", type=click.Path(file_okay=False, path_type=Path), default=Path("."), show_default=True,
+              help="Directory for the exported files, named after each plan file.")
+@click.option("--chunk-size", type=click.IntRange(min=1), default=EXPORT_CHUNK_SIZE, show_default=True,
+              help="Rows written per chunk.")
+@click.option("--jobs", "-j", type=click.IntRange(min=1), default=None,
+              help="Plans exported in parallel with --all (default: number of CPUs).")
+@click.pass_context
+def export(ctx, fmt: str, all_plans: bool, output_dir: Path, chunk_size: int, jobs: Optional[int]):
+    """Export plan tasks for dashboards and reports."""
+    plan_path_option = ctx.parent.params.get('plan_path_option')
+    try:
+        loaded = {}
+        if all_plans:
+            plan_paths = find_plan_files(Path.cwd(), plan_path_option)
+            if not plan_paths:
+                click.echo("Error: No plan files found.", err=True)
+                sys.exit(1)
+        else:
+            project_data, focus_path = _get_focus_plan(plan_path_option)
+            if not project_data or not focus_path:
+                sys.exit(1)
+            plan_paths = [focus_path]
+            loaded = {focus_path: project_data}
+
+        for target, count in export_plans(plan_paths, fmt, output_dir, chunk_size=chunk_size, jobs=jobs,
+                                          loaded=loaded):
+            click.echo(f"Exported {count} task(s) to {target}")
+
+    except MetsukeError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"An unexpected error occurred: {e}", err=True)
+        logging.exception("Unexpected error in export")
+        sys.exit(1)
+
+
+@click.command("archive")
+@click.option("--compression", type=click.Choice(list(COMPRESSIONS)), default=COMPRESSION_GZIP, show_default=True,
+              help="Compression of the archive file.")
+@click.option("--dry-run", is_flag=True, help="List the tasks that would be archived without changing anything.")
+@click.pass_context
+def archive(ctx, compression: str, dry_run: bool):
+    """Move finished tasks out of the focus plan into a compressed archive.
+
+    Archives every Done task that no unfinished task depends on. The plan
+    keeps an `archived` map from task id to archive file, so dependencies
+    on archived tasks still count as Done and `deps` can show them.
+    """
+    plan_path_option = ctx.parent.params.get('plan_path_option')
+    try:
+        project_data, focus_path = _get_focus_plan(plan_path_option)
+        if not project_data or not focus_path:
+            sys.exit(1)
+
+        if dry_run:
+            ids = archivable_ids(project_data)
+            click.echo(f"Would archive {len(ids)} of {len(project_data.tasks)} task(s) from {focus_path.name}.")
+            if ids:
+                click.echo("Task IDs: " + ", ".join(map(str, ids)))
+            return
+
+        archive_path, ids = archive_done_tasks(focus_path, project_data, compression=compression)
+        if archive_path is None:
+            click.echo(f"Nothing to archive in {focus_path.name}.")
+            return
+        click.echo(f"Archived {len(ids)} task(s) from {focus_path.name} to {archive_path.name}.")
+
+    except MetsukeError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"An unexpected error occurred: {e}", err=True)
+        logging.exception("Unexpected error in archive")
+        sys.exit(1)
+
+
+@click.command("diagnostics")
+@click.option("--repeat", type=click.IntRange(min=1), default=1, show_default=True,
+              help="Load the plans this many times to get stable percentiles.")
+@click.option("--lazy-descriptions", is_flag=True, help="Load descriptions lazily, as the TUI does.")
+@click.option("--memory", "measure_memory", is_flag=True,
+              help="Also report the memory held per plan, per task and for descriptions.")
+@click.pass_context
+def diagnostics(ctx, repeat: int, lazy_descriptions: bool, measure_memory: bool):
+    """Load the plans and print hot-path timings as JSON.
+
+    Reports count, mean, p50, p99 and max (milliseconds) for each timing
+    span, e.g. `plan_read` (I/O), `yaml_parse` and `model_validate`, so a
+    slow load can be attributed. Nothing is written to the plans.
+
+    With --memory, each plan is loaded once more under tracemalloc and the
+    report gains a `memory` section: bytes allocated and kept by the load,
+    its peak, and object sizes split into tasks, descriptions, the source
+    snapshot and caches (see `metsuke.memory`), per plan and in total.
+    """
+    plan_path_option = ctx.parent.params.get('plan_path_option')
+    timing.reset()
+    plan_files = find_plan_files(Path.cwd(), plan_path_option)
+    if not plan_files:
+        click.echo("Error: No plan files found.", err=True)
+        sys.exit(1)
+    for _ in range(repeat):
+        loaded_plans = load_plans(plan_files, lazy_descriptions=lazy_descriptions)
+    report = {
+        "plans": {str(path): plan is not None for path, plan in sorted(loaded_plans.items())},
+        "tasks": sum(len(plan.tasks) for plan in loaded_plans.values() if plan),
+        "repeat": repeat,
+        "timings": timing.snapshot(),
+    }
+    if measure_memory:
+        plans_memory = {}
+        for path in sorted(plan_files):
+            loaded, kept, peak = memory.traced(
+                lambda: load_plans([path], lazy_descriptions=lazy_descriptions)
+            )
+            plans_memory[str(path)] = dict(
+                memory.plan_footprint([loaded[path]] if loaded[path] else []),
+                load_retained_bytes=kept, load_peak_bytes=peak,
+            )
+        report["memory"] = {
+            "plans": plans_memory,
+            "total": memory.plan_footprint(plan for plan in loaded_plans.values() if plan),
+        }
+    click.echo(json.dumps(report, indent=2))
+
+
+@click.command("validate")
+@click.option("--max-issues", type=click.IntRange(min=1), default=DEFAULT_MAX_ISSUES, show_default=True,
+              help="Issues listed per plan; further ones are only counted.")
+@click.pass_context
+def validate(ctx, max_issues: int):
+    """Check the plans against the schema, streaming them task by task.
+
+    Each task is validated as soon as it has been read, so plans of any size
+    are checked in memory proportional to one task. Problems are listed as
+    `file:line: location: message`; exits with status 1 if any plan has one.
+    Nothing is written to the plans.
+    """
+    plan_path_option = ctx.parent.params.get('plan_path_option')
+    plan_files = find_plan_files(Path.cwd(), plan_path_option)
+    if not plan_files:
+        click.echo("Error: No plan files found.", err=True)
+        sys.exit(1)
+    invalid = 0
+    for plan_file in plan_files:
+        try:
+            result = validate_plan_stream(plan_file, max_issues=max_issues)
+        except OSError as e:
+            click.echo(f"Error: Cannot read {plan_file}: {e}", err=True)
+            invalid += 1
+            continue
+        if result.ok:
+            click.echo(f"OK  {plan_file.name} ({result.tasks} task(s))")
+            continue
+        invalid += 1
+        click.echo(f"ERR {plan_file.name} ({result.issue_count} issue(s))")
+        for issue in result.issues:
+            click.echo(f"  {issue.format(plan_file)}")
+        if result.issue_count > len(result.issues):
+            click.echo(f"  ... and {result.issue_count - len(result.issues)} more")
+    if invalid:
+        sys.exit(1)
+
+
 @click.command("init")
 @click.option('--mode', type=click.Choice(['single', 'multi']), default='single', help='Create a single root plan or a multi-plan structure in plans/.')
 def init(mode):
@@ -372,96 +1021,96 @@ def update_plan(path_spec: Optional[Path]):
         checked_count += 1
         was_modified = False
         relative_path_str = str(f_path.relative_to(Path.cwd()) if f_path.is_relative_to(Path.cwd()) else f_path)
-        try:
-            # 3. Load raw YAML data using ruamel.yaml
-            with open(f_path, 'r', encoding='utf-8') as fp:
-                # Read header lines first
-                header_lines: List[str] = []
-                non_header_lines: List[str] = []
-                is_header = True
-                for line in fp:
-                    stripped_line = line.strip()
-                    if is_header and stripped_line.startswith('#'):
-                        header_lines.append(line)
-                    elif is_header and stripped_line == '' and not header_lines:
-                        continue # Skip leading blanks
-                    else:
-                        is_header = False
-                        non_header_lines.append(line)
-
-                # Join the non-header part back for ruamel to load
-                yaml_data_str = "".join(non_header_lines)
-                data = yaml_rt.load(yaml_data_str)
+        # Hold the plan lock so the migration cannot overwrite a concurrent save
+        with plan_lock(f_path):
+            try:
+                # 3. Load raw YAML data using ruamel.yaml
+                with open(f_path, 'r', encoding='utf-8') as fp:
+                    # Read header lines first
+                    header_lines: List[str] = []
+                    non_header_lines: List[str] = []
+                    is_header = True
+                    for line in fp:
+                        stripped_line = line.strip()
+                        if is_header and stripped_line.startswith('#'):
+                            header_lines.append(line)
+                        elif is_header and stripped_line == '' and not header_lines:
+                            continue # Skip leading blanks
+                        else:
+                            is_header = False
+                            non_header_lines.append(line)
+
+                    # Join the non-header part back for ruamel to load
+                    yaml_data_str = "".join(non_header_lines)
+                    data = yaml_rt.load(yaml_data_str)
             
-            if not isinstance(data, dict):
-                click.echo(f"Skipping {relative_path_str}: Invalid format (expected root dictionary).", err=True)
-                validation_error_count += 1 # Treat format errors as validation errors
-                error_count += 1
-                continue
-
-            # --- Check Header Comment --- 
-            current_header_str = "".join(header_lines)
-            # Simple comparison, might need refinement
-            if current_header_str.strip() != collaboration_guide_template.strip(): 
-                 click.echo(f"  - Updating header comment in {relative_path_str}")
-                 # Split template ensuring newlines are kept for writelines
-                 header_lines = [line + '\n' for line in collaboration_guide_template.splitlines()]
-                 was_modified = True
-
-            # 4. Check for top-level 'focus' key
-            if 'focus' not in data:
-                click.echo(f"  - Adding missing 'focus' key to {relative_path_str}")
-                # Default to True for single files, False for multi-mode
-                default_focus = True if not is_multi_mode else False
-                # Add comment explaining the field
-                data.insert(0, 'focus', default_focus, comment="Indicates the currently active plan for AI interaction (only one file should be true).")
-                was_modified = True
-
-            # --- Clean up removed fields (e.g., completion_date) --- # Add this block
-            if 'tasks' in data and isinstance(data['tasks'], list):
-                for task_index, task in enumerate(data['tasks']): # Use enumerate for better logging if needed
-                    if isinstance(task, dict) and 'completion_date' in task:
-                        click.echo(f"  - Removing deprecated 'completion_date' from Task ID {task.get('id', f'at index {task_index}')} in {relative_path_str}")
-                        del task['completion_date']
-                        was_modified = True
-            # --- End cleanup ---
+                if not isinstance(data, dict):
+                    click.echo(f"Skipping {relative_path_str}: Invalid format (expected root dictionary).", err=True)
+                    validation_error_count += 1 # Treat format errors as validation errors
+                    error_count += 1
+                    continue
+
+                # --- Check Header Comment --- 
+                current_header_str = "".join(header_lines)
+                # Simple comparison, might need refinement
+                if current_header_str.strip() != collaboration_guide_template.strip(): 
+                     click.echo(f"  - Updating header comment in {relative_path_str}")
+                     # Split template ensuring newlines are kept for writelines
+                     header_lines = [line + '\n' for line in collaboration_guide_template.splitlines()]
+                     was_modified = True
+
+                # 4. Check for top-level 'focus' key
+                if 'focus' not in data:
+                    click.echo(f"  - Adding missing 'focus' key to {relative_path_str}")
+                    # Default to True for single files, False for multi-mode
+                    default_focus = True if not is_multi_mode else False
+                    # Add comment explaining the field
+                    data.insert(0, 'focus', default_focus, comment="Indicates the currently active plan for AI interaction (only one file should be true).")
+                    was_modified = True
+
+                # --- Clean up removed fields (e.g., completion_date) --- # Add this block
+                if 'tasks' in data and isinstance(data['tasks'], list):
+                    for task_index, task in enumerate(data['tasks']): # Use enumerate for better logging if needed
+                        if isinstance(task, dict) and 'completion_date' in task:
+                            click.echo(f"  - Removing deprecated 'completion_date' from Task ID {task.get('id', f'at index {task_index}')} in {relative_path_str}")
+                            del task['completion_date']
+                            was_modified = True
+                # --- End cleanup ---
             
-            if was_modified:
-                click.echo(f"Modifications made to {relative_path_str}. Validating and attempting save...")
-                # 6. Attempt to validate the *modified* dict with Project.model_validate
-                try:
-                    validated_project = Project.model_validate(data)
-                    # 7. If valid, save back using yaml_rt.dump()
+                if was_modified:
+                    click.echo(f"Modifications made to {relative_path_str}. Validating and attempting save...")
+                    # 6. Attempt to validate the *modified* dict with Project.model_validate
                     try:
-                        # project_dict_to_save = validated_project.model_dump(mode='python') # REMOVE THIS LINE
-                        yaml_string_buffer = io.StringIO()
-                        # yaml_rt.dump(project_dict_to_save, yaml_string_buffer) # Modify this line
-                        yaml_rt.dump(data, yaml_string_buffer) # Dump the modified 'data' object directly
-                        yaml_content = yaml_string_buffer.getvalue()
-
-                        with open(f_path, 'w', encoding='utf-8') as fp:
-                            fp.writelines(header_lines)
-                            fp.write(yaml_content)
-                        click.echo(f"  Successfully validated and saved {relative_path_str}")
-                        updated_count += 1
-                    except IOError as io_err:
-                        click.echo(f"  Error saving file {relative_path_str}: {io_err}", err=True)
-                        error_count += 1
-                except ValidationError as val_err:
-                    click.echo(f"  Validation failed for {relative_path_str} after modifications: {val_err}", err=True)
-                    click.echo(f"  File was NOT saved.")
-                    validation_error_count += 1
-                    error_count += 1 # Also count as general error
-            else:
-                click.echo(f"{relative_path_str} is already up-to-date.")
+                        validated_project = Project.model_validate(data)
+                        # 7. If valid, save back using yaml_rt.dump()
+                        try:
+                            # project_dict_to_save = validated_project.model_dump(mode='python') # REMOVE THIS LINE
+                            yaml_string_buffer = io.StringIO()
+                            # yaml_rt.dump(project_dict_to_save, yaml_string_buffer) # Modify this line
+                            yaml_rt.dump(data, yaml_string_buffer) # Dump the modified 'data' object directly
+                            yaml_content = yaml_string_buffer.getvalue()
+
+                            _atomic_write(f_path, ("".join(header_lines) + yaml_content).encode('utf-8'))
+                            click.echo(f"  Successfully validated and saved {relative_path_str}")
+                            updated_count += 1
+                        except IOError as io_err:
+                            click.echo(f"  Error saving file {relative_path_str}: {io_err}", err=True)
+                            error_count += 1
+                    except ValidationError as val_err:
+                        click.echo(f"  Validation failed for {relative_path_str} after modifications: {val_err}", err=True)
+                        click.echo(f"  File was NOT saved.")
+                        validation_error_count += 1
+                        error_count += 1 # Also count as general error
+                else:
+                    click.echo(f"{relative_path_str} is already up-to-date.")
 
-        except FileNotFoundError:
-            click.echo(f"Error: File not found during processing: {relative_path_str}", err=True)
-            error_count += 1
-        except Exception as e: # Catch ruamel.yaml errors or others
-            click.echo(f"Error processing file {relative_path_str}: {e}", err=True)
-            logging.exception(f"Error details for {relative_path_str}")
-            error_count += 1
+            except FileNotFoundError:
+                click.echo(f"Error: File not found during processing: {relative_path_str}", err=True)
+                error_count += 1
+            except Exception as e: # Catch ruamel.yaml errors or others
+                click.echo(f"Error processing file {relative_path_str}: {e}", err=True)
+                logging.exception(f"Error details for {relative_path_str}")
+                error_count += 1
 
     click.echo("\n--- Update Summary ---")
     click.echo(f"Checked: {checked_count} file(s)")
@@ -475,12 +1124,23 @@ def update_plan(path_spec: Optional[Path]):
 
 
 @click.command("tui")
+@click.option("--log-level", type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+              default="INFO", show_default=True, help="Lowest level shown in the TUI log panel (Ctrl+D).")
+@click.option("--log-file", type=click.Path(dir_okay=False, path_type=Path), default=None,
+              help="Also write the TUI log to this file (rotated at 1 MB, 3 backups kept).")
+@click.option("--trace-memory", is_flag=True,
+              help="Trace allocations with tracemalloc; the timings panel (Ctrl+T) then shows the traced heap.")
 @click.pass_context
-def run_tui(ctx):
+def run_tui(ctx, log_level: str, log_file: Optional[Path], trace_memory: bool):
     """Launch the interactive Terminal User Interface (TUI) to view and manage plans.
 
     Requires optional dependencies. Install with: pip install "metsuke[tui]"
     """
+    # Startup time shown by the TUI is measured from here
+    launched_at = time.perf_counter()
+    if trace_memory:
+        # Started first so plan loading is traced too; costs some speed and memory
+        tracemalloc.start()
     plan_path_option = ctx.parent.params.get('plan_path_option')
 
     plan_files = find_plan_files(Path.cwd(), plan_path_option)
@@ -502,7 +1162,8 @@ def run_tui(ctx):
         sys.exit(1)
 
     try:
-        app = TaskViewer(plan_files=plan_files)
+        app = TaskViewer(plan_files=plan_files, started_at=launched_at,
+                         log_level=getattr(logging, log_level.upper()), log_file=log_file)
         app.run()
     except Exception as e:
         click.echo(f"Error running TUI: {e}", err=True)
@@ -554,9 +1215,21 @@ def repair(path_spec: Optional[Path], dry_run: bool):
                 # Try to load the file to see if it needs repair
                 try:
                     from ruamel.yaml import YAML
+                    from ruamel.yaml.error import YAMLError
                     yaml_loader = YAML(typ='rt')
-                    with open(f_path, 'r', encoding='utf-8') as f:
-                        data = yaml_loader.load(f)
+                    try:
+                        with open(f_path, 'r', encoding='utf-8') as f:
+                            data = yaml_loader.load(f)
+                    except YAMLError as e:
+                        click.echo(f"  ⚠ {relative_path_str} is not valid YAML: {e}")
+                        salvage = salvage_plan(f_path.read_text(encoding='utf-8'))
+                        if salvage.data is None:
+                            click.echo("    Nothing could be salvaged; it would be left as is")
+                        else:
+                            click.echo(f"    Would keep {salvage.tasks_kept} task(s)")
+                            for chunk in salvage.lost:
+                                click.echo(f"    Would drop {chunk.describe()}")
+                        continue
                     
                     if data is not None:
                         from .models import Project
@@ -570,7 +1243,7 @@ def repair(path_spec: Optional[Path], dry_run: bool):
             else:
                 # Actually repair the file
                 click.echo(f"Repairing {relative_path_str}...")
-                if repair_yaml_file(f_path):
+                if repair_yaml_file(f_path, salvage=True):
                     click.echo(f"  ✓ Successfully repaired {relative_path_str}")
                     repaired_count += 1
                 else:
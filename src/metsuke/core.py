@@ -6,22 +6,51 @@ from ruamel.yaml import YAML # Import ruamel.yaml
 # from ruamel.yaml.scalarstring import LiteralScalarString # Remove or comment out this import
 from ruamel.yaml.scalarstring import FoldedScalarString # Add or ensure this import exists
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple # Add new types
+from typing import Dict, Any, Iterator, Optional, List, Tuple # Add new types
 import logging # Add logging
 import io
+import mmap
+import os
 import re
 import shutil
+import tempfile
+import hashlib
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
+try:
+    import fcntl  # POSIX only; plan locking is a no-op without it
+    _FCNTL_AVAILABLE = True
+except ImportError:
+    fcntl = None
+    _FCNTL_AVAILABLE = False
+
 from pydantic import ValidationError
 
-from .models import Project
-from .exceptions import PlanLoadingError, PlanValidationError
+from .models import Estimate, Project
+from .descriptions import attach_descriptions, map_file, read_file, split_descriptions
+from .exceptions import PlanLoadingError, PlanValidationError, PlanConflictError
+from .salvage import salvage_plan
+from .streaming import load_plan_streaming
+from .timing import span, timed
 
 # Default plan filename and pattern
 DEFAULT_PLAN_FILENAME = "PROJECT_PLAN.yaml"
 PLAN_FILE_PATTERN = "PROJECT_PLAN_*.yaml"
 PLANS_DIR_NAME = "plans"
+# Directory for Metsuke's local state (leases, caches, profiles)
+METSUKE_DIR_NAME = ".metsuke"
+# Sidecar lock file guarding a plan's read-modify-write cycle
+LOCK_FILE_SUFFIX = ".lock"
+# Task fields that are omitted from saved files while unset
+OPTIONAL_TASK_KEYS = ("estimate",)
+# Plans at least this large are loaded with `streaming.load_plan_streaming`
+STREAMING_LOAD_BYTES = 64 * 1024 * 1024
+# libyaml parser for lazy loads. It reads YAML 1.1, so the few plain values
+# it types differently from ruamel (e.g. `yes` or `1_000` as a title) fail
+# validation, and those plans are loaded in full instead.
+_FAST_YAML_LOADER = yaml.CSafeLoader if getattr(yaml, '__with_libyaml__', False) else None
 
 # --- Template definitions moved from cli.py ---
 DEFAULT_PLAN_FILENAME_FOR_TEMPLATE = "PROJECT_PLAN.yaml" 
@@ -61,15 +90,192 @@ collaboration_guide_template = """\
 logger = logging.getLogger(__name__)
 
 
-def repair_yaml_file(filepath: Path) -> bool:
+# --- Plan locking and concurrent-edit merging ---
+
+class _HeldLock:
+    """Per-process state for one plan's lock; reentrant within a thread."""
+
+    def __init__(self) -> None:
+        self.rlock = threading.RLock()
+        self.depth = 0
+        self.lock_file = None
+        # Threads using or waiting for the lock; the entry is dropped at zero
+        self.users = 0
+
+
+_held_locks: Dict[Path, _HeldLock] = {}
+_held_locks_guard = threading.Lock()
+
+
+def plan_lock_path(filepath: Path) -> Path:
+    """Returns the hidden sidecar lock file for a plan, e.g. `.PROJECT_PLAN.yaml.lock`."""
+    return filepath.with_name(f".{filepath.name}{LOCK_FILE_SUFFIX}")
+
+
+@contextmanager
+def plan_lock(filepath: Path) -> Iterator[None]:
+    """Holds an exclusive advisory lock on a plan for a read-modify-write cycle.
+
+    Other processes using `plan_lock` (CLI commands, agents, the TUI) wait
+    for it; threads in this process are serialized too. The lock is
+    reentrant, so `save_plan` can be called while it is already held. If
+    `fcntl` is unavailable or the lock file cannot be created, only the
+    in-process lock is taken.
+
+    Plain reads do not need it: every writer replaces plan files
+    atomically, so a reader sees either the old or the new file.
+    """
+    key = filepath.resolve()
+    with _held_locks_guard:
+        held = _held_locks.setdefault(key, _HeldLock())
+        held.users += 1
+
+    try:
+        with held.rlock:
+            if held.depth == 0 and _FCNTL_AVAILABLE:
+                try:
+                    held.lock_file = open(plan_lock_path(key), "a")
+                    fcntl.flock(held.lock_file.fileno(), fcntl.LOCK_EX)
+                except OSError as e:
+                    logger.warning(f"Could not lock {filepath}, continuing without a file lock: {e}")
+                    if held.lock_file is not None:
+                        held.lock_file.close()
+                    held.lock_file = None
+            held.depth += 1
+            try:
+                yield
+            finally:
+                held.depth -= 1
+                if held.depth == 0 and held.lock_file is not None:
+                    fcntl.flock(held.lock_file.fileno(), fcntl.LOCK_UN)
+                    held.lock_file.close()
+                    held.lock_file = None
+    finally:
+        with _held_locks_guard:
+            held.users -= 1
+            if held.users == 0:
+                del _held_locks[key]
+
+
+def _file_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def plan_file_matches(project: Project, filepath: Path) -> bool:
+    """True if `filepath` still holds the version `project` was loaded from or last saved as."""
+    if project.source.digest is None:
+        return False
+    try:
+        return _file_digest(filepath.read_bytes()) == project.source.digest
+    except OSError:
+        return False
+
+
+_MISSING = object()
+
+
+def _merge_value(name: str, base: Any, ours: Any, theirs: Any, conflicts: List[str]) -> Any:
+    """Three-way merge of one value; `_MISSING` stands for an absent key or task."""
+    if ours == base:
+        return theirs
+    if theirs == base or theirs == ours:
+        return ours
+    conflicts.append(name)
+    return ours
+
+
+def merge_plan_data(base: Dict[str, Any], ours: Dict[str, Any], theirs: Dict[str, Any]) -> Dict[str, Any]:
+    """Three-way merges two edited versions of a plan at task granularity.
+
+    `base` is the version both sides started from, `ours` the in-memory
+    edit and `theirs` what is on disk now. Top-level fields and tasks
+    (matched by id) changed on only one side take that side's version;
+    tasks added or deleted on one side are added or deleted. Raises
+    `PlanConflictError` if both sides changed the same field or task
+    differently. Task order follows `theirs`, with our new tasks appended.
+    """
+    conflicts: List[str] = []
+    merged: Dict[str, Any] = {}
+    keys = [key for key in ours if key != 'tasks']
+    keys += [key for key in theirs if key != 'tasks' and key not in ours]
+    for key in keys:
+        value = _merge_value(f"'{key}'", base.get(key, _MISSING), ours.get(key, _MISSING),
+                             theirs.get(key, _MISSING), conflicts)
+        if value is not _MISSING:
+            merged[key] = value
+
+    base_tasks = {task['id']: task for task in base.get('tasks') or []}
+    our_tasks = {task['id']: task for task in ours.get('tasks') or []}
+    their_tasks = {task['id']: task for task in theirs.get('tasks') or []}
+    order = list(their_tasks) + [task_id for task_id in our_tasks if task_id not in their_tasks]
+    merged['tasks'] = []
+    for task_id in order:
+        task = _merge_value(f"task {task_id}", base_tasks.get(task_id, _MISSING),
+                            our_tasks.get(task_id, _MISSING), their_tasks.get(task_id, _MISSING), conflicts)
+        if task is not _MISSING:
+            merged['tasks'].append(task)
+
+    if conflicts:
+        raise PlanConflictError(f"Conflicting concurrent changes to {', '.join(conflicts)}")
+    return merged
+
+
+def _parse_plan_data(content: Any) -> Dict[str, Any]:
+    """Plan file bytes as `model_dump(mode='json')` data, for merging."""
+    return Project.model_validate(YAML(typ='rt').load(bytes(content).decode('utf-8'))).model_dump(mode='json')
+
+
+def _merge_base(project: Project, filepath: Path) -> Dict[str, Any]:
+    """The plan as `project` was loaded, parsed from the bytes kept on load.
+
+    Raises `PlanConflictError` if they were not kept (streamed loads) or
+    were memory-mapped and have since been rewritten in place.
+    """
+    content = project.source.content
+    if content is None:
+        raise PlanConflictError(f"{filepath} changed on disk and the version it was loaded from was not kept")
+    if isinstance(content, mmap.mmap):
+        try:
+            # A mapping of a truncated file faults when read past the new end
+            intact = content.size() >= len(content) and _file_digest(content) == project.source.digest
+        except (ValueError, OSError):
+            intact = False
+        if not intact:
+            raise PlanConflictError(f"{filepath} was rewritten in place; the version it was loaded from is gone")
+    return _parse_plan_data(content)
+
+
+def _merge_into(project: Project, filepath: Path, current: bytes) -> None:
+    """Folds the changes made on disk since `project` was loaded into `project`."""
+    merged = Project.model_validate(merge_plan_data(
+        _merge_base(project, filepath), project.model_dump(mode='json'), _parse_plan_data(current)
+    ))
+    for field in Project.model_fields:
+        setattr(project, field, getattr(merged, field))
+    project.invalidate_cache()
+    logger.info(f"Merged concurrent changes to {filepath} before saving")
+
+
+@timed("repair_yaml_file")
+def repair_yaml_file(filepath: Path, salvage: bool = False) -> bool:
     """Attempts to automatically repair common YAML format issues.
     
     Args:
         filepath: Path to the YAML file to repair
+        salvage: If the file is not valid YAML at all, keep the sections and
+            tasks that still parse and drop the rest (see `salvage_plan`).
+            This loses data, so only an explicit `metsuke repair` asks for it;
+            the automatic repair in `load_plans` leaves such files untouched.
         
     Returns:
         True if repairs were made and the file was saved, False otherwise
     """
+    with plan_lock(filepath):
+        return _repair_yaml_file(filepath, salvage)
+
+
+def _repair_yaml_file(filepath: Path, salvage: bool = False) -> bool:
+    """Implements `repair_yaml_file`; the caller holds the plan lock."""
     if not filepath.is_file():
         logger.warning(f"Cannot repair non-existent file: {filepath}")
         return False
@@ -85,19 +291,29 @@ def repair_yaml_file(filepath: Path) -> bool:
     try:
         # Try to parse the YAML file first
         yaml_loader = YAML(typ='safe')
+        repairs_made = []
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 data = yaml_loader.load(f)
         except Exception as e:
+            # Not YAML at all: keep whatever sections and tasks still parse
             logger.warning(f"Could not parse YAML: {e}")
-            return False
+            if not salvage:
+                return False
+            salvaged = salvage_plan(filepath.read_text(encoding='utf-8'))
+            if salvaged.data is None:
+                return False
+            data = salvaged.data
+            repairs_made.append(f"Salvaged {salvaged.tasks_kept} task(s) from unparseable YAML")
+            for chunk in salvaged.lost:
+                repairs_made.append(f"Dropped unparseable {chunk.describe()}")
+                logger.warning(f"Dropped unparseable {chunk.describe()} (kept in {backup_path.name})")
         
         if not isinstance(data, dict):
             logger.warning("YAML content is not a dictionary, cannot repair")
             return False
             
         # Start fixing data structure issues
-        repairs_made = []
         
         # Ensure required top-level fields exist
         if 'project' not in data:
@@ -153,6 +369,14 @@ def repair_yaml_file(filepath: Path) -> bool:
                 if 'priority' not in task or task['priority'] not in ['low', 'medium', 'high']:
                     task['priority'] = 'medium'
                     repairs_made.append(f"Fixed invalid priority for task {task['id']}")
+
+                # Optional; an estimate that is not min <= likely <= max (all >= 0) is dropped
+                if task.get('estimate') is not None:
+                    try:
+                        Estimate.model_validate(task['estimate'])
+                    except ValidationError:
+                        del task['estimate']
+                        repairs_made.append(f"Removed invalid estimate for task {task['id']}")
                     
                 if 'dependencies' not in task:
                     task['dependencies'] = []
@@ -233,9 +457,10 @@ def repair_yaml_file(filepath: Path) -> bool:
                             break
                 
                 # Write repaired file
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.writelines(header_lines)
-                    yaml_saver.dump(data, f)
+                buffer = io.StringIO()
+                buffer.writelines(header_lines)
+                yaml_saver.dump(data, buffer)
+                _atomic_write(filepath, buffer.getvalue().encode('utf-8'))
                 
                 logger.info(f"Successfully repaired {filepath}. Repairs made: {', '.join(repairs_made)}")
                 return True
@@ -252,6 +477,7 @@ def repair_yaml_file(filepath: Path) -> bool:
         return False
 
 
+@timed("find_plan_files")
 def find_plan_files(base_dir: Path, explicit_path: Optional[Path]) -> List[Path]:
     """Finds project plan files based on explicit path or discovery rules."""
     if explicit_path:
@@ -289,8 +515,83 @@ def find_plan_files(base_dir: Path, explicit_path: Optional[Path]) -> List[Path]
     return []
 
 
-def load_plans(plan_files: List[Path]) -> Dict[Path, Optional[Project]]:
-    """Loads and validates multiple plan files."""
+def _load_plan_file(filepath: Path, yaml_loader: YAML, empty_message: str = "Plan file is empty",
+                    lazy_descriptions: bool = False, map_descriptions: bool = True) -> Project:
+    """Parses and validates one plan, recording the file version it came from."""
+    if filepath.stat().st_size >= STREAMING_LOAD_BYTES:
+        # Too large to build the round-trip tree of; validated task by task
+        with span("stream_load"):
+            return load_plan_streaming(filepath)
+    if lazy_descriptions:
+        project_data = _load_plan_file_lazily(filepath, yaml_loader, map_descriptions)
+        if project_data is not None:
+            return project_data
+    with span("plan_read"):
+        content = filepath.read_bytes()
+    with span("yaml_parse"):
+        data = yaml_loader.load(content.decode('utf-8'))
+    if data is None:
+        raise PlanLoadingError(f"{empty_message}: {filepath.resolve()}")
+    with span("model_validate"):
+        project_data = Project.model_validate(data)
+    project_data.record_source(_file_digest(content), content)
+    return project_data
+
+
+def _load_plan_file_lazily(filepath: Path, yaml_loader: YAML,
+                           map_descriptions: bool = True) -> Optional[Project]:
+    """Loads a plan leaving description blocks in a memory-mapped file
+    (or, without `map_descriptions`, in a copy of its bytes).
+
+    Returns None when the plan should be loaded normally instead: it is
+    empty, has no description blocks, or fails to parse this way (errors are
+    then reported by the normal load).
+    """
+    with span("plan_read"):
+        with open(filepath, 'rb') as f:
+            mapping = map_file(f) if map_descriptions else read_file(f)
+    if mapping is None:
+        return None
+    digest = _file_digest(mapping)
+    with span("description_split"):
+        text, placeholders = split_descriptions(mapping, digest)
+    if not placeholders:
+        return None
+    try:
+        with span("yaml_parse"):
+            if _FAST_YAML_LOADER is not None:
+                data = yaml.load(text, Loader=_FAST_YAML_LOADER)
+            else:
+                data = yaml_loader.load(text)
+        if data is None:
+            return None
+        with span("model_validate"):
+            project_data = Project.model_validate(data)
+    except Exception as e:
+        logger.debug(f"Lazy load of {filepath} failed, loading it in full: {e}")
+        return None
+    if not attach_descriptions(project_data, placeholders):
+        logger.debug(f"Unexpected description layout in {filepath}, loading it in full")
+        return None
+    project_data.record_source(digest, mapping)
+    return project_data
+
+
+def load_plans(plan_files: List[Path], lazy_descriptions: bool = False,
+               map_descriptions: bool = True) -> Dict[Path, Optional[Project]]:
+    """Loads and validates multiple plan files.
+
+    With `lazy_descriptions`, task descriptions stay in the memory-mapped
+    file and are read from it whenever `Task.description` is read (see
+    `descriptions`), which makes description-heavy plans much faster to load
+    and smaller in memory. Pass `map_descriptions=False` for files that may be being
+    rewritten in place right now: they are read into memory instead, as
+    truncating a mapped file crashes the process (SIGBUS).
+
+    Files of `STREAMING_LOAD_BYTES` or more are streamed instead (see
+    `streaming`): descriptions are then always loaded, and invalid plans
+    are reported with line numbers but not auto-repaired.
+    """
     loaded_plans: Dict[Path, Optional[Project]] = {}
     yaml_loader = YAML(typ='rt') # Use ruamel.yaml round-trip loader
     for filepath in plan_files:
@@ -300,17 +601,17 @@ def load_plans(plan_files: List[Path]) -> Dict[Path, Optional[Project]]:
             continue
         try:
             logger.debug(f"Attempting to load plan: {filepath}")
-            with open(filepath, "r", encoding="utf-8") as f:
-                # Using standard yaml loader here is fine, ruamel is for saving
-                data = yaml_loader.load(f) # <-- Use ruamel loader
-                if data is None:
-                    raise PlanLoadingError(f"Plan file is empty: {filepath.resolve()}")
-            project_data = Project.model_validate(data)
+            project_data = _load_plan_file(filepath, yaml_loader, lazy_descriptions=lazy_descriptions,
+                                           map_descriptions=map_descriptions)
             loaded_plans[filepath] = project_data
             logger.debug(f"Successfully loaded and validated: {filepath}")
         except (FileNotFoundError, PlanLoadingError) as e:
             logger.error(f"Error loading plan file {filepath}: {e}")
             loaded_plans[filepath] = None
+        except PlanValidationError as e:
+            # Only streamed plans raise this; they are too large to auto-repair in memory
+            logger.error(str(e))
+            loaded_plans[filepath] = None
         except yaml.YAMLError as e:
             logger.error(f"Error parsing YAML file {filepath}: {e}")
             logger.info(f"Attempting to auto-repair YAML file: {filepath}")
@@ -318,11 +619,8 @@ def load_plans(plan_files: List[Path]) -> Dict[Path, Optional[Project]]:
             if repair_yaml_file(filepath):
                 logger.info(f"Auto-repair successful for {filepath}, retrying load...")
                 try:
-                    with open(filepath, "r", encoding="utf-8") as f:
-                        data = yaml_loader.load(f)
-                        if data is None:
-                            raise PlanLoadingError(f"Plan file is empty after repair: {filepath.resolve()}")
-                    project_data = Project.model_validate(data)
+                    project_data = _load_plan_file(filepath, yaml_loader, "Plan file is empty after repair",
+                                                   lazy_descriptions, map_descriptions)
                     loaded_plans[filepath] = project_data
                     logger.info(f"Successfully loaded repaired plan: {filepath}")
                 except Exception as retry_e:
@@ -343,11 +641,8 @@ def load_plans(plan_files: List[Path]) -> Dict[Path, Optional[Project]]:
             if repair_yaml_file(filepath):
                 logger.info(f"Auto-repair successful for {filepath}, retrying load...")
                 try:
-                    with open(filepath, "r", encoding="utf-8") as f:
-                        data = yaml_loader.load(f)
-                        if data is None:
-                            raise PlanLoadingError(f"Plan file is empty after repair: {filepath.resolve()}")
-                    project_data = Project.model_validate(data)
+                    project_data = _load_plan_file(filepath, yaml_loader, "Plan file is empty after repair",
+                                                   lazy_descriptions, map_descriptions)
                     loaded_plans[filepath] = project_data
                     logger.info(f"Successfully loaded repaired plan: {filepath}")
                 except Exception as retry_e:
@@ -363,11 +658,8 @@ def load_plans(plan_files: List[Path]) -> Dict[Path, Optional[Project]]:
             if repair_yaml_file(filepath):
                 logger.info(f"Auto-repair successful for {filepath}, retrying load...")
                 try:
-                    with open(filepath, "r", encoding="utf-8") as f:
-                        data = yaml_loader.load(f)
-                        if data is None:
-                            raise PlanLoadingError(f"Plan file is empty after repair: {filepath.resolve()}")
-                    project_data = Project.model_validate(data)
+                    project_data = _load_plan_file(filepath, yaml_loader, "Plan file is empty after repair",
+                                                   lazy_descriptions, map_descriptions)
                     loaded_plans[filepath] = project_data
                     logger.info(f"Successfully loaded repaired plan: {filepath}")
                 except Exception as retry_e:
@@ -379,74 +671,22 @@ def load_plans(plan_files: List[Path]) -> Dict[Path, Optional[Project]]:
     return loaded_plans
 
 
+@timed("save_plan")
 def save_plan(project: Project, filepath: Path) -> bool:
-    """Saves a Project object back to a YAML file, preserving structure."""
-    try:
-        # --- Preserve Header Comments --- 
-        header_lines: List[str] = []
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f_read:
-                for line in f_read:
-                    stripped_line = line.strip()
-                    if stripped_line.startswith('#'):
-                        header_lines.append(line) # Keep original line ending
-                    elif stripped_line == '' and not header_lines: # Skip leading blank lines
-                        continue
-                    else:
-                        break # Stop at first non-comment/non-empty line
-        except FileNotFoundError:
-            logger.debug(f"File {filepath} not found, creating new file with default header.")
-            # Assign default header lines when creating a new file
-            # Split the template string into lines, ensuring each line ends with a newline
-            header_lines = [line + '\n' for line in collaboration_guide_template.splitlines()]
-            # Optionally, ensure there's a blank line separating header from YAML content
-            if header_lines and not header_lines[-1].endswith('\n\n'):
-                 header_lines.append('\n') 
-        except Exception as e:
-            logger.warning(f"Could not read header from {filepath}: {e}") # Log warning but proceed
-
-        # Ensure parent directory exists
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-
-        # Use ruamel.yaml for round-trip safety
-        yaml_saver = YAML(typ='rt') # Change back to this
-        # yaml_saver.default_style = '|' # Ensure this is removed
-        yaml_saver.indent(mapping=2, sequence=4, offset=2)
-        # yaml_saver.preserve_quotes = True # Ensure this remains commented/removed
-        yaml_saver.width = 1000 # Prevent line wrapping
-
-        # Convert Pydantic model to dict, handling datetime
-        # Use model_dump for Pydantic v2
-        project_dict = project.model_dump(mode='python') # mode='python' often helps with types like datetime
-
-        # --- Convert specific fields to Folded style --- # Modify this block
-        if isinstance(project_dict.get('context'), str) and project_dict['context']:
-            # project_dict['context'] = LiteralScalarString(project_dict['context'])
-            project_dict['context'] = FoldedScalarString(project_dict['context']) # Use Folded
-
-        if isinstance(project_dict.get('tasks'), list):
-            for task in project_dict['tasks']:
-                if isinstance(task.get('description'), str) and task['description']:
-                    # task['description'] = LiteralScalarString(task['description'])
-                    task['description'] = FoldedScalarString(task['description']) # Use Folded
-        # --- End conversion --- # Modify this block
-
-        # Dump YAML data to an in-memory buffer
-        yaml_string_buffer = io.StringIO()
-        yaml_saver.dump(project_dict, yaml_string_buffer)
-        yaml_content = yaml_string_buffer.getvalue()
-
-        logger.debug(f"Attempting to save plan to: {filepath}")
-        # Write header (if any) and then the YAML content
-        with open(filepath, 'w', encoding='utf-8') as f_write:
-            f_write.writelines(header_lines)
-            # Add a newline between header and YAML if header exists
-            # if header_lines and not yaml_content.startswith('---'): # Avoid double --- if ruamel adds it
-            #     f_write.write("\n")
-            f_write.write(yaml_content)
+    """Saves a Project object back to a YAML file, preserving structure.
 
+    If the file changed on disk since `project` was loaded, those changes
+    are merged into `project` first (see `merge_plan_data`). When they
+    conflict with the in-memory edits, nothing is written and False is
+    returned; reload the plan and reapply the edit.
+    """
+    try:
+        _save_plan(project, filepath)
         logger.info(f"Successfully saved plan: {filepath}")
         return True
+    except PlanConflictError as e:
+        logger.error(f"Not saving {filepath}, it was changed by another writer: {e}")
+        return False
     except IOError as e:
         logger.error(f"Error writing plan file {filepath}: {e}")
         return False
@@ -455,6 +695,106 @@ def save_plan(project: Project, filepath: Path) -> bool:
         return False
 
 
+def _save_plan(project: Project, filepath: Path) -> None:
+    """Implements `save_plan`, raising instead of logging on failure."""
+    with plan_lock(filepath):
+        if project.source.digest is not None and filepath.is_file():
+            current = filepath.read_bytes()
+            if _file_digest(current) != project.source.digest:
+                _merge_into(project, filepath, current)
+        content = _render_plan(project, filepath)
+        logger.debug(f"Attempting to save plan to: {filepath}")
+        _atomic_write(filepath, content)
+        project.record_source(_file_digest(content), content)
+
+
+def _atomic_write(filepath: Path, content: bytes) -> None:
+    """Replaces `filepath` with `content` so readers never see a partial file."""
+    # Ensure parent directory exists
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{filepath.name}.", suffix=".tmp", dir=filepath.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f_write:
+            f_write.write(content)
+            f_write.flush()
+            os.fsync(f_write.fileno())
+        if filepath.exists():
+            shutil.copymode(filepath, tmp_name)
+        else:
+            os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _render_plan(project: Project, filepath: Path) -> bytes:
+    """Serializes a plan, keeping the header comments of the existing file."""
+    # --- Preserve Header Comments --- 
+    header_lines: List[str] = []
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f_read:
+            for line in f_read:
+                stripped_line = line.strip()
+                if stripped_line.startswith('#'):
+                    header_lines.append(line) # Keep original line ending
+                elif stripped_line == '' and not header_lines: # Skip leading blank lines
+                    continue
+                else:
+                    break # Stop at first non-comment/non-empty line
+    except FileNotFoundError:
+        logger.debug(f"File {filepath} not found, creating new file with default header.")
+        # Assign default header lines when creating a new file
+        # Split the template string into lines, ensuring each line ends with a newline
+        header_lines = [line + '\n' for line in collaboration_guide_template.splitlines()]
+        # Optionally, ensure there's a blank line separating header from YAML content
+        if header_lines and not header_lines[-1].endswith('\n\n'):
+             header_lines.append('\n') 
+    except Exception as e:
+        logger.warning(f"Could not read header from {filepath}: {e}") # Log warning but proceed
+
+    # Use ruamel.yaml for round-trip safety
+    yaml_saver = YAML(typ='rt') # Change back to this
+    # yaml_saver.default_style = '|' # Ensure this is removed
+    yaml_saver.indent(mapping=2, sequence=4, offset=2)
+    # yaml_saver.preserve_quotes = True # Ensure this remains commented/removed
+    yaml_saver.width = 1000 # Prevent line wrapping
+
+    # Convert Pydantic model to dict, handling datetime
+    # Use model_dump for Pydantic v2
+    project_dict = project.model_dump(mode='python') # mode='python' often helps with types like datetime
+    if not project_dict.get('archived'):
+        project_dict.pop('archived', None)
+
+    # --- Convert specific fields to Folded style --- # Modify this block
+    if isinstance(project_dict.get('context'), str) and project_dict['context']:
+        # project_dict['context'] = LiteralScalarString(project_dict['context'])
+        project_dict['context'] = FoldedScalarString(project_dict['context']) # Use Folded
+
+    if isinstance(project_dict.get('tasks'), list):
+        for task in project_dict['tasks']:
+            # Keep optional fields out of the file until they are used
+            for key in OPTIONAL_TASK_KEYS:
+                if task.get(key) is None:
+                    task.pop(key, None)
+            if isinstance(task.get('description'), str) and task['description']:
+                # task['description'] = LiteralScalarString(task['description'])
+                task['description'] = FoldedScalarString(task['description']) # Use Folded
+    # --- End conversion --- # Modify this block
+
+    # Dump YAML data to an in-memory buffer
+    yaml_string_buffer = io.StringIO()
+    yaml_saver.dump(project_dict, yaml_string_buffer)
+    yaml_content = yaml_string_buffer.getvalue()
+
+    # Header (if any) followed by the YAML content
+    return ("".join(header_lines) + yaml_content).encode('utf-8')
+
+
+@timed("manage_focus")
 def manage_focus(
     loaded_plans: Dict[Path, Optional[Project]],
     new_focus_target: Optional[Path] = None
@@ -472,10 +812,25 @@ def manage_focus(
         - The updated loaded_plans dictionary (potentially with modified focus flags).
         - The Path of the plan that has focus after management, or None.
     """
+    focus_path, plans_to_save = apply_focus(loaded_plans, new_focus_target)
+    save_focus_changes(plans_to_save)
+    return loaded_plans, focus_path
+
+
+@timed("apply_focus")
+def apply_focus(
+    loaded_plans: Dict[Path, Optional[Project]],
+    new_focus_target: Optional[Path] = None
+) -> Tuple[Optional[Path], List[Tuple[Project, Path]]]:
+    """Sets the focus flags like `manage_focus`, but only in memory.
+
+    Returns the focused path and the `(plan, path)` pairs whose flag
+    changed, for `save_focus_changes` (the TUI saves them in the background).
+    """
     valid_plans = {path: plan for path, plan in loaded_plans.items() if plan is not None}
     if not valid_plans:
         logger.warning("No valid plans loaded, cannot manage focus.")
-        return loaded_plans, None
+        return None, []
 
     plans_to_save: List[Tuple[Project, Path]] = []
     focus_path: Optional[Path] = None # Initialize focus_path
@@ -519,22 +874,22 @@ def manage_focus(
                     focused_plans[path].focus = False
                     plans_to_save.append((focused_plans[path], path))
 
-    # Save any changes made (common to both branches)
-    if plans_to_save:
-        logger.info(f"Saving focus changes for {len(plans_to_save)} plan(s).")
-        for plan, path in plans_to_save:
-            if not save_plan(plan, path):
-                 logger.error(f"Failed to save focus change for {path}. Focus state might be inconsistent.")
-    else:
-        logger.info("No focus changes required saving.")
-
+    logger.info(f"Final focus path determined: {focus_path}")
+    return focus_path, plans_to_save
 
-    # Update the main dictionary with potentially modified plan objects
-    for path, plan in valid_plans.items():
-         loaded_plans[path] = plan
 
-    logger.info(f"Final focus path determined: {focus_path}")
-    return loaded_plans, focus_path
+def save_focus_changes(plans_to_save: List[Tuple[Project, Path]]) -> bool:
+    """Saves the plans `apply_focus` changed; returns False if any save failed."""
+    if not plans_to_save:
+        logger.info("No focus changes required saving.")
+        return True
+    logger.info(f"Saving focus changes for {len(plans_to_save)} plan(s).")
+    saved = True
+    for plan, path in plans_to_save:
+        if not save_plan(plan, path):
+            logger.error(f"Failed to save focus change for {path}. Focus state might be inconsistent.")
+            saved = False
+    return saved
 
 
 # --- Old load_plan - Can be removed or kept for specific single-file loading ---
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""Lazy loading of task descriptions from a memory-mapped plan file.
+
+Descriptions are usually long Markdown block scalars (`description: >-`)
+that only the TUI detail panel shows. In lazy mode the loader maps the plan
+file, records the byte range of every description block, and parses the
+plan with each block replaced by a short placeholder. Tasks keep a
+`LazyDescription` instead of the text, which is read from the mapping
+whenever `Task.description` is read or the task is dumped.
+
+The mapping stays valid when the plan is replaced on disk (`save_plan`
+writes a new file and renames it over the old one), so a lazy description
+always returns the text of the version the plan was loaded from. Editors
+that save in place truncate the mapped file instead: `LazyDescription.load`
+checks the file size first and raises `PlanLoadingError` rather than touch
+pages past the new end, which would kill the process with SIGBUS. The TUI
+maps the plans it shows and reloads a plan (into a new mapping) when its
+file changes; a truncation landing between that size check and the copy
+of the block can still crash it. Pass `map_descriptions=False` to
+`load_plans` to split a copy of the file's bytes (`read_file`) instead, at
+the cost of keeping that copy in memory.
+"""
+
+import mmap
+import re
+import secrets
+from typing import Dict, List, Optional, Pattern, Tuple, Union
+
+import yaml
+
+from .exceptions import PlanLoadingError
+from .models import Project
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# `key: >-` / `- key: |2` lines that start a block scalar
+_BLOCK_HEADER = re.compile(
+    rb"^( *(?:- +)*)([^\s#'\"\-][^:\n]*?):[ \t]+([|>][-+1-9]*)[ \t]*(?:#[^\n]*)?\r?$",
+    re.MULTILINE,
+)
+_DESCRIPTION_KEY = b"description"
+# A plan file's bytes: mapped, or copied by `read_file`
+Buffer = Union[mmap.mmap, bytes]
+_block_ends: Dict[int, Pattern[bytes]] = {}
+
+
+def _block_end(key_column: int) -> Pattern[bytes]:
+    """Matches the first line that is no longer part of a block scalar under a key at `key_column`."""
+    pattern = _block_ends.get(key_column)
+    if pattern is None:
+        pattern = re.compile(rb"^ {0,%d}(?=[^ \r\n])" % key_column, re.MULTILINE)
+        _block_ends[key_column] = pattern
+    return pattern
+
+
+class LazyDescription:
+    """A description block left in a mapped (or copied) plan file until it is read.
+
+    Immutable and shared on copy, so plans and `PlanSession` copies can
+    hold it without duplicating the mapping. Descriptions compare equal when
+    they are the same block of the same file contents (`digest`), whether
+    or not they were loaded through the same mapping.
+    """
+
+    __slots__ = ("_mapping", "digest", "_key_column", "start", "end")
+
+    def __init__(self, mapping: Buffer, digest: str, key_column: int, start: int, end: int) -> None:
+        self._mapping = mapping
+        self.digest = digest
+        self._key_column = key_column
+        self.start = start
+        self.end = end
+
+    def load(self) -> str:
+        """Decodes the block scalar; raises `PlanLoadingError` if the mapped file shrank."""
+        if isinstance(self._mapping, mmap.mmap) and (self._mapping.closed or self._mapping.size() < self.end):
+            raise PlanLoadingError("Plan file was truncated in place; reload it to read descriptions")
+        # Re-parse the block under a key at its original column so explicit
+        # indentation indicators keep their meaning
+        snippet = b" " * self._key_column + b"v: " + self._mapping[self.start:self.end]
+        value = yaml.load(snippet, Loader=_YAML_LOADER)["v"]
+        return "" if value is None else str(value)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LazyDescription):
+            return NotImplemented
+        return (self.digest == other.digest and self.start == other.start
+                and self.end == other.end)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __copy__(self) -> "LazyDescription":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "LazyDescription":
+        return self
+
+
+def map_file(f) -> Optional[mmap.mmap]:
+    """Maps an open binary file read-only; None for an empty file."""
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:  # empty file
+        return None
+
+
+def read_file(f) -> Optional[bytes]:
+    """Reads an open binary file into memory; None for an empty file."""
+    return f.read() or None
+
+
+def split_descriptions(mapping: Buffer, digest: str) -> Tuple[str, Dict[str, LazyDescription]]:
+    """Returns the plan text with description blocks replaced by placeholders.
+
+    The second value maps each placeholder string to the description it
+    stands for. Block scalars under other keys are skipped whole, so text
+    inside them that looks like a `description:` line is left alone.
+    `digest` identifies the file contents (see `LazyDescription.__eq__`).
+    """
+    prefix = f"__metsuke_lazy_{secrets.token_hex(8)}_"
+    parts: List[bytes] = []
+    placeholders: Dict[str, LazyDescription] = {}
+    copied = 0
+    position = 0
+    while True:
+        header = _BLOCK_HEADER.search(mapping, position)
+        if header is None:
+            break
+        key_column = len(header.group(1))
+        content_start = header.end() + 1
+        end_match = _block_end(key_column).search(mapping, content_start) if content_start < len(mapping) else None
+        end = end_match.start() if end_match else len(mapping)
+        end = max(end, min(content_start, len(mapping)))
+        if header.group(2) == _DESCRIPTION_KEY:
+            placeholder = f"{prefix}{len(placeholders)}"
+            placeholders[placeholder] = LazyDescription(mapping, digest, key_column, header.start(3), end)
+            parts.append(mapping[copied:header.start(3)])
+            parts.append(f'"{placeholder}"\n'.encode("ascii"))
+            copied = end
+        position = end
+    parts.append(mapping[copied:])
+    return b"".join(parts).decode("utf-8"), placeholders
+
+
+def attach_descriptions(project: Project, placeholders: Dict[str, LazyDescription]) -> bool:
+    """Swaps the placeholders in `project` for their lazy descriptions.
+
+    Returns False (leaving some placeholders in place) if any placeholder
+    did not end up as a task description, in which case the caller should
+    parse the file normally instead.
+    """
+    attached = 0
+    for task in project.tasks:
+        lazy = placeholders.get(task.description) if task.description else None
+        if lazy is not None:
+            task.defer_description(lazy)
+            attached += 1
+    return attached == len(placeholders)
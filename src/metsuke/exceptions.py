@@ -11,4 +11,16 @@ class PlanLoadingError(MetsukeError):
 
 class PlanValidationError(MetsukeError):
     """Error during plan schema validation."""
-    pass 
\ No newline at end of file
+    pass
+
+class PlanConflictError(MetsukeError):
+    """Plan file changed on disk and the changes could not be merged."""
+    pass
+
+class LeaseError(MetsukeError):
+    """Error while reading or updating the task lease store."""
+    pass
+
+class ProfilerUnavailableError(MetsukeError):
+    """Signal-based sampling is not possible on this platform or thread."""
+    pass
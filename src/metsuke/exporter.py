@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""Export of plans to CSV, JSON Lines and a memory-mappable columnar file.
+
+CSV and JSON Lines rows are written in chunks as they are produced, using
+the column names `metsuke import` reads, so exports can be imported again.
+`export_plan` streams them straight from the plan file (see `streaming`),
+so only one chunk of tasks is in memory at a time; plans that are already
+loaded are written from memory instead. Invalid plans are reported, not
+repaired, as export never writes to plan files.
+
+The columnar format (`.mtc`) stores one plan's `TaskTable` columns as raw
+little-endian arrays so consumers can `mmap` the file and read columns
+without parsing YAML. `ColumnarPlan` is the matching reader.
+
+Layout::
+
+    magic     8 bytes   b"MTSKCOL1"
+    header    <II       row count, column count
+    directory per column: <24s c 7x Q Q   name, array typecode, offset, byte length
+    data      each column starts at an 8-byte aligned offset
+
+Columns: `ids`, `status`, `priority` (codes into `status_values` /
+`priority_values` in the `meta` JSON column), `time_spent`, `est_min`,
+`est_likely`, `est_max` (NaN when unset), `dep_offsets` + `dep_ids` (CSR
+dependencies), and `title_offsets` + `titles`, `description_offsets` +
+`descriptions` (UTF-8 strings; row `i` spans `offsets[i]:offsets[i + 1]`).
+"""
+
+import csv
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from .core import OPTIONAL_TASK_KEYS
+from .exceptions import PlanLoadingError
+from .models import Project, Task
+from .streaming import load_plan_streaming, validate_plan_stream, validation_error
+from .table import PRIORITY_VALUES, STATUS_VALUES, TaskTable
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_COLUMNAR = "columnar"
+FORMATS = (FORMAT_CSV, FORMAT_JSONL, FORMAT_COLUMNAR)
+EXTENSIONS = {FORMAT_CSV: ".csv", FORMAT_JSONL: ".jsonl", FORMAT_COLUMNAR: ".mtc"}
+DEFAULT_CHUNK_SIZE = 5000
+
+CSV_COLUMNS = (
+    "id", "title", "description", "status", "priority", "dependencies",
+    "time_spent_seconds", "estimate_min", "estimate_likely", "estimate_max",
+)
+
+COLUMNAR_MAGIC = b"MTSKCOL1"
+_HEADER = struct.Struct("<II")
+_DIRECTORY_ENTRY = struct.Struct("<24sc7xQQ")
+_ALIGNMENT = 8
+
+
+def _chunks(tasks: Sequence[Task], chunk_size: int) -> Iterator[Sequence[Task]]:
+    for start in range(0, len(tasks), chunk_size):
+        yield tasks[start:start + chunk_size]
+
+
+@contextmanager
+def _replace_on_success(target: Path, mode: str, **kwargs) -> Iterator[Any]:
+    """Opens a temp file next to `target` that replaces it only if the block succeeds."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _csv_row(task: Task) -> List[Any]:
+    estimate = task.estimate
+    return [
+        task.id, task.title, task.description or "", task.status, task.priority,
+        ";".join(map(str, task.dependencies)), task.time_spent_seconds,
+        "" if estimate is None else estimate.min,
+        "" if estimate is None else estimate.likely,
+        "" if estimate is None else estimate.max,
+    ]
+
+
+def _csv_chunk_writer(f: TextIO) -> Callable[[Sequence[Task]], None]:
+    writer = csv.writer(f)
+    writer.writerow(CSV_COLUMNS)
+    return lambda chunk: writer.writerows(_csv_row(task) for task in chunk)
+
+
+def write_csv(project: Project, target: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    return _write_rows(FORMAT_CSV, project.tasks, target, chunk_size)
+
+
+def _json_row(task: Task) -> str:
+    row = task.model_dump(mode="json")
+    for key in OPTIONAL_TASK_KEYS:
+        if row.get(key) is None:
+            row.pop(key, None)
+    return json.dumps(row, ensure_ascii=False)
+
+
+def _jsonl_chunk_writer(f: TextIO) -> Callable[[Sequence[Task]], None]:
+    def write(chunk: Sequence[Task]) -> None:
+        if chunk:
+            f.write("\n".join(_json_row(task) for task in chunk))
+            f.write("\n")
+    return write
+
+
+def write_jsonl(project: Project, target: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    return _write_rows(FORMAT_JSONL, project.tasks, target, chunk_size)
+
+
+# Row formats: chunk writer factory and `open` arguments
+_ROW_FORMATS = {
+    FORMAT_CSV: (_csv_chunk_writer, {"newline": ""}),
+    FORMAT_JSONL: (_jsonl_chunk_writer, {}),
+}
+
+
+def _write_rows(fmt: str, tasks: Sequence[Task], target: Path, chunk_size: int) -> int:
+    make_writer, open_args = _ROW_FORMATS[fmt]
+    with _replace_on_success(target, "w", encoding="utf-8", **open_args) as f:
+        write = make_writer(f)
+        for chunk in _chunks(tasks, chunk_size):
+            write(chunk)
+    return len(tasks)
+
+
+def stream_rows(plan_path: Path, fmt: str, target: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Writes a plan file's tasks as CSV or JSON Lines rows while reading it.
+
+    Raises `PlanValidationError` (writing nothing) if the plan is invalid.
+    """
+    make_writer, open_args = _ROW_FORMATS[fmt]
+    pending: List[Task] = []
+    with _replace_on_success(target, "w", encoding="utf-8", **open_args) as f:
+        write = make_writer(f)
+
+        def on_task(task: Task) -> None:
+            pending.append(task)
+            if len(pending) >= chunk_size:
+                write(pending)
+                pending.clear()
+
+        result = validate_plan_stream(plan_path, on_task=on_task)
+        if not result.ok:
+            raise validation_error(plan_path, result)
+        write(pending)
+    return result.tasks
+
+
+def _string_column(values: Sequence[str]) -> Tuple[array, bytes]:
+    offsets = array("q", [0])
+    buffer = io.BytesIO()
+    for value in values:
+        buffer.write(value.encode("utf-8"))
+        offsets.append(buffer.tell())
+    return offsets, buffer.getvalue()
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != "little" and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_columnar(project: Project, target: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Writes a plan in the columnar layout described in the module docstring.
+
+    Columns are written whole; `chunk_size` is accepted for a uniform writer
+    signature.
+    """
+    table = TaskTable.from_project(project)
+    title_offsets, titles = _string_column(table.titles)
+    description_offsets, descriptions = _string_column([task.description or "" for task in project.tasks])
+    meta = json.dumps({
+        "project": project.project.model_dump(mode="json"),
+        "status_values": list(STATUS_VALUES),
+        "priority_values": list(PRIORITY_VALUES),
+    }).encode("utf-8")
+
+    columns: List[Tuple[str, str, bytes]] = [
+        ("meta", "B", meta),
+        ("ids", "q", _little_endian(table.ids)),
+        ("status", "b", table.status.tobytes()),
+        ("priority", "b", table.priority.tobytes()),
+        ("time_spent", "d", _little_endian(table.time_spent)),
+        ("est_min", "d", _little_endian(table.est_min)),
+        ("est_likely", "d", _little_endian(table.est_likely)),
+        ("est_max", "d", _little_endian(table.est_max)),
+        ("dep_offsets", "q", _little_endian(table.dep_offsets)),
+        ("dep_ids", "q", _little_endian(table.dep_ids)),
+        ("title_offsets", "q", _little_endian(title_offsets)),
+        ("titles", "B", titles),
+        ("description_offsets", "q", _little_endian(description_offsets)),
+        ("descriptions", "B", descriptions),
+    ]
+
+    offset = len(COLUMNAR_MAGIC) + _HEADER.size + _DIRECTORY_ENTRY.size * len(columns)
+    directory = []
+    for name, typecode, data in columns:
+        offset += -offset % _ALIGNMENT
+        directory.append(_DIRECTORY_ENTRY.pack(name.encode("ascii"), typecode.encode("ascii"), offset, len(data)))
+        offset += len(data)
+
+    with _replace_on_success(target, "wb") as f:
+        f.write(COLUMNAR_MAGIC)
+        f.write(_HEADER.pack(len(table), len(columns)))
+        f.write(b"".join(directory))
+        for _, _, data in columns:
+            f.write(b"\0" * (-f.tell() % _ALIGNMENT))
+            f.write(data)
+    return len(table)
+
+
+WRITERS = {FORMAT_CSV: write_csv, FORMAT_JSONL: write_jsonl, FORMAT_COLUMNAR: write_columnar}
+
+
+class ColumnarPlan:
+    """Read-only, memory-mapped view of a `.mtc` export.
+
+    Numeric columns are returned as `memoryview`s over the mapping, so no
+    data is copied (wrap them with `numpy.frombuffer` for vector maths).
+    Close the plan (or use it as a context manager) when done.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if view[:len(COLUMNAR_MAGIC)] != COLUMNAR_MAGIC:
+            view.release()
+            self._mmap.close()
+            raise PlanLoadingError(f"{path} is not a Metsuke columnar export")
+        self._rows, column_count = _HEADER.unpack_from(view, len(COLUMNAR_MAGIC))
+        self._columns: Dict[str, Tuple[str, int, int]] = {}
+        position = len(COLUMNAR_MAGIC) + _HEADER.size
+        for _ in range(column_count):
+            name, typecode, offset, length = _DIRECTORY_ENTRY.unpack_from(view, position)
+            self._columns[name.rstrip(b"\0").decode("ascii")] = (typecode.decode("ascii"), offset, length)
+            position += _DIRECTORY_ENTRY.size
+        self._view = view
+        self._cache: Dict[str, Any] = {}
+        self.meta: Dict[str, Any] = json.loads(bytes(self.column("meta")))
+
+    def __enter__(self) -> "ColumnarPlan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, name: str) -> Any:
+        """Returns a column as a typed memoryview (or a byteswapped array on big-endian hosts)."""
+        values = self._cache.get(name)
+        if values is None:
+            typecode, offset, length = self._columns[name]
+            raw = self._view[offset:offset + length]
+            if sys.byteorder != "little" and typecode not in "bB":
+                values = array(typecode, raw.tobytes())
+                values.byteswap()
+            else:
+                values = raw.cast(typecode)
+            raw.release()
+            self._cache[name] = values
+        return values
+
+    def _string(self, field: str, row: int) -> str:
+        offsets = self.column(f"{field}_offsets")
+        return bytes(self.column(f"{field}s")[offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+    def title(self, row: int) -> str:
+        return self._string("title", row)
+
+    def description(self, row: int) -> str:
+        return self._string("description", row)
+
+    def status(self, row: int) -> str:
+        return self.meta["status_values"][self.column("status")[row]]
+
+    def priority(self, row: int) -> str:
+        return self.meta["priority_values"][self.column("priority")[row]]
+
+    def dependencies(self, row: int) -> List[int]:
+        offsets = self.column("dep_offsets")
+        return list(self.column("dep_ids")[offsets[row]:offsets[row + 1]])
+
+    def close(self) -> None:
+        for values in self._cache.values():
+            if isinstance(values, memoryview):
+                values.release()
+        self._cache = {}
+        self._view.release()
+        self._mmap.close()
+
+
+def export_plan(plan_path: Path, fmt: str, output_dir: Path, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                project: Optional[Project] = None) -> Tuple[Path, int]:
+    """Exports one plan to `output_dir/<plan stem><ext>`.
+
+    Uses `project` if the plan is already loaded; otherwise rows are
+    streamed from the file and the columnar format loads it through the
+    same validator. Either way an invalid plan raises `PlanValidationError`
+    and is left untouched (no auto-repair). Returns the written path and
+    the number of tasks. Module-level so it can run in worker processes.
+    """
+    target = output_dir / f"{plan_path.stem}{EXTENSIONS[fmt]}"
+    if project is None and fmt in _ROW_FORMATS:
+        return target, stream_rows(plan_path, fmt, target, chunk_size)
+    if project is None:
+        project = load_plan_streaming(plan_path)
+    return target, WRITERS[fmt](project, target, chunk_size)
+
+
+def export_plans(plan_paths: Sequence[Path], fmt: str, output_dir: Path,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, jobs: Optional[int] = None,
+                 loaded: Optional[Dict[Path, Project]] = None) -> List[Tuple[Path, int]]:
+    """Exports several plans, one worker process per plan when `jobs` allows.
+
+    `jobs` defaults to the CPU count; with one job (or one plan) everything
+    runs in this process, and plans in `loaded` are exported from memory
+    rather than read again. Results follow the order of `plan_paths`.
+    """
+    loaded = loaded or {}
+    jobs = min(jobs or os.cpu_count() or 1, len(plan_paths))
+    if jobs <= 1:
+        return [export_plan(path, fmt, output_dir, chunk_size, loaded.get(path)) for path in plan_paths]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(export_plan, path, fmt, output_dir, chunk_size) for path in plan_paths]
+        return [future.result() for future in futures]
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""Streaming import of tasks from CSV or JSON Lines into plan files.
+
+Imports run in two passes over the source so memory stays bounded by the
+id map rather than the backlog size:
+
+1. Assign every row a plan task id, keeping only a dict from external id
+   to task id.
+2. Re-read the rows, map columns to `Task` fields, resolve dependencies
+   through that dict, validate each task and append it to the output
+   file(s) in chunks.
+
+Sharded imports read the dependencies once more in between, to group
+tasks connected by dependencies into the same shard: a task's
+dependencies must be in its own plan file, or it shows as blocked forever.
+
+Output is written to temporary files that replace the targets only once
+every row has been imported.
+"""
+
+import csv
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+from pydantic import ValidationError
+
+from .core import OPTIONAL_TASK_KEYS, collaboration_guide_template
+from .exceptions import PlanLoadingError, PlanValidationError
+from .models import Task
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMATS = (FORMAT_CSV, FORMAT_JSONL)
+# Task fields that can be mapped from source columns
+IMPORT_FIELDS = ("id", "title", "description", "status", "priority", "dependencies", "time_spent_seconds")
+DEFAULT_STATUS = "pending"
+DEFAULT_PRIORITY = "medium"
+# Tasks serialized per YAML dump call
+WRITE_CHUNK_SIZE = 1000
+
+_DEPENDENCY_SEPARATOR = re.compile(r"[,;\s]+")
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def detect_format(source: Path) -> str:
+    """Guesses the input format from the file suffix."""
+    suffix = source.suffix.lower()
+    if suffix == ".csv":
+        return FORMAT_CSV
+    if suffix in (".jsonl", ".ndjson", ".json"):
+        return FORMAT_JSONL
+    raise PlanLoadingError(f"Cannot tell the format of {source.name}; pass --format {'|'.join(FORMATS)}")
+
+
+def iter_records(source: Path, fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yields `(line_number, row)` for each record in the source file."""
+    with open(source, "r", encoding="utf-8", newline="") as f:
+        if fmt == FORMAT_CSV:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise PlanLoadingError(f"{source.name}:{line_number}: invalid JSON: {e}") from e
+            if not isinstance(row, dict):
+                raise PlanLoadingError(f"{source.name}:{line_number}: expected a JSON object")
+            yield line_number, row
+
+
+def _cell(row: Dict[str, Any], column: str) -> Any:
+    value = row.get(column)
+    return None if value == "" else value
+
+
+def build_id_map(source: Path, fmt: str, id_column: str, start_id: int = 1) -> Dict[str, int]:
+    """First pass: maps each row's external id to the task id it will get.
+
+    Rows without an external id still take a task id (so ids follow input
+    order) but cannot be referenced as dependencies.
+    """
+    id_map: Dict[str, int] = {}
+    task_id = start_id
+    for line_number, row in iter_records(source, fmt):
+        external = _cell(row, id_column)
+        if external is not None:
+            key = str(external)
+            if key in id_map:
+                raise PlanValidationError(f"{source.name}:{line_number}: duplicate id '{key}'")
+            id_map[key] = task_id
+        task_id += 1
+    return id_map
+
+
+def _dependency_keys(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    return [key for key in _DEPENDENCY_SEPARATOR.split(str(value)) if key]
+
+
+def iter_tasks(source: Path, fmt: str, id_map: Dict[str, int], columns: Dict[str, str],
+               start_id: int = 1) -> Iterator[Task]:
+    """Second pass: yields validated tasks in input order.
+
+    `columns` maps `Task` field names to source column names. Unknown
+    dependency ids raise `PlanValidationError` naming the line.
+    """
+    task_id = start_id
+    for line_number, row in iter_records(source, fmt):
+        data: Dict[str, Any] = {
+            "id": task_id,
+            "title": _cell(row, columns["title"]),
+            "description": _cell(row, columns["description"]),
+            "status": _cell(row, columns["status"]) or DEFAULT_STATUS,
+            "priority": _cell(row, columns["priority"]) or DEFAULT_PRIORITY,
+        }
+        spent = _cell(row, columns["time_spent_seconds"])
+        if spent is not None:
+            data["time_spent_seconds"] = spent
+        estimate = row.get("estimate")
+        if estimate is None and _cell(row, "estimate_likely") is not None:
+            estimate = {part: _cell(row, f"estimate_{part}") for part in ("min", "likely", "max")}
+        if estimate is not None:
+            data["estimate"] = estimate
+
+        dependencies = []
+        for key in _dependency_keys(_cell(row, columns["dependencies"])):
+            if key not in id_map:
+                raise PlanValidationError(f"{source.name}:{line_number}: unknown dependency '{key}'")
+            dependencies.append(id_map[key])
+        data["dependencies"] = dependencies
+
+        try:
+            yield Task.model_validate(data)
+        except ValidationError as e:
+            raise PlanValidationError(f"{source.name}:{line_number}: invalid task: {e}") from e
+        task_id += 1
+
+
+class _PlanStreamWriter:
+    """Writes a plan file task by task, in the layout `save_plan` produces."""
+
+    def __init__(self, target: Path, name: str, version: str) -> None:
+        self.target = target
+        self.count = 0
+        self._pending: List[Dict[str, Any]] = []
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+        self._file = os.fdopen(fd, "w", encoding="utf-8")
+        self._file.write(collaboration_guide_template)
+        self._file.write("\n")
+        self._file.write(yaml.dump(
+            {"project": {"name": name, "version": version}, "focus": False},
+            Dumper=_YAML_DUMPER, default_flow_style=False, sort_keys=False, allow_unicode=True,
+        ))
+        self._file.write("tasks:\n")
+
+    def add(self, task: Task) -> None:
+        task_dict = task.model_dump(mode="json")
+        for key in OPTIONAL_TASK_KEYS:
+            if task_dict.get(key) is None:
+                task_dict.pop(key, None)
+        self._pending.append(task_dict)
+        self.count += 1
+        if len(self._pending) >= WRITE_CHUNK_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        chunk = yaml.dump(self._pending, Dumper=_YAML_DUMPER, default_flow_style=False,
+                          sort_keys=False, allow_unicode=True, width=1000)
+        # Indent the sequence under `tasks:` like save_plan does
+        self._file.write("".join("  " + line if line.strip() else line for line in chunk.splitlines(True)))
+        self._pending = []
+
+    def close(self) -> None:
+        """Finishes the file and moves it into place."""
+        self._flush()
+        if self.count == 0:
+            self._file.write("  []\n")
+        self._file.close()
+        os.chmod(self._tmp_name, 0o644)
+        os.replace(self._tmp_name, self.target)
+
+    def discard(self) -> None:
+        self._file.close()
+        try:
+            os.unlink(self._tmp_name)
+        except OSError:
+            pass
+
+
+def shard_path(target: Path, index: int) -> Path:
+    """Path of the `index`-th shard (1-based) of `target`."""
+    return target.with_name(f"{target.stem}_{index:03d}{target.suffix}")
+
+
+def existing_outputs(target: Path, sharded: bool) -> List[Path]:
+    """Files an import into `target` could overwrite.
+
+    The number of shards is only known once the source has been read, so
+    any existing shard of `target` counts.
+    """
+    if not sharded:
+        return [target] if target.exists() else []
+    return sorted(target.parent.glob(f"{target.stem}_[0-9][0-9][0-9]*{target.suffix}"))
+
+
+def _find(parent: List[int], row: int) -> int:
+    while parent[row] != row:
+        parent[row] = parent[parent[row]]
+        row = parent[row]
+    return row
+
+
+def assign_shards(source: Path, fmt: str, id_map: Dict[str, int], columns: Dict[str, str],
+                  shard_size: int, start_id: int = 1) -> List[int]:
+    """Shard index (0-based) for every task id, in input order.
+
+    Tasks linked by dependencies, directly or not, form a group that goes
+    into a single shard; groups fill shards in order of their first task.
+    A group larger than `shard_size` gets a shard of its own, so that shard
+    is larger too. Unknown dependencies are ignored here; the import pass
+    reports them.
+    """
+    parent: List[int] = []
+    rows = 0
+    for row, (_, record) in enumerate(iter_records(source, fmt)):
+        rows += 1
+        targets = [id_map[key] - start_id for key in _dependency_keys(_cell(record, columns["dependencies"]))
+                   if key in id_map]
+        # Dependencies may point forward to rows not read yet
+        while len(parent) <= max(targets + [row]):
+            parent.append(len(parent))
+        for target in targets:
+            a, b = _find(parent, row), _find(parent, target)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+    sizes: Dict[int, int] = {}
+    roots = [_find(parent, row) for row in range(rows)]
+    for root in roots:
+        sizes[root] = sizes.get(root, 0) + 1
+
+    shard_of_root: Dict[int, int] = {}
+    shard, filled = 0, 0
+    for root in roots:
+        if root in shard_of_root:
+            continue
+        if filled and filled + sizes[root] > shard_size:
+            shard, filled = shard + 1, 0
+        shard_of_root[root] = shard
+        filled += sizes[root]
+    return [shard_of_root[root] for root in roots]
+
+
+def import_tasks(source: Path, target: Path, name: str, fmt: Optional[str] = None,
+                 columns: Optional[Dict[str, str]] = None, shard_size: Optional[int] = None,
+                 version: str = "0.1.0") -> List[Tuple[Path, int]]:
+    """Imports `source` into a new plan at `target`, or into shards of it.
+
+    With `shard_size`, tasks are split into files of at most that many
+    tasks (`target` stem plus `_001`, `_002`, ...), keeping tasks linked by
+    dependencies in the same file (see `assign_shards`). Task ids stay
+    unique across shards. Returns `(path, task_count)` for each file
+    written. Nothing is written if any row fails to import.
+    """
+    fmt = fmt or detect_format(source)
+    columns = {field: field for field in IMPORT_FIELDS} | (columns or {})
+    id_map = build_id_map(source, fmt, columns["id"])
+    shards = assign_shards(source, fmt, id_map, columns, shard_size) if shard_size else None
+
+    writers: List[_PlanStreamWriter] = []
+    try:
+        for row, task in enumerate(iter_tasks(source, fmt, id_map, columns)):
+            shard = shards[row] if shards else 0
+            # Shards start in order, since groups fill them in order of their first task
+            if shard == len(writers):
+                index = shard + 1
+                path = shard_path(target, index) if shard_size else target
+                shard_name = f"{name} ({index})" if shard_size else name
+                writers.append(_PlanStreamWriter(path, shard_name, version))
+            writers[shard].add(task)
+        if not writers:
+            writers.append(_PlanStreamWriter(target, name, version))
+    except BaseException:
+        for writer in writers:
+            writer.discard()
+        raise
+
+    for writer in writers:
+        writer.close()
+    return [(writer.target, writer.count) for writer in writers]
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Task leasing so several agents can pull work from one plan concurrently.
+
+An agent *claims* the highest-priority ready task that nobody else holds,
+keeps the lease alive with *heartbeats* and *releases* it when done. Leases
+expire on their own, so a crashed agent cannot block a task forever.
+
+Leases live in a small SQLite database under `.metsuke/` rather than in the
+plan file: every claim is one short `BEGIN IMMEDIATE` transaction that
+updates a single row, so concurrent agents never rewrite the plan or lose
+each other's updates.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from .core import METSUKE_DIR_NAME, PLANS_DIR_NAME
+from .exceptions import LeaseError
+from .models import Project
+from .table import TaskTable
+
+LEASES_DB_NAME = "leases.db"
+DEFAULT_LEASE_TTL = 15 * 60  # seconds
+# How long a writer waits for another agent's transaction to finish
+BUSY_TIMEOUT = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    plan TEXT NOT NULL,
+    task_id INTEGER NOT NULL,
+    agent TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (plan, task_id)
+)
+"""
+
+
+class Lease(NamedTuple):
+    """A task held by an agent until `expires_at` (Unix time)."""
+
+    plan: str
+    task_id: int
+    agent: str
+    expires_at: float
+
+
+class LeaseStore:
+    """Lock-protected store of task leases, shared by all agents on a machine."""
+
+    def __init__(self, db_path: Path, ttl: float = DEFAULT_LEASE_TTL):
+        self.db_path = db_path
+        self.ttl = ttl
+
+    @classmethod
+    def for_directory(cls, base_dir: Path, ttl: float = DEFAULT_LEASE_TTL) -> "LeaseStore":
+        """Returns the store kept in `base_dir/.metsuke/`."""
+        return cls(base_dir / METSUKE_DIR_NAME / LEASES_DB_NAME, ttl=ttl)
+
+    @classmethod
+    def for_plan(cls, plan_path: Path, ttl: float = DEFAULT_LEASE_TTL) -> "LeaseStore":
+        """Returns the store of the project `plan_path` belongs to.
+
+        The project root is the plan's directory, or its parent for plans
+        under `plans/`, so agents started anywhere share one store.
+        """
+        base_dir = plan_path.resolve().parent
+        if base_dir.name == PLANS_DIR_NAME:
+            base_dir = base_dir.parent
+        return cls.for_directory(base_dir, ttl=ttl)
+
+    @staticmethod
+    def plan_key(plan_path: Path) -> str:
+        """Leases are keyed by the plan's resolved path."""
+        return str(plan_path.resolve())
+
+    def _connect(self) -> sqlite3.Connection:
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit mode; transactions are opened explicitly below
+            conn = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            return conn
+        except (OSError, sqlite3.Error) as e:
+            raise LeaseError(f"Cannot open lease store {self.db_path}: {e}") from e
+
+    def _transaction(self, conn: sqlite3.Connection, work):
+        """Runs `work(conn, now)` inside one write-locked transaction."""
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+                result = work(conn, now)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+        except sqlite3.Error as e:
+            raise LeaseError(f"Lease store error in {self.db_path}: {e}") from e
+        finally:
+            conn.close()
+
+    def claim(self, plan_path: Path, project: Project, agent: str, ttl: Optional[float] = None) -> Optional[Lease]:
+        """Leases the best ready task not held by anyone, or returns None.
+
+        Candidates are ordered like the TUI's suggested next task: open tasks
+        whose dependencies are all Done, by priority and then id.
+        """
+        table = TaskTable.from_project(project)
+        candidates = [table.ids[row] for row in table.ready_rows()]
+        plan = self.plan_key(plan_path)
+        ttl = self.ttl if ttl is None else ttl
+
+        def work(conn, now):
+            held = {row[0] for row in conn.execute("SELECT task_id FROM leases WHERE plan = ?", (plan,))}
+            for task_id in candidates:
+                if task_id not in held:
+                    lease = Lease(plan, task_id, agent, now + ttl)
+                    conn.execute("INSERT INTO leases VALUES (?, ?, ?, ?)", lease)
+                    return lease
+            return None
+
+        return self._transaction(self._connect(), work)
+
+    def heartbeat(self, plan_path: Path, task_id: int, agent: str, ttl: Optional[float] = None) -> Optional[Lease]:
+        """Extends `agent`'s lease on a task. Returns None if it is not held (or expired)."""
+        plan = self.plan_key(plan_path)
+        ttl = self.ttl if ttl is None else ttl
+
+        def work(conn, now):
+            cursor = conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE plan = ? AND task_id = ? AND agent = ?",
+                (now + ttl, plan, task_id, agent),
+            )
+            return Lease(plan, task_id, agent, now + ttl) if cursor.rowcount else None
+
+        return self._transaction(self._connect(), work)
+
+    def release(self, plan_path: Path, task_id: int, agent: str) -> bool:
+        """Drops `agent`'s lease on a task. Returns False if it was not held."""
+        plan = self.plan_key(plan_path)
+
+        def work(conn, now):
+            cursor = conn.execute(
+                "DELETE FROM leases WHERE plan = ? AND task_id = ? AND agent = ?",
+                (plan, task_id, agent),
+            )
+            return cursor.rowcount > 0
+
+        return self._transaction(self._connect(), work)
+
+    def active(self, plan_path: Path) -> List[Lease]:
+        """Returns the unexpired leases for a plan."""
+        plan = self.plan_key(plan_path)
+
+        def work(conn, now):
+            rows = conn.execute(
+                "SELECT plan, task_id, agent, expires_at FROM leases WHERE plan = ? ORDER BY task_id",
+                (plan,),
+            )
+            return [Lease(*row) for row in rows]
+
+        return self._transaction(self._connect(), work)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Memory accounting for loaded plans and the TUI.
+
+Two measures, used by `metsuke diagnostics --memory` and the TUI's timings
+panel:
+
+* `deep_sizeof` sizes an object graph with `sys.getsizeof`, following
+  `gc.get_referents` and counting every object once. Types, modules and
+  functions are not followed, so only instance data is counted. It is
+  cheap enough to run on a live workspace and attributes bytes to parts of
+  a plan (`plan_footprint`): tasks, loaded descriptions, the source
+  snapshot kept for merging, and derived-data caches.
+* `traced` runs an operation under `tracemalloc` and reports the bytes it
+  allocated and kept, including allocator overhead that object sizes miss.
+
+Lazily loaded descriptions in a memory-mapped file are page cache, not
+heap; they are reported as `mapped_bytes` and not counted in `total_bytes`.
+"""
+
+import gc
+import mmap
+import sys
+import tracemalloc
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple, TypeVar
+
+from .models import Project
+
+T = TypeVar("T")
+
+# Shared, immutable or code objects; never attributed to a plan
+_NOT_FOLLOWED = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+
+def deep_sizeof(*roots: Any, seen: Optional[Set[int]] = None) -> int:
+    """Bytes of `roots` and everything they reference, skipping ids in `seen`.
+
+    `seen` is updated, so sizing several parts with one set attributes
+    shared objects to the first part that reaches them.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _NOT_FOLLOWED) or obj is None:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if not isinstance(obj, (str, bytes, int, float, mmap.mmap)):
+            stack.extend(gc.get_referents(obj))
+    return total
+
+
+def plan_footprint(plans: Iterable[Project], seen: Optional[Set[int]] = None) -> Dict[str, int]:
+    """Bytes held by `plans`, split by part (see module docstring).
+
+    Keys: `plans`, `tasks`, `descriptions_bytes`, `tasks_bytes`,
+    `source_snapshot_bytes`, `cache_bytes`, `other_bytes` (the plan objects
+    and project metadata), `total_bytes`, `bytes_per_task` and
+    `mapped_bytes`.
+    """
+    seen = set() if seen is None else seen
+    plans = [plan for plan in plans if plan is not None]
+    footprint = dict.fromkeys(("descriptions_bytes", "tasks_bytes", "source_snapshot_bytes",
+                               "cache_bytes", "other_bytes", "mapped_bytes"), 0)
+    mappings: Dict[int, int] = {}
+    for plan in plans:
+        for task in plan.tasks:
+            # Reading `description` would load a lazy one; size what is held
+            lazy = task._lazy_description
+            if lazy is None:
+                footprint["descriptions_bytes"] += deep_sizeof(task.__dict__["description"], seen=seen)
+            else:
+                buffer = getattr(lazy, "_mapping", None)
+                if isinstance(buffer, mmap.mmap):
+                    mappings[id(buffer)] = len(buffer)
+                footprint["descriptions_bytes"] += deep_sizeof(lazy, seen=seen)
+        footprint["tasks_bytes"] += deep_sizeof(plan.tasks, seen=seen)
+        footprint["source_snapshot_bytes"] += deep_sizeof(plan.source, seen=seen)
+        footprint["cache_bytes"] += deep_sizeof(plan.cache, seen=seen)
+        footprint["other_bytes"] += deep_sizeof(plan, seen=seen)
+    footprint["mapped_bytes"] = sum(mappings.values())
+    task_count = sum(len(plan.tasks) for plan in plans)
+    total = sum(value for key, value in footprint.items() if key != "mapped_bytes")
+    footprint.update(
+        plans=len(plans), tasks=task_count, total_bytes=total,
+        bytes_per_task=total // task_count if task_count else 0,
+    )
+    return footprint
+
+
+def traced(operation: Callable[[], T]) -> Tuple[T, int, int]:
+    """Runs `operation` under tracemalloc.
+
+    Returns its result, the bytes it allocated and still holds afterwards,
+    and its peak allocation. Tracing is started and stopped around the call
+    unless it was already running.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        gc.collect()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        result = operation()
+        gc.collect()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started:
+            tracemalloc.stop()
+    return result, after - before, peak - before
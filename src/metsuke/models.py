@@ -4,13 +4,27 @@
 # TypedDicts are included for potential use by the TUI if direct dict access is preferred,
 # but using Pydantic model instances (.project.name etc.) is recommended.
 
-from typing import List, Optional, TypedDict, Literal
+import threading
+from typing import Any, Dict, List, Optional, TypedDict, Literal
 from datetime import datetime
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, PrivateAttr, field_serializer, validator, model_validator
 
 
 # --- Pydantic Models (Used by core.py for validation) ---
 
+class Estimate(BaseModel):
+    """Three-point duration estimate for a task, in hours."""
+    min: float = Field(ge=0)
+    likely: float = Field(ge=0)
+    max: float = Field(ge=0)
+
+    @model_validator(mode='after')
+    def check_order(self) -> 'Estimate':
+        if not (self.min <= self.likely <= self.max):
+            raise ValueError('Estimate must satisfy min <= likely <= max')
+        return self
+
+
 class Task(BaseModel):
     id: int
     title: str
@@ -20,6 +34,10 @@ class Task(BaseModel):
     dependencies: List[int] = Field(default_factory=list)
     # --- Fields for time tracking (example) ---
     time_spent_seconds: float = 0.0
+    # --- Optional three-point estimate used by schedule forecasting ---
+    estimate: Optional[Estimate] = None
+    # Description still in the plan file (see `defer_description`)
+    _lazy_description: Any = PrivateAttr(default=None)
     # Note: current_session_start_time is intentionally not included here 
     # as it's runtime state, not persisted.
 
@@ -31,6 +49,47 @@ class Task(BaseModel):
     #         raise ValueError(f'Status must be one of {allowed_statuses}')
     #     return v
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == 'description':
+            # An explicit description replaces one still waiting in the file
+            self._lazy_description = None
+        super().__setattr__(name, value)
+
+    @field_serializer('description')
+    def _serialize_description(self, value: Optional[str]) -> Optional[str]:
+        if value is None and self._lazy_description is not None:
+            return self._lazy_description.load()
+        return value
+
+    def defer_description(self, lazy: Any) -> None:
+        """Replaces the description with `lazy` (anything with `load() -> str`),
+        read each time `description` is read or dumped until it is assigned."""
+        super().__setattr__('description', None)
+        self._lazy_description = lazy
+
+
+class _DeferredDescription:
+    """`Task.description`: the stored value, or the deferred text if there is none.
+
+    A data descriptor, so it takes precedence over the instance `__dict__`
+    pydantic keeps fields in; assignments still go through
+    `Task.__setattr__` and pydantic.
+    """
+
+    def __get__(self, task: Optional[Task], owner: Any = None) -> Any:
+        if task is None:
+            return self
+        value = task.__dict__.get('description')
+        if value is None and task._lazy_description is not None:
+            return task._lazy_description.load()
+        return value
+
+    def __set__(self, task: Task, value: Any) -> None:
+        task.__dict__['description'] = value
+
+
+Task.description = _DeferredDescription()  # type: ignore[assignment]
+
 
 class ProjectMeta(BaseModel):
     name: str
@@ -38,11 +97,100 @@ class ProjectMeta(BaseModel):
     license: Optional[str] = None
 
 
+class PlanCache:
+    """Derived data (indexes, summaries) cached alongside a loaded plan.
+
+    A cache is never part of a plan's identity: two caches always compare
+    equal, so plans loaded from identical files still compare equal. Copies
+    (and pickles) of a plan start with an empty cache.
+
+    `generation` changes on every `clear`. Builders that may run in another
+    thread read it before building and pass it to `set`, which then drops
+    the value if the plan was changed (and the cache cleared) meanwhile.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def get(self, key: str) -> Any:
+        return self._entries.get(key)
+
+    def set(self, key: str, value: Any, generation: Optional[int] = None) -> bool:
+        """Stores `value`, unless `generation` is given and no longer current; returns whether it was stored."""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[key] = value
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def __reduce__(self):
+        return PlanCache, ()
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, PlanCache)
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+class PlanSource:
+    """Fingerprint of the file contents a plan was loaded from (or last saved as).
+
+    `digest` is the SHA-256 of the file and `content` its bytes (or the
+    memory map they were read through), kept so that `save_plan` can parse
+    the common base when merging concurrent edits; nothing is parsed unless
+    the file has changed. Plans too large to keep a copy of (streamed
+    loads) have only the digest. Like `PlanCache`, it never takes part in
+    plan equality.
+    """
+
+    __slots__ = ("digest", "content")
+
+    def __init__(self, digest: Optional[str] = None, content: Optional[Any] = None) -> None:
+        self.digest = digest
+        self.content = content
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, PlanSource)
+
+    __hash__ = None  # type: ignore[assignment]
+
+
 class Project(BaseModel):
     project: ProjectMeta
     context: Optional[str] = None
     tasks: List[Task] = Field(default_factory=list)
     focus: bool = False
+    # Task id -> archive file (next to the plan) for tasks moved out by `metsuke archive`
+    archived: Dict[int, str] = Field(default_factory=dict)
+
+    _cache: PlanCache = PrivateAttr(default_factory=PlanCache)
+    _source: PlanSource = PrivateAttr(default_factory=PlanSource)
+
+    @property
+    def cache(self) -> PlanCache:
+        """Derived data built from this plan version (see `invalidate_cache`)."""
+        return self._cache
+
+    def invalidate_cache(self) -> None:
+        """Drops derived data. Call after changing tasks or dependencies in place."""
+        self._cache.clear()
+
+    @property
+    def source(self) -> PlanSource:
+        """The on-disk version this plan was loaded from; empty for plans built in memory."""
+        return self._source
+
+    def record_source(self, digest: str, content: Optional[Any] = None) -> None:
+        """Marks the current contents as matching the file with the given
+        digest, whose bytes (or memory map) are `content` if given."""
+        self._source = PlanSource(digest, content)
 
 
 # --- TypedDict Definitions (Mirroring Pydantic for TUI type hints if needed) ---
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Batch operation logs (JSON Lines) applied to a plan through a `PlanSession`.
+
+Each line is one JSON object with an `op` and its arguments::
+
+    {"op": "add", "title": "Write docs", "priority": "high", "ref": "docs"}
+    {"op": "add", "title": "Publish", "dependencies": ["@docs", 12]}
+    {"op": "set_status", "id": "10..250", "status": "Done"}
+    {"op": "update", "id": [3, 7], "set": {"priority": "low"}}
+    {"op": "add_dependency", "id": "@docs", "dependency": 4}
+    {"op": "delete", "id": 99}
+
+`id` selects tasks: a single id, an inclusive range `"A..B"` (ids in the
+range that exist), `"@name"` for a task added earlier in the same log with
+`"ref": "name"`, or a list of any of these. Blank lines and lines starting
+with `#` are skipped. Any error aborts the whole log, reporting its line.
+"""
+
+import json
+from collections import Counter
+from typing import Any, Dict, Iterable, List
+
+from .exceptions import PlanValidationError
+from .session import PlanSession
+
+OPERATIONS = ("add", "update", "set_status", "add_dependency", "delete")
+
+
+def _resolve_id(session: PlanSession, refs: Dict[str, int], value: Any) -> int:
+    if isinstance(value, str) and value.startswith("@"):
+        if value[1:] not in refs:
+            raise PlanValidationError(f"Unknown reference '{value}'")
+        return refs[value[1:]]
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise PlanValidationError(f"Invalid task id {value!r}")
+    try:
+        return int(value)
+    except ValueError:
+        raise PlanValidationError(f"Invalid task id {value!r}") from None
+
+
+def select_ids(session: PlanSession, refs: Dict[str, int], selector: Any) -> List[int]:
+    """Expands an `id` selector into task ids (see module docstring)."""
+    if isinstance(selector, list):
+        ids: List[int] = []
+        for item in selector:
+            ids.extend(select_ids(session, refs, item))
+        return ids
+    if isinstance(selector, str) and ".." in selector:
+        start, _, end = selector.partition("..")
+        try:
+            first, last = int(start), int(end)
+        except ValueError:
+            raise PlanValidationError(f"Invalid id range '{selector}'") from None
+        return [task_id for task_id in range(first, last + 1) if task_id in session]
+    return [_resolve_id(session, refs, selector)]
+
+
+def _apply_one(session: PlanSession, refs: Dict[str, int], op: Dict[str, Any]) -> str:
+    """Applies one parsed operation and returns the counter it should bump."""
+    kind = op.get("op")
+    if kind == "add":
+        fields = {key: value for key, value in op.items() if key not in ("op", "ref")}
+        if "title" not in fields:
+            raise PlanValidationError("'add' needs a title")
+        if "id" in fields:
+            fields["task_id"] = _resolve_id(session, refs, fields.pop("id"))
+        fields["dependencies"] = [_resolve_id(session, refs, dep) for dep in fields.get("dependencies", [])]
+        task_id = session.add(**fields)
+        if "ref" in op:
+            refs[str(op["ref"])] = task_id
+        return "added"
+
+    if kind not in OPERATIONS:
+        raise PlanValidationError(f"Unknown operation {kind!r} (expected one of {', '.join(OPERATIONS)})")
+    if "id" not in op:
+        raise PlanValidationError(f"'{kind}' needs an id")
+    task_ids = select_ids(session, refs, op["id"])
+
+    if kind == "update":
+        changes = op.get("set")
+        if not isinstance(changes, dict) or not changes:
+            raise PlanValidationError("'update' needs a non-empty 'set' object")
+        if "dependencies" in changes:
+            changes = dict(changes, dependencies=[_resolve_id(session, refs, dep) for dep in changes["dependencies"]])
+        for task_id in task_ids:
+            session.update(task_id, **changes)
+        return "updated"
+    if kind == "set_status":
+        for task_id in task_ids:
+            session.set_status(task_id, op.get("status"))
+        return "updated"
+    if kind == "add_dependency":
+        dependency_id = _resolve_id(session, refs, op.get("dependency"))
+        for task_id in task_ids:
+            session.add_dependency(task_id, dependency_id)
+        return "updated"
+    # One batch, so tasks selected together may depend on each other
+    session.delete_many(task_ids)
+    return "deleted"
+
+
+def apply_operations(session: PlanSession, lines: Iterable[str]) -> Counter:
+    """Applies an operation log to an active session, line by line.
+
+    Returns counts of operations by outcome ("added", "updated",
+    "deleted"). Raises `PlanValidationError` naming the offending line; the
+    caller decides whether to commit or roll back.
+    """
+    refs: Dict[str, int] = {}
+    counts: Counter = Counter()
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            op = json.loads(line)
+            if not isinstance(op, dict):
+                raise PlanValidationError("expected a JSON object")
+            counts[_apply_one(session, refs, op)] += 1
+        except json.JSONDecodeError as e:
+            raise PlanValidationError(f"Line {line_number}: invalid JSON: {e}") from e
+        except (PlanValidationError, TypeError) as e:
+            raise PlanValidationError(f"Line {line_number}: {e}") from e
+    return counts
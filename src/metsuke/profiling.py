@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""Profiling hooks for the CLI and the TUI.
+
+`CommandProfile` backs the global `metsuke --profile` option: it runs the
+command under cProfile and a `SamplingProfiler`, then writes a `.pstats`
+file (open with `python -m pstats` or snakeviz) and a `.collapsed` file of
+folded stacks ("outer;inner;leaf count" lines, the input format of
+flamegraph.pl and speedscope).
+
+`SamplingProfiler` is signal based: `ITIMER_PROF` fires SIGPROF every
+`interval` seconds of process CPU time, and the handler records the Python
+stack of every thread. An idle process is never sampled, and the cost while
+running is one stack walk per interval. With `focus` set, only samples taken
+inside one of the given functions are kept, starting from that frame; the
+TUI uses this to profile `update_ui`, `load_plans` and `save_plan`.
+
+Signal handlers can only be installed from the main thread, and SIGPROF is
+not available on Windows; `start` raises `ProfilerUnavailableError` there.
+"""
+
+import cProfile
+import inspect
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from .core import METSUKE_DIR_NAME
+from .exceptions import ProfilerUnavailableError
+
+PROFILES_DIR_NAME = "profiles"
+# Seconds of CPU time between samples
+DEFAULT_SAMPLE_INTERVAL = 0.005
+# Frames walked per sample; deeper (outermost) frames are dropped
+MAX_STACK_DEPTH = 256
+
+
+def default_profile_dir(base_dir: Path) -> Path:
+    """Returns the profile directory `base_dir/.metsuke/profiles/`."""
+    return base_dir / METSUKE_DIR_NAME / PROFILES_DIR_NAME
+
+
+def profile_stem(label: str) -> str:
+    """File name stem for a new profile, e.g. `tui-20250101-120000`."""
+    return f"{label}-{time.strftime('%Y%m%d-%H%M%S')}"
+
+
+def _frame_label(code: CodeType) -> str:
+    path = Path(code.co_filename)
+    return f"{code.co_name} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+
+
+def _focus_codes(functions: Iterable[Callable]) -> frozenset:
+    codes = set()
+    for function in functions:
+        function = getattr(function, "__func__", function)  # bound methods
+        function = inspect.unwrap(function)  # e.g. timing.timed
+        codes.add(function.__code__)
+    return frozenset(codes)
+
+
+class SamplingProfiler:
+    """Counts folded stacks sampled on SIGPROF (see module docstring)."""
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL,
+                 focus: Optional[Iterable[Callable]] = None) -> None:
+        self.interval = interval
+        self.focus = _focus_codes(focus) if focus is not None else None
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._previous_handler = None
+        self.running = False
+
+    def start(self) -> None:
+        if not hasattr(signal, "SIGPROF"):
+            raise ProfilerUnavailableError("Sampling needs SIGPROF, which this platform does not have.")
+        if threading.current_thread() is not threading.main_thread():
+            raise ProfilerUnavailableError("The sampling profiler can only be started from the main thread.")
+        if self.running:
+            return
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        self.running = True
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        self.running = False
+
+    def _sample(self, signum: int, frame: Optional[FrameType]) -> None:
+        own_thread = threading.get_ident()
+        for thread_id, thread_frame in sys._current_frames().items():
+            # The handler runs on the main thread; sample its interrupted frame
+            stack = self._stack(frame if thread_id == own_thread else thread_frame)
+            if stack:
+                self._stacks[stack] += 1
+                self.samples += 1
+
+    def _stack(self, frame: Optional[FrameType]) -> Optional[Tuple[CodeType, ...]]:
+        codes: List[CodeType] = []
+        while frame is not None and len(codes) < MAX_STACK_DEPTH:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+        if self.focus is None:
+            return tuple(codes)
+        for index, code in enumerate(codes):
+            if code in self.focus:
+                return tuple(codes[index:])
+        return None
+
+    def collapsed(self) -> List[str]:
+        """The samples as folded-stack lines, most frequent first."""
+        return [
+            f"{';'.join(_frame_label(code) for code in stack)} {count}"
+            for stack, count in self._stacks.most_common()
+        ]
+
+    def dump(self, path: Path) -> Path:
+        """Writes the folded stacks to `path` (parent directories are created)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = self.collapsed()
+        path.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8")
+        return path
+
+
+class CommandProfile:
+    """cProfile plus stack sampling around one CLI command (`metsuke --profile`)."""
+
+    def __init__(self, directory: Path, label: str,
+                 interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        self.directory = directory
+        self.label = label
+        self.profiler = cProfile.Profile()
+        self.sampler = SamplingProfiler(interval)
+        self.sampling = False
+
+    def start(self) -> None:
+        try:
+            self.sampler.start()
+            self.sampling = True
+        except ProfilerUnavailableError:
+            self.sampling = False
+        self.profiler.enable()
+
+    def stop(self) -> List[Path]:
+        """Stops profiling and returns the files written."""
+        self.profiler.disable()
+        self.sampler.stop()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = profile_stem(self.label)
+        stats_path = self.directory / f"{stem}.pstats"
+        self.profiler.dump_stats(str(stats_path))
+        written = [stats_path]
+        if self.sampling:
+            written.append(self.sampler.dump(self.directory / f"{stem}.collapsed"))
+        return written
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""Transitive dependency queries backed by a bitset reachability index.
+
+`Task.dependencies` only lists direct prerequisites. A `ReachabilityIndex`
+stores, for every task, the set of tasks it transitively depends on and the
+set of tasks that transitively depend on it, each as a Python int used as a
+bitset over table rows. Once built, "does A transitively block B?" is a
+single bit test and listing a closure only walks the set bits.
+
+The index is built once per plan version and cached on the `Project`
+(see `ReachabilityIndex.for_project`); call `Project.invalidate_cache()`
+after changing dependencies in place.
+"""
+
+from typing import List
+
+from .models import Project
+from .schedule import _dependents_csr
+from .table import TaskTable
+
+CACHE_KEY = "reachability"
+
+
+def _bits_to_rows(bits: int) -> List[int]:
+    """Returns the indices of the set bits, lowest first."""
+    # One pass over the binary digits, least significant first
+    return [row for row, digit in enumerate(bin(bits)[:1:-1]) if digit == "1"]
+
+
+def _components(neighbours: List[List[int]], n: int) -> List[List[int]]:
+    """Strongly connected components, each after every component it reaches.
+
+    Iterative Tarjan, so deep dependency chains do not hit the recursion
+    limit.
+    """
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+    for root in range(n):
+        if index[root] >= 0:
+            continue
+        work = [(root, 0)]
+        while work:
+            row, next_edge = work.pop()
+            if next_edge == 0:
+                index[row] = low[row] = counter
+                counter += 1
+                stack.append(row)
+                on_stack[row] = True
+            edges = neighbours[row]
+            while next_edge < len(edges):
+                other = edges[next_edge]
+                next_edge += 1
+                if index[other] < 0:
+                    work.append((row, next_edge))
+                    work.append((other, 0))
+                    break
+                if on_stack[other]:
+                    low[row] = min(low[row], index[other])
+            else:
+                if low[row] == index[row]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == row:
+                            break
+                    components.append(component)
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[row])
+    return components
+
+
+def _closure(neighbours: List[List[int]], n: int) -> List[int]:
+    """Bitset of everything reachable through `neighbours`, for every row.
+
+    Works on the condensation: every member of a strongly connected component
+    (a dependency cycle) reaches the same rows, and components are visited
+    after everything they reach, so each is resolved in one pass.
+    """
+    reach = [0] * n
+    for component in _components(neighbours, n):
+        bits = 0
+        for row in component:
+            for other in neighbours[row]:
+                bits |= reach[other] | (1 << other)
+        for row in component:
+            reach[row] = bits
+    return reach
+
+
+class ReachabilityIndex:
+    """Transitive closure of a plan's dependency graph, in both directions."""
+
+    __slots__ = ("table", "_ancestors", "_descendants")
+
+    def __init__(self, table: TaskTable) -> None:
+        self.table = table
+        n = len(table)
+        dep_rows = table.dependency_rows().tolist()
+        offsets = table.dep_offsets.tolist()
+        parents = [
+            [parent for parent in dep_rows[offsets[row]:offsets[row + 1]] if parent >= 0]
+            for row in range(n)
+        ]
+        rev_offsets, children_flat = _dependents_csr(table)
+        children = [children_flat[rev_offsets[row]:rev_offsets[row + 1]] for row in range(n)]
+
+        self._ancestors = _closure(parents, n)
+        self._descendants = _closure(children, n)
+
+    @classmethod
+    def for_project(cls, project: Project) -> "ReachabilityIndex":
+        """Returns the index cached on `project`, building it on first use."""
+        index = project.cache.get(CACHE_KEY)
+        if index is None:
+            generation = project.cache.generation
+            index = cls(TaskTable.from_project(project))
+            # Not cached if the plan was edited while this was being built
+            project.cache.set(CACHE_KEY, index, generation)
+        return index
+
+    def _row(self, task_id: int) -> int:
+        row = self.table.row_of(task_id)
+        if row is None:
+            raise KeyError(task_id)
+        return row
+
+    def __contains__(self, task_id: int) -> bool:
+        return self.table.row_of(task_id) is not None
+
+    def depends_on(self, task_id: int, other_id: int) -> bool:
+        """True if `task_id` transitively depends on `other_id`."""
+        return bool(self._ancestors[self._row(task_id)] >> self._row(other_id) & 1)
+
+    def transitive_dependencies(self, task_id: int) -> List[int]:
+        """Ids of every task `task_id` transitively depends on (table order)."""
+        ids = self.table.ids
+        return [ids[row] for row in _bits_to_rows(self._ancestors[self._row(task_id)])]
+
+    def transitive_dependents(self, task_id: int) -> List[int]:
+        """Ids of every task that transitively depends on `task_id` (table order)."""
+        ids = self.table.ids
+        return [ids[row] for row in _bits_to_rows(self._descendants[self._row(task_id)])]
+
+    def count_dependencies(self, task_id: int) -> int:
+        """Number of tasks `task_id` transitively depends on."""
+        return self._ancestors[self._row(task_id)].bit_count()
+
+    def count_dependents(self, task_id: int) -> int:
+        """Number of tasks that transitively depend on `task_id`."""
+        return self._descendants[self._row(task_id)].bit_count()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Recovering what parses from plan files that are not valid YAML.
+
+One bad indent or stray quote makes a whole plan unparseable, which is how
+agents most often damage plans. `salvage_plan` splits the text by lines
+instead of parsing it as a whole:
+
+* top-level sections start at any unindented `key:` line, except keys that
+  are task fields (a task field that lost its indent damages only its task);
+* the `tasks:` section is split into one chunk per list item, an item
+  starting at any `- ` line indented less than its siblings' fields (any
+  other line that far out starts a stray chunk of its own);
+* every section and task chunk is parsed on its own.
+
+Chunks that do not parse are dropped and listed in `Salvage.lost` with their
+line range and, when it can be read off the text, the task id and title.
+Each line is visited once and each chunk parsed once, so the cost is linear
+in the size of the file. `metsuke repair` (`repair_yaml_file(salvage=True)`)
+falls back to this when a plan does not parse at all; loading never does,
+since dropping tasks is only acceptable when the user asked for a repair.
+"""
+
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import yaml
+
+from .models import Task
+from .streaming import CoreSchemaLoader
+
+_SECTION = re.compile(r"^([A-Za-z_][\w-]*)[ \t]*:(?:[ \t]|$)")
+_ITEM = re.compile(r"^( *)-(?:[ \t]|$)")
+_TASK_ID = re.compile(r"^[ \t-]*id[ \t]*:[ \t]*['\"]?(\d+)")
+_TASK_TITLE = re.compile(r"^[ \t-]*title[ \t]*:[ \t]*(.+?)[ \t]*$")
+_DOCUMENT_MARKER = re.compile(r"^(?:---|\.\.\.)(?:[ \t]|$)")
+_TASK_FIELDS = frozenset(Task.model_fields)
+
+
+class LostChunk(NamedTuple):
+    """A section or task that could not be parsed; lines are 1-based and inclusive."""
+
+    section: str
+    start_line: int
+    end_line: int
+    task_id: Optional[int]
+    title: Optional[str]
+    error: str
+
+    def describe(self) -> str:
+        if self.section != "tasks":
+            what = f"section '{self.section}'"
+        elif self.task_id is not None:
+            what = f"task {self.task_id}" + (f" ({self.title})" if self.title else "")
+        else:
+            what = "task" + (f" ({self.title})" if self.title else "")
+        return f"{what} at lines {self.start_line}-{self.end_line}: {self.error}"
+
+
+class Salvage(NamedTuple):
+    """Outcome of `salvage_plan`: the plan data that parsed (None if nothing
+    did), the number of tasks kept and what was lost."""
+
+    data: Optional[Dict[str, Any]]
+    tasks_kept: int
+    lost: List[LostChunk]
+
+
+def _parse(lines: List[str], start: int, end: int) -> Any:
+    return yaml.load("".join(lines[start:end]), Loader=CoreSchemaLoader)
+
+
+def _error(e: yaml.YAMLError, start: int, end: int) -> str:
+    """The parser's problem, with its line in the file (within the chunk `start:end`)."""
+    problem = getattr(e, "problem", None) or str(e).splitlines()[0]
+    mark = getattr(e, "problem_mark", None)
+    return f"{problem} (line {min(mark.line + start, end - 1) + 1})" if mark is not None else problem
+
+
+def _sections(lines: List[str]) -> List[Tuple[str, int, int]]:
+    """(key, start, end) line ranges of the top-level sections, 0-based, end exclusive."""
+    sections: List[Tuple[str, int, int]] = []
+    key, start = None, 0
+    for index, line in enumerate(lines):
+        match = _SECTION.match(line)
+        if match is None or match.group(1) in _TASK_FIELDS:
+            continue
+        if key is not None:
+            sections.append((key, start, index))
+        key, start = match.group(1), index
+    if key is not None:
+        sections.append((key, start, len(lines)))
+    return sections
+
+
+def _task_chunks(lines: List[str], start: int, end: int) -> List[Tuple[int, int]]:
+    """Line ranges of the items of the `tasks:` section at `start`.
+
+    A line that is no item but is indented no further than the items (say,
+    a field that lost its indent) gets a range of its own, so that it only
+    loses itself and not the task before it.
+    """
+    item_indent: Optional[int] = None
+    starts: List[int] = []
+    for index in range(start + 1, end):
+        line = lines[index]
+        match = _ITEM.match(line)
+        if match is None:
+            stripped = line.lstrip(" ")
+            if (item_indent is not None and stripped.strip() and not stripped.startswith("#")
+                    and len(line) - len(stripped) <= item_indent):
+                starts.append(index)
+            continue
+        indent = len(match.group(1))
+        if item_indent is None:
+            item_indent = indent
+        # Fields of an item are indented at least two past its dash
+        if indent < item_indent + 2:
+            starts.append(index)
+    return [(chunk_start, next_start) for chunk_start, next_start in zip(starts, starts[1:] + [end])]
+
+
+def _lost_task(lines: List[str], start: int, end: int, error: str) -> LostChunk:
+    task_id: Optional[int] = None
+    title: Optional[str] = None
+    for line in lines[start:end]:
+        if task_id is None and (match := _TASK_ID.match(line)):
+            task_id = int(match.group(1))
+        elif title is None and (match := _TASK_TITLE.match(line)):
+            title = match.group(1).strip("'\"")
+        if task_id is not None and title is not None:
+            break
+    # Trailing blank and comment lines belong to no task
+    while end - 1 > start and (not lines[end - 1].strip() or lines[end - 1].lstrip().startswith("#")):
+        end -= 1
+    return LostChunk("tasks", start + 1, end, task_id, title, error)
+
+
+def _salvage_tasks(lines: List[str], start: int, end: int, lost: List[LostChunk]) -> Optional[List[Any]]:
+    """Parses the `tasks:` section item by item; None if it is not a block list."""
+    chunks = _task_chunks(lines, start, end)
+    if not chunks:
+        return None
+    tasks: List[Any] = []
+    for chunk_start, chunk_end in chunks:
+        try:
+            parsed = _parse(lines, chunk_start, chunk_end)
+        except yaml.YAMLError as e:
+            lost.append(_lost_task(lines, chunk_start, chunk_end, _error(e, chunk_start, chunk_end)))
+            continue
+        if not isinstance(parsed, list) or len(parsed) != 1:
+            lost.append(_lost_task(lines, chunk_start, chunk_end, "not a single list item"))
+            continue
+        tasks.append(parsed[0])
+    # Lines between `tasks:` and the first item (e.g. a broken inline value)
+    head = "".join(lines[start:chunks[0][0]]).split(":", 1)[1].strip()
+    if head and not head.startswith("#"):
+        lost.append(LostChunk("tasks", start + 1, chunks[0][0], None, None,
+                              f"unexpected text before the first task: {head[:40]!r}"))
+    return tasks
+
+
+def salvage_plan(text: str) -> Salvage:
+    """Recovers the sections and tasks of an unparseable plan (see module docstring)."""
+    lines = ["\n" if _DOCUMENT_MARKER.match(line) else line for line in text.splitlines(keepends=True)]
+    data: Dict[str, Any] = {}
+    lost: List[LostChunk] = []
+    tasks_kept = 0
+    for key, start, end in _sections(lines):
+        if key == "tasks":
+            tasks = _salvage_tasks(lines, start, end, lost)
+            if tasks is not None:
+                data["tasks"] = tasks
+                tasks_kept = len(tasks)
+                continue
+        try:
+            parsed = _parse(lines, start, end)
+        except yaml.YAMLError as e:
+            lost.append(LostChunk(key, start + 1, end, None, None, _error(e, start, end)))
+            continue
+        if isinstance(parsed, dict) and key in parsed:
+            data[key] = parsed[key]
+            if key == "tasks" and isinstance(parsed[key], list):
+                tasks_kept = len(parsed[key])
+        else:
+            lost.append(LostChunk(key, start + 1, end, None, None, "not a 'key: value' section"))
+    return Salvage(data or None, tasks_kept, lost)
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""Batched, all-or-nothing edits to a plan file.
+
+A `PlanSession` loads a plan once, applies any number of typed edits in
+memory and writes the result with a single atomic save when the `with`
+block ends. If the block raises, nothing is written::
+
+    with PlanSession(Path("PROJECT_PLAN.yaml")) as session:
+        for task_id in range(10, 210):
+            session.set_status(task_id, "Done")
+        new_id = session.add("Write release notes", priority="high", dependencies=[42])
+
+Each edit validates only the task it touches (schema, known dependency
+ids, no new cycles), so large batches stay cheap.
+"""
+
+from pathlib import Path
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from pydantic import ValidationError
+from ruamel.yaml import YAML
+
+from .core import _load_plan_file, _save_plan
+from .exceptions import PlanLoadingError, PlanValidationError
+from .models import Project, Task
+
+
+class PlanSession:
+    """Loads one plan, collects edits and commits them with one write.
+
+    Pass `project` to start from a plan that is already loaded (e.g. by
+    `load_plans`) instead of reading the file again; the session edits a
+    copy, so the original is unchanged if the session rolls back.
+    """
+
+    def __init__(self, filepath: Path, project: Optional[Project] = None) -> None:
+        self.filepath = filepath
+        self._project: Optional[Project] = None
+        self._loaded = project
+        self._tasks: Dict[int, Task] = {}
+        # How many tasks list each id as a dependency
+        self._dependents: Counter = Counter()
+        # Deleted tasks stay in `project.tasks` until `_compact` drops them in one pass
+        self._stale = False
+        self._next_id = 1
+
+    # --- Lifecycle ---
+
+    def __enter__(self) -> "PlanSession":
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def begin(self) -> None:
+        """Loads the plan, discarding any uncommitted edits."""
+        if self._loaded is not None:
+            self._project = self._loaded.model_copy(deep=True)
+        else:
+            try:
+                self._project = _load_plan_file(self.filepath, YAML(typ='rt'))
+            except (OSError, ValidationError) as e:
+                raise PlanLoadingError(f"Could not load plan {self.filepath}: {e}") from e
+        self._tasks = {task.id: task for task in self._project.tasks}
+        self._dependents = Counter(dep for task in self._project.tasks for dep in task.dependencies)
+        self._stale = False
+        # Archived ids stay reserved so references to them remain unambiguous
+        self._next_id = max(max(self._tasks, default=0), max(self._project.archived, default=0)) + 1
+
+    def commit(self) -> None:
+        """Writes all edits atomically.
+
+        Raises `PlanConflictError` (writing nothing) if the file was changed
+        concurrently in a way that conflicts with these edits.
+        """
+        project = self._compact()
+        _save_plan(project, self.filepath)
+
+    def rollback(self) -> None:
+        """Drops all edits; the file is left untouched."""
+        self._project = None
+        self._tasks = {}
+        self._dependents = Counter()
+        self._stale = False
+
+    # --- Queries ---
+
+    @property
+    def project(self) -> Optional[Project]:
+        """The edited plan, or None when no session is active."""
+        return self._compact() if self._project is not None else None
+
+    def get(self, task_id: int) -> Task:
+        """Returns a task, raising `PlanValidationError` for unknown ids."""
+        self._require_project()
+        task = self._tasks.get(task_id)
+        if task is None:
+            raise PlanValidationError(f"Task {task_id} not found in {self.filepath.name}")
+        return task
+
+    def __contains__(self, task_id: int) -> bool:
+        return task_id in self._tasks
+
+    @property
+    def next_id(self) -> int:
+        """Id that the next `add` will use."""
+        return self._next_id
+
+    # --- Edits ---
+
+    def add(self, title: str, priority: str = "medium", status: str = "pending",
+            description: Optional[str] = None, dependencies: Iterable[int] = (),
+            task_id: Optional[int] = None, **fields: Any) -> int:
+        """Adds a task and returns its id (the next free id unless given)."""
+        project = self._require_project()
+        if task_id is None:
+            task_id = self._next_id
+        elif task_id in self._tasks or task_id in project.archived:
+            raise PlanValidationError(f"Task {task_id} already exists in {self.filepath.name}")
+        self._check_fields(fields)
+        task = self._validate_task(dict(
+            fields, id=task_id, title=title, description=description, status=status,
+            priority=priority, dependencies=list(dependencies),
+        ))
+        self._check_dependencies(task, task.dependencies)
+        project.tasks.append(task)
+        self._tasks[task_id] = task
+        self._dependents.update(task.dependencies)
+        self._next_id = max(self._next_id, task_id + 1)
+        project.invalidate_cache()
+        return task_id
+
+    def update(self, task_id: int, **changes: Any) -> Task:
+        """Changes fields of a task (anything but its id) and returns the task."""
+        project = self._require_project()
+        old = self.get(task_id)
+        if changes.get("id", task_id) != task_id:
+            raise PlanValidationError("Task ids cannot be changed")
+        self._check_fields(changes)
+        task = self._validate_task({**old.model_dump(), **changes})
+        if "dependencies" in changes:
+            self._check_dependencies(task, [dep for dep in task.dependencies if dep not in old.dependencies])
+        if "dependencies" in changes:
+            self._dependents.subtract(old.dependencies)
+            self._dependents.update(task.dependencies)
+        # Copy the validated values onto the existing object; no list search needed
+        for field in changes:
+            setattr(old, field, getattr(task, field))
+        project.invalidate_cache()
+        return old
+
+    def set_status(self, task_id: int, status: str) -> Task:
+        return self.update(task_id, status=status)
+
+    def add_dependency(self, task_id: int, dependency_id: int) -> Task:
+        """Makes `task_id` depend on `dependency_id` (no-op if it already does)."""
+        task = self.get(task_id)
+        if dependency_id in task.dependencies:
+            return task
+        return self.update(task_id, dependencies=task.dependencies + [dependency_id])
+
+    def delete(self, task_id: int) -> None:
+        """Removes a task. Refused while other tasks still depend on it."""
+        self.delete_many([task_id])
+
+    def delete_many(self, task_ids: Iterable[int]) -> None:
+        """Removes several tasks at once.
+
+        Dependencies among the deleted tasks do not block each other; only
+        tasks that stay in the plan and depend on one of them do.
+        """
+        project = self._require_project()
+        removed = {task_id: self.get(task_id) for task_id in task_ids}
+        inside = Counter(dep for task in removed.values() for dep in task.dependencies if dep in removed)
+        for task_id in removed:
+            if self._dependents[task_id] > inside[task_id]:
+                dependents = [
+                    task.id for task in self._tasks.values()
+                    if task_id in task.dependencies and task.id not in removed
+                ]
+                raise PlanValidationError(
+                    f"Cannot delete task {task_id}: task(s) {', '.join(map(str, dependents))} depend on it"
+                )
+        for task_id, task in removed.items():
+            del self._tasks[task_id]
+            self._dependents.subtract(task.dependencies)
+        self._stale = self._stale or bool(removed)
+        project.invalidate_cache()
+
+    # --- Helpers ---
+
+    def _require_project(self) -> Project:
+        if self._project is None:
+            raise PlanLoadingError("PlanSession is not active; use it as a context manager or call begin()")
+        return self._project
+
+    def _compact(self) -> Project:
+        """Drops deleted tasks from `project.tasks`, keeping the original order."""
+        project = self._require_project()
+        if self._stale:
+            # Identity check: an id deleted and then re-added refers to the new task
+            project.tasks = [task for task in project.tasks if self._tasks.get(task.id) is task]
+            self._stale = False
+        return project
+
+    @staticmethod
+    def _check_fields(fields: Dict[str, Any]) -> None:
+        unknown = [field for field in fields if field not in Task.model_fields]
+        if unknown:
+            raise PlanValidationError(f"Unknown task field(s): {', '.join(unknown)}")
+
+    @staticmethod
+    def _validate_task(data: Dict[str, Any]) -> Task:
+        try:
+            return Task.model_validate(data)
+        except ValidationError as e:
+            raise PlanValidationError(f"Invalid task {data.get('id')}: {e}") from e
+
+    def _check_dependencies(self, task: Task, added: List[int]) -> None:
+        """Rejects unknown, self and cycle-forming dependencies newly added to `task`."""
+        for dependency_id in added:
+            if dependency_id == task.id:
+                raise PlanValidationError(f"Task {task.id} cannot depend on itself")
+            if dependency_id not in self._tasks and dependency_id not in self._project.archived:
+                raise PlanValidationError(f"Task {task.id} depends on unknown task {dependency_id}")
+        # A cycle needs a path back to this task, so only tasks that others depend on can close one
+        cycle = self._find_path(added, task.id) if self._dependents[task.id] > 0 else []
+        if cycle:
+            raise PlanValidationError(
+                f"Dependency cycle detected involving task(s): {', '.join(map(str, [task.id] + cycle))}"
+            )
+
+    def _find_path(self, start_ids: List[int], target_id: int) -> List[int]:
+        """Dependency chain from one of `start_ids` back to `target_id`, if any.
+
+        Only walks the ancestors of the new dependencies, so the cost is
+        bounded by the part of the graph the edit can affect.
+        """
+        parents: Dict[int, Optional[int]] = {start: None for start in start_ids}
+        stack = list(start_ids)
+        while stack:
+            current = stack.pop()
+            if current == target_id:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parents[current]
+                # path runs from target_id back to a start id
+                return path[:0:-1]
+            task = self._tasks.get(current)
+            if task is None:
+                continue
+            for parent in task.dependencies:
+                if parent not in parents:
+                    parents[parent] = current
+                    stack.append(parent)
+        return []
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""Streaming validation of plan files in memory bounded by one task.
+
+`load_plans` builds the whole YAML tree and then the whole `Project` before
+it reports anything, so a very large generated plan needs several times its
+size in memory. `validate_plan_stream` instead walks the PyYAML event
+stream (libyaml when available): top-level keys are read as usual, but each
+entry of `tasks` is composed, converted and validated on its own with a
+`Task` type adapter, then dropped (or handed to `on_task`). Problems are
+collected as `PlanIssue`s with the line they were found on.
+
+`load_plan_streaming` builds a `Project` this way, without the YAML tree
+ever existing in full; `load_plans` uses it for files of at least
+`core.STREAMING_LOAD_BYTES`.
+
+Scalars are typed with the YAML 1.2 core schema, as the round-trip loader
+types them: `yes`/`on` stay strings and `010` is ten.
+"""
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import yaml
+from pydantic import TypeAdapter, ValidationError
+from yaml.constructor import SafeConstructor
+from yaml.resolver import Resolver
+
+from .exceptions import PlanValidationError
+from .models import Project, Task
+
+# Issues kept per file; any further ones are only counted
+DEFAULT_MAX_ISSUES = 100
+# Read size for the digest-computing reader
+READ_CHUNK_BYTES = 64 * 1024
+
+TASK_ADAPTER = TypeAdapter(Task)
+
+
+class _CoreSchemaResolver(Resolver):
+    """YAML 1.2 core schema booleans, integers and floats, plus timestamps and merge keys."""
+
+    yaml_implicit_resolvers: Dict[Optional[str], list] = {}
+
+
+for _first, _resolvers in Resolver.yaml_implicit_resolvers.items():
+    for _tag, _regexp in _resolvers:
+        if _tag.rsplit(":", 1)[-1] in ("null", "timestamp", "merge"):
+            _CoreSchemaResolver.add_implicit_resolver(_tag, _regexp, [_first])
+_CoreSchemaResolver.add_implicit_resolver(
+    "tag:yaml.org,2002:bool", re.compile(r"^(?:true|True|TRUE|false|False|FALSE)$"), list("tTfF"))
+_CoreSchemaResolver.add_implicit_resolver(
+    "tag:yaml.org,2002:int",
+    re.compile(r"^(?:[-+]?0b[01_]+|[-+]?0o[0-7_]+|[-+]?0x[0-9a-fA-F_]+|[-+]?[0-9][0-9_]*)$"),
+    list("-+0123456789"))
+_CoreSchemaResolver.add_implicit_resolver(
+    "tag:yaml.org,2002:float",
+    re.compile(r"""^(?:[-+]?[0-9][0-9_]*\.[0-9_]*(?:[eE][-+]?[0-9]+)?
+                |[-+]?[0-9][0-9_]*[eE][-+]?[0-9]+
+                |[-+]?\.[0-9_]+(?:[eE][-+]?[0-9]+)?
+                |[-+]?\.(?:inf|Inf|INF)
+                |\.(?:nan|NaN|NAN))$""", re.X),
+    list("-+0123456789."))
+
+
+class _CoreSchemaConstructor(SafeConstructor):
+    """Reads integers as YAML 1.2 does (decimal unless prefixed 0b, 0o or 0x)."""
+
+    def construct_yaml_int(self, node: yaml.ScalarNode) -> int:
+        value = self.construct_scalar(node).replace("_", "")
+        sign = -1 if value.startswith("-") else 1
+        digits = value.lstrip("-+")
+        for prefix, base in (("0b", 2), ("0o", 8), ("0x", 16)):
+            if digits.startswith(prefix):
+                return sign * int(digits[2:], base)
+        return sign * int(digits)
+
+
+_CoreSchemaConstructor.add_constructor("tag:yaml.org,2002:int", _CoreSchemaConstructor.construct_yaml_int)
+
+if getattr(yaml, "__with_libyaml__", False):
+    from yaml.cyaml import CParser
+    _PARSER_BASES: tuple = (CParser,)
+else:
+    _PARSER_BASES = (yaml.reader.Reader, yaml.scanner.Scanner, yaml.parser.Parser, yaml.composer.Composer)
+
+
+class CoreSchemaLoader(*_PARSER_BASES, _CoreSchemaConstructor, _CoreSchemaResolver):  # type: ignore[misc]
+    """Safe loader (libyaml when available) typing scalars as the round-trip loader does.
+
+    Usable with `yaml.load(text, Loader=CoreSchemaLoader)` as well as event by event.
+    """
+
+    def __init__(self, stream: Union[str, bytes, BinaryIO]) -> None:
+        _PARSER_BASES[0].__init__(self, stream)
+        for base in _PARSER_BASES[1:]:
+            base.__init__(self)
+        _CoreSchemaConstructor.__init__(self)
+        _CoreSchemaResolver.__init__(self)
+
+
+class _DigestReader:
+    """Binary file wrapper computing the SHA-256 of everything read through it."""
+
+    def __init__(self, f: BinaryIO) -> None:
+        self._file = f
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size: int = READ_CHUNK_BYTES) -> bytes:
+        data = self._file.read(size if size and size > 0 else READ_CHUNK_BYTES)
+        self.sha256.update(data)
+        return data
+
+
+class PlanIssue(NamedTuple):
+    """One problem found in a plan file; `line` is 1-based (None if unknown)."""
+
+    line: Optional[int]
+    location: str
+    message: str
+
+    def format(self, filepath: Path) -> str:
+        line = f"{self.line}:" if self.line is not None else ""
+        return f"{filepath.name}:{line} {self.location}: {self.message}"
+
+
+class StreamValidation(NamedTuple):
+    """Outcome of `validate_plan_stream`.
+
+    `header` is the plan without its tasks (None if the top-level keys are
+    invalid), `issues` the first `max_issues` problems of `issue_count`, and
+    `digest` the file's SHA-256 (None if it could not be read to the end).
+    """
+
+    header: Optional[Project]
+    tasks: int
+    issues: List[PlanIssue]
+    issue_count: int
+    digest: Optional[str]
+
+    @property
+    def ok(self) -> bool:
+        return self.issue_count == 0
+
+
+def _compose(loader: CoreSchemaLoader, anchors: Dict[str, yaml.Node]) -> yaml.Node:
+    """Composes the node starting at the next event (PyYAML's composer, for one node)."""
+    event = loader.get_event()
+    if isinstance(event, yaml.AliasEvent):
+        if event.anchor not in anchors:
+            raise yaml.composer.ComposerError(None, None, f"found undefined alias {event.anchor!r}",
+                                              event.start_mark)
+        return anchors[event.anchor]
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        node: yaml.Node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark,
+                                          style=event.style)
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+        return node
+    if isinstance(event, yaml.SequenceStartEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.SequenceNode, None, event.implicit)
+        node = yaml.SequenceNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+        while not loader.check_event(yaml.SequenceEndEvent):
+            node.value.append(_compose(loader, anchors))
+        node.end_mark = loader.get_event().end_mark
+        return node
+    tag = event.tag
+    if tag is None or tag == "!":
+        tag = loader.resolve(yaml.MappingNode, None, event.implicit)
+    node = yaml.MappingNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+    if event.anchor is not None:
+        anchors[event.anchor] = node
+    while not loader.check_event(yaml.MappingEndEvent):
+        key = _compose(loader, anchors)
+        node.value.append((key, _compose(loader, anchors)))
+    node.end_mark = loader.get_event().end_mark
+    return node
+
+
+def _line_of(node: yaml.Node, loc: Sequence[Union[str, int]]) -> int:
+    """1-based line of the value at `loc` (a pydantic error location) under `node`.
+
+    Falls back to the deepest node found, e.g. the task for a missing field.
+    """
+    for part in loc:
+        if isinstance(node, yaml.MappingNode):
+            child = next((value for key, value in node.value
+                          if isinstance(key, yaml.ScalarNode) and key.value == str(part)), None)
+        elif isinstance(node, yaml.SequenceNode) and isinstance(part, int) and part < len(node.value):
+            child = node.value[part]
+        else:
+            child = None
+        if child is None:
+            break
+        node = child
+    return node.start_mark.line + 1
+
+
+def _location(prefix: str, loc: Sequence[Union[str, int]]) -> str:
+    """`tasks[3].estimate.min`-style path for a pydantic error location."""
+    text = prefix
+    for part in loc:
+        if isinstance(part, int):
+            text += f"[{part}]"
+        else:
+            text = f"{text}.{part}" if text else str(part)
+    return text or "plan"
+
+
+class _Report:
+    """Collects issues, keeping the first `limit`."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.issues: List[PlanIssue] = []
+        self.count = 0
+
+    def add(self, line: Optional[int], location: str, message: str) -> None:
+        self.count += 1
+        if len(self.issues) < self.limit:
+            self.issues.append(PlanIssue(line, location, message))
+
+
+def _read_tasks(loader: CoreSchemaLoader, anchors: Dict[str, yaml.Node], report: _Report,
+                on_task: Optional[Callable[[Task], None]]) -> int:
+    """Validates the entries of the `tasks` sequence one by one; returns how many there were."""
+    loader.get_event()  # SequenceStart
+    count = 0
+    while not loader.check_event(yaml.SequenceEndEvent):
+        node = _compose(loader, anchors)
+        data = loader.construct_document(node)
+        try:
+            task = TASK_ADAPTER.validate_python(data)
+        except ValidationError as e:
+            for error in e.errors():
+                report.add(_line_of(node, error["loc"]), _location(f"tasks[{count}]", error["loc"]),
+                           error["msg"])
+        else:
+            if on_task is not None:
+                on_task(task)
+        count += 1
+    loader.get_event()
+    return count
+
+
+def _read_plan(loader: CoreSchemaLoader, report: _Report,
+               on_task: Optional[Callable[[Task], None]]) -> Tuple[Optional[Dict[str, Any]], Dict[str, int], int]:
+    """Reads the first document; returns its top-level values (None if it is
+    not a mapping), the line of each and the number of tasks."""
+    loader.get_event()  # StreamStart
+    if loader.check_event(yaml.StreamEndEvent):
+        report.add(None, "plan", "Plan file is empty")
+        return None, {}, 0
+    loader.get_event()  # DocumentStart
+    if not loader.check_event(yaml.MappingStartEvent):
+        node = _compose(loader, {})
+        report.add(node.start_mark.line + 1, "plan", "Plan must be a mapping of top-level keys")
+        return None, {}, 0
+    loader.get_event()
+    values: Dict[str, Any] = {}
+    lines: Dict[str, int] = {}
+    task_count = 0
+    # Anchored nodes stay available to later aliases, as in a full load
+    anchors: Dict[str, yaml.Node] = {}
+    while not loader.check_event(yaml.MappingEndEvent):
+        key = str(loader.construct_document(_compose(loader, anchors)))
+        if key == "tasks" and loader.check_event(yaml.SequenceStartEvent):
+            lines[key] = loader.peek_event().start_mark.line + 1
+            task_count = _read_tasks(loader, anchors, report, on_task)
+            values[key] = []
+        else:
+            node = _compose(loader, anchors)
+            lines[key] = node.start_mark.line + 1
+            values[key] = loader.construct_document(node)
+    loader.get_event()
+    return values, lines, task_count
+
+
+def validate_plan_stream(filepath: Path, on_task: Optional[Callable[[Task], None]] = None,
+                         max_issues: int = DEFAULT_MAX_ISSUES) -> StreamValidation:
+    """Validates a plan file task by task, without loading it as a whole.
+
+    Each valid task is passed to `on_task` (if given) as soon as it has been
+    read; nothing else is kept per task, so memory use is bounded by the
+    largest task (plus the issues kept). Raises `OSError` if the file cannot
+    be read; YAML syntax errors are reported as an issue at their line.
+    """
+    report = _Report(max_issues)
+    values: Optional[Dict[str, Any]] = None
+    lines: Dict[str, int] = {}
+    task_count = 0
+    digest: Optional[str] = None
+    with open(filepath, "rb") as f:
+        reader = _DigestReader(f)
+        loader = CoreSchemaLoader(reader)
+        try:
+            values, lines, task_count = _read_plan(loader, report, on_task)
+            # Read to the end so the digest covers the whole file
+            while reader.read():
+                pass
+            digest = reader.sha256.hexdigest()
+        except yaml.YAMLError as e:
+            values = None
+            mark = getattr(e, "problem_mark", None) or getattr(e, "context_mark", None)
+            report.add(mark.line + 1 if mark is not None else None, "yaml",
+                       getattr(e, "problem", None) or str(e))
+        finally:
+            loader.dispose()
+
+    header: Optional[Project] = None
+    if values is not None:
+        values.setdefault("tasks", [])
+        try:
+            header = Project.model_validate(values)
+        except ValidationError as e:
+            for error in e.errors():
+                loc = error["loc"]
+                report.add(lines.get(str(loc[0])) if loc else None, _location("", loc), error["msg"])
+    return StreamValidation(header, task_count, report.issues, report.count, digest)
+
+
+def validation_error(filepath: Path, result: StreamValidation) -> PlanValidationError:
+    """The `PlanValidationError` listing the issues of an invalid `result`."""
+    details = "\n".join(f"  - {issue.format(filepath)}" for issue in result.issues)
+    more = result.issue_count - len(result.issues)
+    if more > 0:
+        details += f"\n  ... and {more} more"
+    return PlanValidationError(f"Plan validation failed for {filepath.resolve()}:\n{details}")
+
+
+def load_plan_streaming(filepath: Path, max_issues: int = DEFAULT_MAX_ISSUES) -> Project:
+    """Loads a plan through `validate_plan_stream`, building the model task by task.
+
+    Raises `PlanValidationError` listing the issues (with line numbers) if
+    the plan is invalid.
+    """
+    tasks: List[Task] = []
+    result = validate_plan_stream(filepath, on_task=tasks.append, max_issues=max_issues)
+    if not result.ok or result.header is None:
+        raise validation_error(filepath, result)
+    project = result.header
+    project.tasks = tasks
+    project.record_source(result.digest)
+    return project
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""Columnar, array-backed task store for fast analytics over large plans.
+
+A `TaskTable` is a compact, read-only snapshot of a plan's tasks. Instead of
+one Pydantic object (and one Python list of dependencies) per task, it keeps
+one typed array per field:
+
+* ids / time spent as `array('q')` / `array('d')`
+* status and priority as small-int codes (`array('b')`)
+* dependencies in CSR form (`dep_offsets` + flat `dep_ids`)
+* titles as interned strings
+* three-point estimates (hours) as `array('d')`, NaN where unset
+
+Aggregates (counts, progress, dependency metrics) are vectorized with NumPy
+when it is installed (`pip install "metsuke[analytics]"`) and fall back to
+plain Python loops over the arrays otherwise.
+"""
+
+import sys
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Conditional import for numpy
+try:
+    import numpy as np  # type: ignore
+
+    _NUMPY_AVAILABLE = True
+except ImportError:
+    np = None  # type: ignore
+    _NUMPY_AVAILABLE = False
+
+from .models import Project, Task
+
+# Code tables. The index of each value is its code.
+STATUS_VALUES = ("pending", "in_progress", "Done", "blocked")
+# Priorities are stored by rank, so sorting by code sorts high -> low.
+PRIORITY_VALUES = ("high", "medium", "low")
+
+STATUS_CODES = {value: code for code, value in enumerate(STATUS_VALUES)}
+PRIORITY_CODES = {value: code for code, value in enumerate(PRIORITY_VALUES)}
+DONE_CODE = STATUS_CODES["Done"]
+# `dependency_rows` markers for dependencies outside the table
+UNKNOWN_ROW = -1
+ARCHIVED_ROW = -2  # archived tasks are Done by definition
+
+
+class TaskTable:
+    """Array-backed representation of a list of tasks."""
+
+    __slots__ = (
+        "ids",
+        "status",
+        "priority",
+        "time_spent",
+        "dep_offsets",
+        "dep_ids",
+        "titles",
+        "est_min",
+        "est_likely",
+        "est_max",
+        "archived_ids",
+        "_row_of",
+        "_dep_rows",
+    )
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.status = array("b")
+        self.priority = array("b")
+        self.time_spent = array("d")
+        self.dep_offsets = array("q", [0])
+        self.dep_ids = array("q")
+        self.titles: List[str] = []
+        self.est_min = array("d")
+        self.est_likely = array("d")
+        self.est_max = array("d")
+        self.archived_ids: frozenset = frozenset()
+        self._row_of: Optional[Dict[int, int]] = None
+        self._dep_rows: Optional[array] = None
+
+    # --- Construction ---
+
+    @classmethod
+    def from_tasks(cls, tasks: Iterable[Task], archived_ids: Iterable[int] = ()) -> "TaskTable":
+        """Builds a table from an iterable of `Task` objects.
+
+        `archived_ids` are tasks moved out of the plan by `metsuke archive`;
+        dependencies on them count as Done.
+        """
+        table = cls()
+        table.archived_ids = frozenset(archived_ids)
+        ids_append = table.ids.append
+        status_append = table.status.append
+        priority_append = table.priority.append
+        time_append = table.time_spent.append
+        offsets_append = table.dep_offsets.append
+        dep_extend = table.dep_ids.extend
+        titles_append = table.titles.append
+        est_min_append = table.est_min.append
+        est_likely_append = table.est_likely.append
+        est_max_append = table.est_max.append
+        intern = sys.intern
+        nan = float("nan")
+
+        for task in tasks:
+            ids_append(task.id)
+            status_append(STATUS_CODES[task.status])
+            priority_append(PRIORITY_CODES[task.priority])
+            time_append(task.time_spent_seconds)
+            dep_extend(task.dependencies)
+            offsets_append(len(table.dep_ids))
+            titles_append(intern(task.title))
+            estimate = task.estimate
+            if estimate is None:
+                est_min_append(nan)
+                est_likely_append(nan)
+                est_max_append(nan)
+            else:
+                est_min_append(estimate.min)
+                est_likely_append(estimate.likely)
+                est_max_append(estimate.max)
+        return table
+
+    @classmethod
+    def from_project(cls, project: Project) -> "TaskTable":
+        """Builds a table from a loaded `Project`."""
+        return cls.from_tasks(project.tasks, project.archived)
+
+    # --- Basic accessors ---
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row_map(self) -> Dict[int, int]:
+        """Returns the task id -> row index map (built once and cached)."""
+        if self._row_of is None:
+            self._row_of = {task_id: row for row, task_id in enumerate(self.ids)}
+        return self._row_of
+
+    def row_of(self, task_id: int) -> Optional[int]:
+        """Returns the row index of a task id, or None if it is not in the table."""
+        return self.row_map().get(task_id)
+
+    def dependencies_of(self, row: int) -> Sequence[int]:
+        """Returns the dependency ids of the task at `row`."""
+        return self.dep_ids[self.dep_offsets[row]:self.dep_offsets[row + 1]]
+
+    def dependency_rows(self) -> array:
+        """Returns the row index of every dependency edge.
+
+        Aligned with `dep_ids`; computed once and cached. Dependencies outside
+        the table are `ARCHIVED_ROW` for archived tasks and `UNKNOWN_ROW`
+        otherwise, so callers can skip every edge with a negative row.
+        """
+        if self._dep_rows is None:
+            row_of = self.row_map()
+            archived = self.archived_ids
+            self._dep_rows = array("q", (
+                row_of.get(dep_id, ARCHIVED_ROW if dep_id in archived else UNKNOWN_ROW)
+                for dep_id in self.dep_ids
+            ))
+        return self._dep_rows
+
+    # --- Aggregates ---
+
+    def status_counts(self) -> Counter:
+        """Counts tasks per status (only statuses that occur are included)."""
+        return self._count_codes(self.status, STATUS_VALUES)
+
+    def priority_counts(self) -> Counter:
+        """Counts tasks per priority (only priorities that occur are included)."""
+        return self._count_codes(self.priority, PRIORITY_VALUES)
+
+    def progress_percent(self) -> float:
+        """Percentage of tasks that are Done."""
+        if not len(self):
+            return 0.0
+        return self.status_counts().get("Done", 0) / len(self) * 100
+
+    def done_mask(self) -> List[bool]:
+        """Returns a per-row flag telling whether the task is Done."""
+        return [code == DONE_CODE for code in self.status]
+
+    def ready_rows(self) -> List[int]:
+        """Rows of open tasks whose dependencies are all Done.
+
+        Ordered the way the next task is chosen: by priority (high first),
+        then by task id.
+        """
+        if _NUMPY_AVAILABLE:
+            ready = self._np_ready_mask()
+            rows = np.flatnonzero(ready)
+            order = np.lexsort((self._np(self.ids)[rows], self._np(self.priority)[rows]))
+            return rows[order].tolist()
+
+        ready_rows = [row for row, ok in enumerate(self._py_ready_mask()) if ok]
+        ready_rows.sort(key=lambda row: (self.priority[row], self.ids[row]))
+        return ready_rows
+
+    def dependency_metrics(self) -> Dict[str, Any]:
+        """Calculates the dependency metrics shown by the TUI dashboard.
+
+        Returns the same keys as the TUI's `_calculate_dependency_metrics`,
+        except that the suggested task is reported as `next_task_id`.
+        """
+        n = len(self)
+        if not n:
+            return {}
+
+        if _NUMPY_AVAILABLE:
+            dep_counts = np.diff(self._np(self.dep_offsets))
+            no_deps = int(np.count_nonzero(dep_counts == 0))
+            blocked = self._np_blocked_mask()
+            open_tasks = self._np(self.status) != DONE_CODE
+            blocked_by_deps = int(np.count_nonzero(open_tasks & blocked))
+            ready_to_work = int(np.count_nonzero(open_tasks & ~blocked))
+
+            most_depended_id = None
+            most_depended_count = 0
+            if len(self.dep_ids):
+                # Ties go to the id seen first, matching Counter.most_common
+                unique_ids, first_index, counts = np.unique(
+                    self._np(self.dep_ids), return_index=True, return_counts=True
+                )
+                best = counts.max()
+                candidates = np.flatnonzero(counts == best)
+                winner = candidates[np.argmin(first_index[candidates])]
+                most_depended_id = int(unique_ids[winner])
+                most_depended_count = int(best)
+        else:
+            no_deps = sum(
+                1 for row in range(n) if self.dep_offsets[row] == self.dep_offsets[row + 1]
+            )
+            blocked = self._py_blocked_mask()
+            blocked_by_deps = 0
+            ready_to_work = 0
+            for row in range(n):
+                if self.status[row] != DONE_CODE:
+                    if blocked[row]:
+                        blocked_by_deps += 1
+                    else:
+                        ready_to_work += 1
+            most_depended = Counter(self.dep_ids).most_common(1)
+            most_depended_id = most_depended[0][0] if most_depended else None
+            most_depended_count = most_depended[0][1] if most_depended else 0
+
+        ready = self.ready_rows()
+        return {
+            "no_deps": no_deps,
+            "ready_to_work": ready_to_work,
+            "blocked_by_deps": blocked_by_deps,
+            "most_depended_id": most_depended_id,
+            "most_depended_count": most_depended_count,
+            "avg_deps": len(self.dep_ids) / n,
+            "next_task_id": self.ids[ready[0]] if ready else None,
+        }
+
+    # --- Internal helpers ---
+
+    @staticmethod
+    def _np(values: array) -> "np.ndarray":
+        """Zero-copy NumPy view of an array column."""
+        return np.frombuffer(values, dtype=values.typecode) if len(values) else np.zeros(0, dtype=values.typecode)
+
+    def _count_codes(self, codes: array, values: Sequence[str]) -> Counter:
+        if _NUMPY_AVAILABLE:
+            raw = np.bincount(self._np(codes), minlength=len(values)) if len(codes) else [0] * len(values)
+            return Counter({values[code]: int(count) for code, count in enumerate(raw) if count})
+        raw_counts = Counter(codes)
+        return Counter({values[code]: count for code, count in raw_counts.items()})
+
+    def _np_blocked_mask(self) -> "np.ndarray":
+        """Per-row flag: at least one dependency is not Done (or unknown; archived counts as Done)."""
+        n = len(self)
+        blocked = np.zeros(n, dtype=bool)
+        if not len(self.dep_ids):
+            return blocked
+        dep_rows = self._np(self.dependency_rows())
+        status = self._np(self.status)
+        dep_done = np.zeros(len(dep_rows), dtype=bool)
+        known = dep_rows >= 0
+        dep_done[known] = status[dep_rows[known]] == DONE_CODE
+        dep_done[dep_rows == ARCHIVED_ROW] = True
+        edge_owner = np.repeat(np.arange(n), np.diff(self._np(self.dep_offsets)))
+        blocked[edge_owner[~dep_done]] = True
+        return blocked
+
+    def _np_ready_mask(self) -> "np.ndarray":
+        return (self._np(self.status) != DONE_CODE) & ~self._np_blocked_mask()
+
+    def _py_blocked_mask(self) -> List[bool]:
+        done = self.done_mask()
+        dep_rows = self.dependency_rows()
+        offsets = self.dep_offsets
+        return [
+            any(
+                dep_rows[e] == UNKNOWN_ROW or (dep_rows[e] >= 0 and not done[dep_rows[e]])
+                for e in range(offsets[row], offsets[row + 1])
+            )
+            for row in range(len(self))
+        ]
+
+    def _py_ready_mask(self) -> List[bool]:
+        blocked = self._py_blocked_mask()
+        return [self.status[row] != DONE_CODE and not blocked[row] for row in range(len(self))]
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""Always-on timing spans for Metsuke's hot paths.
+
+Named spans (`span` as a context manager, `timed` as a decorator) record
+their durations into a `Histogram` with fixed, log-spaced buckets, so a
+recording costs a clock read, a bisect and an increment, and memory does
+not grow with the number of calls. Percentiles are therefore approximate:
+they report the upper bound of the bucket, about 19% wide.
+
+Spans recorded: `find_plan_files`, `plan_read` (file I/O),
+`description_split` (lazy loads only), `yaml_parse`, `model_validate`,
+`stream_load` (whole streamed loads of very large plans),
+`repair_yaml_file`, `save_plan`, `apply_focus`, `manage_focus`, and in the
+TUI `handle_file_change` and `update_ui`. `snapshot()` returns them for the
+TUI's timings panel and `metsuke diagnostics`.
+"""
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, TypeVar
+
+# Bucket upper bounds in seconds: 1 µs to about 3 minutes, four per doubling
+BUCKET_BOUNDS: List[float] = [1e-6 * 2 ** (i / 4) for i in range(110)]
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Histogram:
+    """Counts of durations per fixed bucket, plus count, total and max."""
+
+    __slots__ = ("counts", "count", "total", "max", "_lock")
+
+    def __init__(self) -> None:
+        # The last bucket holds everything above the highest bound
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        bucket = bisect_left(BUCKET_BOUNDS, seconds)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, percent: float) -> float:
+        """Upper bound (seconds) of the bucket holding the `percent`th duration."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, -(-self.count * percent // 100))  # ceiling
+            seen = 0
+            for bucket, count in enumerate(self.counts):
+                seen += count
+                if seen >= rank:
+                    bound = BUCKET_BOUNDS[bucket] if bucket < len(BUCKET_BOUNDS) else self.max
+                    return min(bound, self.max)
+            return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Count and, in milliseconds, mean, p50, p99 and max."""
+        count = self.count
+        return {
+            "count": count,
+            "mean_ms": round(self.total / count * 1000, 3) if count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+_histograms: Dict[str, Histogram] = {}
+_histograms_guard = threading.Lock()
+
+
+def histogram(name: str) -> Histogram:
+    """Returns the histogram for span `name`, creating it on first use."""
+    hist = _histograms.get(name)
+    if hist is None:
+        with _histograms_guard:
+            hist = _histograms.setdefault(name, Histogram())
+    return hist
+
+
+class span:
+    """Context manager recording the time spent in its block under `name`."""
+
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, name: str) -> None:
+        self._histogram = histogram(name)
+
+    def __enter__(self) -> "span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._histogram.record(time.perf_counter() - self._start)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator recording each call of the function as span `name`."""
+    def decorator(function: F) -> F:
+        hist = histogram(name)
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                hist.record(time.perf_counter() - start)
+
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    """Summaries of every span recorded so far, by name."""
+    with _histograms_guard:
+        items = sorted(_histograms.items())
+    return {name: hist.summary() for name, hist in items if hist.count}
+
+
+def reset() -> None:
+    """Forgets all recorded durations."""
+    with _histograms_guard:
+        histograms = list(_histograms.values())
+    # Cleared in place: `timed` functions keep a reference to theirs
+    for hist in histograms:
+        hist.clear()
@@ -2,6 +2,8 @@
 """Main Textual application class for the Metsuke TUI."""
 
 import logging
+import time
+import tracemalloc
 
 # import yaml # Will be removed when Task 10 is done
 from pathlib import Path
@@ -37,6 +39,7 @@ from textual.binding import Binding
 from textual import events  # Added import
 from rich.text import Text  # Added import for plan selection table
 from textual.coordinate import Coordinate # ADD this import
+from textual.css.query import NoMatches
 from textual import on # Correct import for decorator
 
 # Import from our TUI modules
@@ -46,23 +49,60 @@ from .widgets import (
     TaskProgress,
     PriorityBreakdown,
     DependencyStatus,
+    CriticalPathStatus,
     AppFooter,
+    TimingsPanel,
+    format_bytes,
 )
 from .screens import HelpScreen  # Only HelpScreen needed now
+from .caches import MarkdownCache
+from .snapshot import default_snapshot_path, load_snapshot, save_snapshot
+from .view_model import (
+    CACHE_KEY as VIEW_MODEL_CACHE_KEY,
+    DEFAULT_COLOR,
+    PRIORITY_COLORS,
+    STATUS_COLORS,
+    TABLE_COLUMNS,
+    DashboardStats,
+    PlanViewModel,
+)
 from .handlers import (
+    LogBatchReady,
     TuiLogHandler,
+    TuiLogPipeline,
     DirectoryEventHandler,
     _WATCHDOG_AVAILABLE as _HANDLER_WATCHDOG,
 )  # Use new handler
 from ..models import Project, Task, ProjectMeta  # Import Pydantic models
-from ..core import load_plans, manage_focus, save_plan  # Import new core functions
+from ..core import (  # Import new core functions
+    apply_focus,
+    load_plans,
+    manage_focus,
+    plan_file_matches,
+    save_focus_changes,
+    save_plan,
+)
+from ..reachability import ReachabilityIndex
+from ..profiling import SamplingProfiler, default_profile_dir, profile_stem
+from ..timing import snapshot as timing_snapshot, timed
+from ..memory import deep_sizeof, plan_footprint
 from ..exceptions import (
     PlanLoadingError,
+    ProfilerUnavailableError,
     PlanValidationError,
 )  # Will be used in Task 10
 
 # PLAN_FILE = Path("PROJECT_PLAN.yaml") # Define this where TUI is launched or pass as arg
 
+# Seconds between refreshes of the timings panel while it is shown
+TIMINGS_REFRESH_SECONDS = 1.0
+# Its memory readout walks every loaded plan, so it is refreshed less often
+MEMORY_REFRESH_SECONDS = 10.0
+# Cursor moves closer together than this only re-render the description once it settles
+DETAIL_DEBOUNCE_SECONDS = 0.08
+NO_DESCRIPTION_TEXT = "*No description provided.*"
+NO_SELECTION_TEXT = "*Select a task row to view details.*"
+
 
 class TaskViewer(App):
     """A Textual app to view project tasks from PROJECT_PLAN.yaml."""
@@ -186,7 +226,7 @@ class TaskViewer(App):
         margin-top: 1;
         align: center middle; /* Keep this change */
     }
-    PriorityBreakdown, DependencyStatus {
+    PriorityBreakdown, DependencyStatus, CriticalPathStatus {
         height: auto;
         margin-bottom: 1;
         width: 100%; /* Keep this change */
@@ -195,6 +235,12 @@ class TaskViewer(App):
     DataTable {
         height: auto; /* Let the container handle height */
     }
+    TimingsPanel {
+        height: auto;
+        max-height: 16;
+        border-top: thick $accent;
+        display: none; /* Shown with Ctrl+T */
+    }
     Log {
         height: 8; /* Example height, adjust as needed */
         border-top: thick $accent; /* Restored border */
@@ -239,6 +285,8 @@ class TaskViewer(App):
         ("ctrl+l", "copy_log", "Copy Log"),
         ("ctrl+d", "toggle_log", "Toggle Log"),
         ("ctrl+b", "open_plan_selection", "Select Plan"),
+        Binding("ctrl+r", "toggle_profiler", "Profile", show=False),
+        Binding("ctrl+t", "toggle_timings", "Timings", show=False),
         # CHANGE space binding to toggle panel
         Binding("space", "toggle_detail_panel", "Toggle Detail", show=True),
         # REMOVE escape binding
@@ -277,9 +325,12 @@ class TaskViewer(App):
 
     # Store handler for copy action
     tui_handler: Optional[TuiLogHandler] = None
+    log_pipeline: Optional[TuiLogPipeline] = None
 
     # --- Modified __init__ ---
-    def __init__(self, plan_files: List[Path]):
+    def __init__(self, plan_files: List[Path], snapshot_path: Optional[Path] = None,
+                 started_at: Optional[float] = None, log_level: int = logging.INFO,
+                 log_file: Optional[Path] = None):
         super().__init__()
         if not plan_files:
             # This should ideally be caught in cli.py, but double-check
@@ -287,6 +338,31 @@ class TaskViewer(App):
                 "TaskViewer must be initialized with at least one plan file path."
             )
         self.initial_plan_files = plan_files
+        # Warm-start snapshot written on exit and painted on the next start
+        self.snapshot_path = snapshot_path or default_snapshot_path(Path.cwd())
+        # Records below log_level are dropped before formatting; log_file is
+        # an optional rotating copy of the TUI log
+        self.log_level = log_level
+        self.log_file = log_file
+        # Parsed descriptions, and the debounce state for the detail panel
+        self._markdown_cache = MarkdownCache()
+        self._displayed_description: Optional[tuple] = None
+        self._description_timer = None
+        self._pending_description_task: Optional[Task] = None
+        self._last_description_request = 0.0
+        # Startup metric: seconds from launch (a `time.perf_counter()` value) to
+        # the first frame and to the loaded plans, see _record_startup_timing
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.startup_timings: Dict[str, float] = {}
+        # Dashboard statistics on screen; changes reach the widgets at most once per frame
+        self.stats = DashboardStats()
+        self.stats.subscribe(self._on_stats_changed)
+        self._changed_stats: set = set()
+        # Sampling profiler toggled with Ctrl+R (action_toggle_profiler)
+        self.profiler: Optional[SamplingProfiler] = None
+        # Refreshes the timings panel while it is shown (action_toggle_timings)
+        self._timings_timer = None
+        self._memory_measured_at: Optional[float] = None
         # Removed _load_data() call - initial loading happens in on_mount
         self.app_logger.info(
             f"TUI initialized with {len(plan_files)} potential plan file(s)."
@@ -303,46 +379,38 @@ class TaskViewer(App):
             # Rule(orientation="vertical") # REMOVE Rule widget
             with VerticalScroll(id="right-panel"):
                 yield DependencyStatus(id="dependency-status")
+                yield CriticalPathStatus(id="critical-path")
         # Main container for table and details (fixed layout)
         with Container(id="main-container"): 
             # Tables are direct children now
+            # The plan selection table is mounted on first use (_plan_selection_table)
             yield DataTable(id="task-table") 
-            yield DataTable(id="plan-selection-table") # Still here, hidden by default
-            # Detail panel is also a direct child and always composed
+            # Detail panel is also a direct child and always composed; its
+            # Markdown view is mounted with the first description (_show_description)
             with VerticalScroll(id="detail-panel"): 
                 yield Static("Task Details", id="detail-title") # Placeholder
                 yield Static("Status: - | Prio: -", id="detail-status-prio")
                 yield Static("Deps: -", id="detail-deps")
-                yield Markdown("", id="detail-description") # Start empty
 
-        yield Log(id="log-view", max_lines=200, highlight=True)
+        # The Log is mounted when first shown (_log_view)
         yield AppFooter(bindings=self.BINDINGS, id="app-footer")
 
     def on_mount(self) -> None:
         """Called when the app is mounted."""
-        # Setup TUI logging handler
-        log_widget = self.query_one(Log)
-        self.tui_handler = TuiLogHandler(log_widget)
-        formatter = logging.Formatter(
-            "%(asctime)s %(levelname)-8s %(name)s: %(message)s\n", datefmt="%H:%M:%S"
-        )
-        self.tui_handler.setFormatter(formatter)
-
+        # Setup TUI logging: records are queued and formatted off the UI
+        # thread; the handler keeps messages until the Log is shown
+        self.tui_handler = TuiLogHandler(self)
+        self.log_pipeline = TuiLogPipeline(self.tui_handler, level=self.log_level, log_file=self.log_file)
         # Configure metsuke.tui logger (don't configure root logger from here)
-        tui_logger = logging.getLogger("metsuke.tui")
-        tui_logger.setLevel(logging.DEBUG) # Set level to DEBUG to see detailed logs
-        # Avoid adding handler if already added (e.g., if app restarts)
-        if self.tui_handler not in tui_logger.handlers:
-             tui_logger.addHandler(self.tui_handler)
-        tui_logger.propagate = False  # Don't pass logs up to root
+        self.log_pipeline.start(logging.getLogger("metsuke.tui"))
 
         self.app_logger.info("TUI Log Handler configured. Press Ctrl+L to copy log.")
 
-        # Load initial data and determine focus (This calls update_ui internally)
-        self._initial_load_and_focus()  # Corrected call
-
-        # Start file observer AFTER initial load
-        self.start_file_observer()
+        # Show the previous session's view right away, then load the plans in
+        # a worker (this calls update_ui once they are loaded)
+        self._paint_snapshot()
+        self.call_after_refresh(self._record_startup_timing, "first_frame")
+        self._initial_load_and_focus()
 
         # Focus the task table initially (if not selecting plan)
         if not self.selecting_plan:
@@ -353,12 +421,20 @@ class TaskViewer(App):
 
     def on_unmount(self) -> None:
         """Called when the app is unmounted."""
+        if self.profiler is not None:
+            self.action_toggle_profiler()  # Keep what was sampled so far
+        self._save_snapshot()
         self.stop_file_observer()  # Stop watchdog observer
         # Clean up logger handler
+        if self.log_pipeline:
+            self.log_pipeline.stop()
+            self.log_pipeline = None
+        self.tui_handler = None
+
+    def on_log_batch_ready(self, message: LogBatchReady) -> None:
+        """Writes the queued log messages to the Log, once per frame."""
         if self.tui_handler:
-            tui_logger = logging.getLogger("metsuke.tui")
-            tui_logger.removeHandler(self.tui_handler)
-            self.tui_handler = None
+            self.call_after_refresh(self.tui_handler.write_pending)
 
     # --- ADD Helper to Update Selected Task from Row Index ---
     def _update_selected_task_from_row(self, row_index: Optional[int]) -> None:
@@ -379,7 +455,7 @@ class TaskViewer(App):
 
                 if row_key and row_key.value is not None:
                     task_id_str = str(row_key.value)
-                    self.app_logger.debug(f"Update from row: Trying row {row_index}, key: {task_id_str}")
+                    self.app_logger.debug("Update from row: Trying row %s, key: %s", row_index, task_id_str)
                     
                     # Find the task
                     if self.current_plan_path and self.current_plan_path in self.all_plans:
@@ -389,19 +465,19 @@ class TaskViewer(App):
                                 task_id = int(task_id_str)
                                 selected_task = next((task for task in current_plan.tasks if task.id == task_id), None)
                                 if selected_task:
-                                    self.app_logger.debug(f"Update from row: Found Task ID {task_id}")
+                                    self.app_logger.debug("Update from row: Found Task ID %s", task_id)
                                 else:
-                                    self.app_logger.debug(f"Update from row: Key {task_id_str} not found in tasks.")
+                                    self.app_logger.debug("Update from row: Key %s not found in tasks.", task_id_str)
                             except (ValueError, TypeError):
-                                self.app_logger.debug(f"Update from row: Could not convert key {task_id_str} to int.")
+                                self.app_logger.debug("Update from row: Could not convert key %s to int.", task_id_str)
                         else:
                             self.app_logger.debug("Update from row: Current plan has no tasks.")
                     else:
                         self.app_logger.debug("Update from row: Current plan data unavailable.")
                 else:
-                    self.app_logger.debug(f"Update from row: Row {row_index} has invalid/None key from coordinate.")
+                    self.app_logger.debug("Update from row: Row %s has invalid/None key from coordinate.", row_index)
             else:
-                self.app_logger.debug(f"Update from row: Row index {row_index} out of bounds (0-{table.row_count-1}).")
+                self.app_logger.debug("Update from row: Row index %s out of bounds (0-%s).", row_index, table.row_count-1)
         except Exception as e:
             self.app_logger.error(f"Error in _update_selected_task_from_row for index {row_index}: {e}", exc_info=True)
         
@@ -412,21 +488,20 @@ class TaskViewer(App):
     # --- and modify to use the passed argument --- 
     def watch_selected_task_for_detail(self, new_task: Optional[Task]) -> None:
         """Watcher that updates the detail panel when selected_task_for_detail changes."""
-        self.app_logger.debug(f"Watcher triggered: selected_task_for_detail changed to ID {new_task.id if new_task else 'None'}")
+        self.app_logger.debug("Watcher triggered: selected_task_for_detail changed to ID %s", new_task.id if new_task else 'None')
         try:
             title_widget = self.query_one("#detail-title", Static)
             status_prio_widget = self.query_one("#detail-status-prio", Static)
             deps_widget = self.query_one("#detail-deps", Static)
-            desc_widget = self.query_one("#detail-description", Markdown)
 
             # Use the new_task passed by the watcher
             if new_task:
                 # Populate with task data
                 title_widget.update(f"ID {new_task.id}: {new_task.title}")
                 status_prio_widget.update(f"Status: [{self._get_status_color(new_task.status)}]{new_task.status}[/] | Prio: [{self._get_priority_color(new_task.priority)}]{new_task.priority}[/]")
-                deps_str = ", ".join(map(str, new_task.dependencies)) or "None"
-                deps_widget.update(f"Deps: {deps_str}")
-                desc_widget.update(new_task.description or "*No description provided.*") 
+                deps_str = self._format_dependencies(new_task) or "None"
+                deps_widget.update(f"Deps: {deps_str}{self._transitive_deps_summary(new_task)}")
+                self._schedule_description(new_task)
             else:
                 # Show placeholder text
                 # Title depends on whether a row is actually selected or not
@@ -443,15 +518,77 @@ class TaskViewer(App):
                 
                 status_prio_widget.update("Status: - | Prio: -")
                 deps_widget.update("Deps: -")
-                desc_widget.update("*Select a task row to view details.*") # Updated placeholder
+                self._schedule_description(None)
         except Exception as e:
             self.app_logger.error(f"Error in watch_selected_task_for_detail: {e}", exc_info=True)
 
+    def _schedule_description(self, task: Optional[Task]) -> None:
+        """Shows `task`'s description now if the cursor was idle, else once it settles."""
+        self._pending_description_task = task
+        if self._description_timer is not None:
+            self._description_timer.stop()
+            self._description_timer = None
+        now = time.monotonic()
+        if now - self._last_description_request >= DETAIL_DEBOUNCE_SECONDS:
+            self._show_description(task)
+        else:
+            self._description_timer = self.set_timer(DETAIL_DEBOUNCE_SECONDS, self._flush_description)
+        self._last_description_request = now
+
+    def _flush_description(self) -> None:
+        self._description_timer = None
+        self._show_description(self._pending_description_task)
+
+    def _show_description(self, task: Optional[Task]) -> None:
+        """Renders a description, skipping the update if it is already shown."""
+        if task is None:
+            text, task_id = NO_SELECTION_TEXT, None
+        else:
+            try:
+                text = task.description or NO_DESCRIPTION_TEXT
+            except Exception as e:
+                self.app_logger.error(f"Could not read description of task {task.id}: {e}")
+                text = "*Description unavailable; the plan file changed on disk.*"
+            task_id = task.id
+        key = (task_id, hash(text))
+        if key == self._displayed_description:
+            return
+        self._displayed_description = key
+        self._markdown_cache.for_task(task_id)
+        try:
+            self.query_one("#detail-description", Markdown).update(text)
+        except NoMatches:
+            self.query_one("#detail-panel").mount(
+                Markdown(text, id="detail-description", parser_factory=self._markdown_cache.parser_factory)
+            )
+
+    def _format_dependencies(self, task: Task) -> str:
+        """Comma-separated dependency ids, marking archived (Done) ones."""
+        current_plan = self.all_plans.get(self.current_plan_path)
+        archived = current_plan.archived if current_plan else {}
+        return ", ".join(
+            f"{dep} (archived)" if dep in archived else str(dep) for dep in task.dependencies
+        )
+
+    def _transitive_deps_summary(self, task: Task) -> str:
+        """Returns ' | All: N | Unblocks: M' from the plan's cached reachability index."""
+        current_plan = self.all_plans.get(self.current_plan_path)
+        if not current_plan:
+            return ""
+        try:
+            index = ReachabilityIndex.for_project(current_plan)
+            if task.id not in index:
+                return ""
+            return f" | All: {index.count_dependencies(task.id)} | Unblocks: {index.count_dependents(task.id)}"
+        except Exception as e:
+            self.app_logger.error(f"Error computing transitive dependencies: {e}")
+            return ""
+
     # --- ADD Event Handler for Task Table Cursor Movement ---
     @on(DataTable.CellHighlighted, "#task-table")
     def on_data_table_cell_highlighted(self, event: DataTable.CellHighlighted) -> None:
         """Handle cursor movement in the task table to update the detail view."""
-        self.app_logger.debug(f"Handler Entered: Event row={event.coordinate.row}, Target flag={self._target_cursor_row_after_update}") # ADDED Log
+        self.app_logger.debug("Handler Entered: Event row=%s, Target flag=%s", event.coordinate.row, self._target_cursor_row_after_update) # ADDED Log
         # Double-check the event source in case the selector isn't specific enough
         if event.data_table.id != "task-table":
             return
@@ -459,17 +596,17 @@ class TaskViewer(App):
         # --- Intercept first highlight after UI update ---
         if self._target_cursor_row_after_update is not None:
             target_row = self._target_cursor_row_after_update
-            self.app_logger.debug(f"Intercepting: Target row={target_row}, Clearing flag.") # ADDED Log
+            self.app_logger.debug("Intercepting: Target row=%s, Clearing flag.", target_row) # ADDED Log
             self._target_cursor_row_after_update = None # Clear the flag immediately
 
-            self.app_logger.debug(f"Intercepted highlight event after update. Restoring to row: {target_row}")
+            self.app_logger.debug("Intercepted highlight event after update. Restoring to row: %s", target_row)
 
             # Validate the target row index before scrolling
             if 0 <= target_row < event.data_table.row_count:
                 try:
                     # Use move_cursor instead of scroll_to_row
                     event.data_table.move_cursor(row=target_row)
-                    self.app_logger.debug(f"Intercepting: Called move_cursor(row={target_row})") # UPDATED Log
+                    self.app_logger.debug("Intercepting: Called move_cursor(row=%s)", target_row) # UPDATED Log
                 except Exception as e:
                     self.app_logger.error(f"Error calling move_cursor during restore: {e}") # UPDATED Log
             else:
@@ -481,47 +618,103 @@ class TaskViewer(App):
 
         # Original logic follows if not intercepted:
         cursor_row = event.coordinate.row # Use coordinate which should be valid for highlight
-        self.app_logger.debug(f"Handler: Proceeding with original logic for event row {cursor_row}") # ADDED Log
+        self.app_logger.debug("Handler: Proceeding with original logic for event row %s", cursor_row) # ADDED Log
         if cursor_row is None:
             self.app_logger.warning("CellHighlighted event received with None cursor_row.")
             # Optionally clear the detail panel or handle as needed
             # self._update_selected_task_from_row(None)
             return # Keep this return
 
-        self.app_logger.debug(f"Task table cursor highlighted row: {cursor_row}")
+        self.app_logger.debug("Task table cursor highlighted row: %s", cursor_row)
         # Update the detail panel based on the highlighted row
         self._update_selected_task_from_row(cursor_row)
 
         self.app_logger.debug("Handler Exited.") # ADDED Log
 
+    # --- Warm start from the previous session ---
+    def _paint_snapshot(self) -> None:
+        """Shows the view saved by the previous session until the plans are loaded."""
+        snapshot = load_snapshot(self.snapshot_path)
+        if snapshot is None or snapshot.plan_path not in {p.resolve() for p in self.initial_plan_files}:
+            self.query_one(TitleDisplay).update("[b cyan]Metsuke[/] - loading plans...")
+            return
+        self.query_one(TitleDisplay).update(f"[b cyan]Metsuke[/] - {snapshot.project.name}")
+        self.query_one(ProjectInfo)._render_display(snapshot.project, snapshot.plan_path)
+        self._render_view_model(self.query_one("#task-table", DataTable), snapshot.view_model, snapshot.cursor_key)
+        self.app_logger.info(
+            f"Showing {len(snapshot.view_model.rows)} of {snapshot.total_rows} rows of "
+            f"{snapshot.plan_path.name} from the last session while plans load."
+        )
+
+    def _save_snapshot(self) -> None:
+        """Saves the focused plan's view for the next start (see `snapshot`)."""
+        current_plan = self.all_plans.get(self.current_plan_path) if self.current_plan_path else None
+        if current_plan is None:
+            return
+        cursor_key = str(self.selected_task_for_detail.id) if self.selected_task_for_detail else None
+        try:
+            save_snapshot(self.snapshot_path, self.current_plan_path, current_plan.project,
+                          PlanViewModel.for_project(current_plan), cursor_key)
+        except Exception as e:
+            self.app_logger.warning(f"Could not save TUI snapshot to {self.snapshot_path}: {e}")
+
+    def _record_startup_timing(self, stage: str) -> None:
+        """Records the seconds from launch to `stage` (first_frame, plans_loaded)."""
+        if stage in self.startup_timings:
+            return
+        seconds = time.perf_counter() - self.started_at
+        self.startup_timings[stage] = seconds
+        self.app_logger.info(f"Startup: {stage.replace('_', ' ')} after {seconds:.3f}s")
+        if stage == "plans_loaded":
+            try:
+                self.query_one(AppFooter).startup_seconds = seconds
+            except NoMatches:
+                pass
+
     # --- Modified initial load --- 
     def _initial_load_and_focus(self) -> None:
-        """Loads initial plan files and determines the focus plan."""
+        """Loads the initial plan files in a worker thread and determines the focus plan.
+
+        Parsing, focus selection and the focused plan's view model all run off
+        the UI thread; `_finish_initial_load` then shows the result.
+        """
         self.app_logger.info("Performing initial load and focus management...")
-        try:
-            # Ensure core imports are available if not already module level
-            # from ..core import load_plans, manage_focus
-            # from datetime import datetime
+        plan_files = list(self.initial_plan_files)
 
-            loaded_plans = load_plans(self.initial_plan_files)
-            # --- Debug Logging Start ---
-            log_loaded_plans = {str(p): ("Project" if plan else "None") for p, plan in loaded_plans.items()}
-            self.app_logger.debug(f"_initial_load_and_focus: load_plans result: {log_loaded_plans}")
+        def load() -> None:
+            try:
+                loaded_plans = load_plans(plan_files, lazy_descriptions=True)
+                # Focus flags are set in memory here and saved in the background
+                focus_path, plans_to_save = apply_focus(loaded_plans)
+                if focus_path is not None:
+                    PlanViewModel.for_project(loaded_plans[focus_path])
+            except Exception as e:
+                self.call_from_thread(self._initial_load_failed, e)
+                return
+            self.call_from_thread(self._finish_initial_load, loaded_plans, focus_path, plans_to_save)
 
-            # manage_focus might save files if focus needs correction
-            updated_plans, focus_path = manage_focus(loaded_plans)
+        self.run_worker(load, name="initial-load", group="initial-load", thread=True, exclusive=True)
 
-            self.app_logger.debug(f"_initial_load_and_focus: manage_focus returned focus_path: {focus_path}")
+    def _finish_initial_load(self, loaded_plans: Dict[Path, Optional[Project]],
+                             focus_path: Optional[Path], plans_to_save: List[tuple]) -> None:
+        """Shows the plans loaded by `_initial_load_and_focus`, replacing any snapshot."""
+        try:
+            # --- Debug Logging Start ---
+            if self.app_logger.isEnabledFor(logging.DEBUG):
+                log_loaded_plans = {str(p): ("Project" if plan else "None") for p, plan in loaded_plans.items()}
+                self.app_logger.debug("_initial_load_and_focus: load_plans result: %s", log_loaded_plans)
+            self.app_logger.debug("_initial_load_and_focus: apply_focus returned focus_path: %s", focus_path)
 
-            self.all_plans = updated_plans  # Update reactive variable
+            self.all_plans = loaded_plans  # Update reactive variable
             self.current_plan_path = focus_path  # Update reactive variable
             self.last_load_time = datetime.now()
+            self._save_focus_in_background(plans_to_save)
 
-            self.app_logger.debug(f"_initial_load_and_focus: Set self.current_plan_path to: {self.current_plan_path}")
+            self.app_logger.debug("_initial_load_and_focus: Set self.current_plan_path to: %s", self.current_plan_path)
             # --- Debug Logging End ---
 
             if self.current_plan_path is None and any(
-                updated_plans.values()
+                loaded_plans.values()
             ):  # Check if focus is None but plans exist
                 self.app_logger.error(
                     "Failed to determine a focus plan during initial load, although valid plans exist."
@@ -542,6 +735,7 @@ class TaskViewer(App):
                 )
 
             self.update_ui()  # Update UI with loaded data
+            self.call_after_refresh(self._record_startup_timing, "plans_loaded")
             # Update footer initially
             try:
                 footer = self.query_one(AppFooter)
@@ -553,20 +747,8 @@ class TaskViewer(App):
             self.app_logger.info("Initial load and focus management complete.")
 
         except Exception as e:
-            self.app_logger.exception(
-                "Critical error during initial load and focus management."
-            )
-            # Display error to user
-            self.notify(
-                f"Critical error loading plans: {e}",
-                title="Load Error",
-                severity="error",
-                timeout=10,
-            )
-            # Set state to indicate error
-            self.all_plans = {}
-            self.current_plan_path = None
-            self.update_ui()  # Try to update UI to show empty state/error
+            self._initial_load_failed(e)
+            return
 
         # Start file observer AFTER initial load
         self.start_file_observer()
@@ -583,6 +765,22 @@ class TaskViewer(App):
         self.app_logger.debug("Triggering initial detail update for row 0.")
         self._update_selected_task_from_row(0)
 
+    def _initial_load_failed(self, e: Exception) -> None:
+        self.app_logger.error(
+            "Critical error during initial load and focus management.", exc_info=e
+        )
+        # Display error to user
+        self.notify(
+            f"Critical error loading plans: {e}",
+            title="Load Error",
+            severity="error",
+            timeout=10,
+        )
+        # Set state to indicate error
+        self.all_plans = {}
+        self.current_plan_path = None
+        self.update_ui()  # Try to update UI to show empty state/error
+
     def start_file_observer(self) -> None:
         """Starts the watchdog file observer based on loaded plans."""
         if not _HANDLER_WATCHDOG:
@@ -661,6 +859,7 @@ class TaskViewer(App):
                 self.app_logger.exception("Error stopping file observer")
         self.observer = None  # Clear observer reference
 
+    @timed("handle_file_change")
     def handle_file_change(self, event_type: str, path: Path) -> None:
         """Callback for file changes detected by the handler."""
         self.app_logger.info(
@@ -680,9 +879,16 @@ class TaskViewer(App):
                 )
                 return
 
+            existing_plan = current_plans.get(path)
+            if existing_plan is not None and plan_file_matches(existing_plan, path):
+                # Our own save (or a touch); keep the plan and its cached view model
+                self.app_logger.debug("Plan '%s' is unchanged on disk, not reloading.", path.name)
+                return
+
             self.app_logger.info(f"Reloading modified plan: {path.name}")
-            # Reload the single modified plan
-            reloaded_plan_dict = load_plans([path])
+            # Reload the single modified plan into a fresh mapping; the old one
+            # is released with the plan it replaces
+            reloaded_plan_dict = load_plans([path], lazy_descriptions=True)
             reloaded_plan = reloaded_plan_dict.get(path)  # Can be None if load fails
 
             # Check if load status changed or content actually changed
@@ -711,11 +917,11 @@ class TaskViewer(App):
                     f"Created event for already tracked file: {path}. Reloading."
                 )
                 # Treat as modification
-                reloaded_plan_dict = load_plans([path])
+                reloaded_plan_dict = load_plans([path], lazy_descriptions=True)
                 current_plans[path] = reloaded_plan_dict.get(path)
             else:
                 self.app_logger.info(f"Loading newly created plan: {path.name}")
-                new_plan_dict = load_plans([path])
+                new_plan_dict = load_plans([path], lazy_descriptions=True)
                 current_plans[path] = new_plan_dict.get(
                     path
                 )  # Add the new plan (or None if load failed)
@@ -801,12 +1007,13 @@ class TaskViewer(App):
                     )
 
     # --- Modified update_ui ---
+    @timed("update_ui")
     def update_ui(self) -> None:
         """Updates all UI components based on the current state."""
         # Update title/project info regardless of mode first
         current_plan = self.all_plans.get(self.current_plan_path)
         # --- Debug Logging Start ---
-        self.app_logger.debug(f"update_ui: Updating ProjectInfo... current_plan_path={self.current_plan_path}, current_plan is None: {current_plan is None}")
+        self.app_logger.debug("update_ui: Updating ProjectInfo... current_plan_path=%s, current_plan is None: %s", self.current_plan_path, current_plan is None)
         # --- Debug Logging End ---
         try:
             title_widget = self.query_one(TitleDisplay)
@@ -851,108 +1058,10 @@ class TaskViewer(App):
                 # Clear Task Table (No cursor to save/restore here)
                 table.clear(columns=True)
                 # Clear Stats Widgets
-                try:
-                    self.query_one(TaskProgress).update_progress(Counter(), 0.0)
-                    self.query_one(PriorityBreakdown).priority_counts = Counter()
-                    self.query_one(DependencyStatus).update_metrics({})
-                except Exception as e:
-                    self.app_logger.error(f"Error clearing stats widgets: {e}")
+                self.stats.publish_view_model(None)
             else:  # If current_plan is valid
-                # --- 2. Save Cursor State ---
-                saved_row_key_value: Optional[str] = None
-                current_cursor_row = table.cursor_row
-                self.app_logger.debug(f"Update UI: Current cursor row before clear: {current_cursor_row}")
-                if current_cursor_row is not None and 0 <= current_cursor_row < table.row_count:
-                    try:
-                        # Use coordinate_to_cell_key which requires a Coordinate object
-                        cell_key = table.coordinate_to_cell_key(Coordinate(current_cursor_row, 0))
-                        row_key = cell_key.row_key # Extract the RowKey
-                        if row_key and row_key.value is not None:
-                             saved_row_key_value = str(row_key.value) # Task ID is stored as string key
-                             self.app_logger.debug(f"Update UI: Saved row key value: {saved_row_key_value}")
-                    except Exception:
-                        self.app_logger.warning("Update UI: Could not get row key for current cursor.", exc_info=True)
-
-                # Clear Task Table
-                table.clear(columns=True)
-
-                # Populate Task Table
-                try:
-                    tasks = current_plan.tasks
-                    table.add_columns(
-                        "ID", "Title", "Prio", "Status", "Deps"
-                    )
-                    table.fixed_columns = 1
-                    # --- 3. Map RowKey to New Index ---
-                    row_key_to_index_map: Dict[str, int] = {}
-                    for task in tasks:
-                        deps_str = ", ".join(map(str, task.dependencies)) or "None"
-                        status_styled = (
-                            f"[{self._get_status_color(task.status)}]{task.status}[/]")
-                        priority_styled = f"[{self._get_priority_color(task.priority)}]{task.priority}[/]"
-                        # Use task ID as the row key (ensure it's a string)
-                        row_key_str = str(task.id)
-                        table.add_row(
-                            row_key_str,
-                            task.title,
-                            priority_styled,
-                            status_styled,
-                            deps_str,
-                            key=row_key_str,  # Use the string task ID as the key
-                        )
-                        # Map the key (string task ID) to the new row index
-                        row_key_to_index_map[row_key_str] = table.row_count - 1
-
-                    # --- 4. Calculate and Store Target Row for Post-Update Restore ---
-                    self._target_cursor_row_after_update = None # Reset first
-                    target_row_index: int = 0 # Default to first row
-                    if saved_row_key_value is not None:
-                        target_row_index = row_key_to_index_map.get(saved_row_key_value, 0)
-                        # Store the calculated index if a key was saved
-                        self._target_cursor_row_after_update = target_row_index
-                        self.app_logger.debug(f"Update UI: Storing target row for restore: {self._target_cursor_row_after_update}. Found key: {saved_row_key_value in row_key_to_index_map}")
-                    else:
-                         self.app_logger.debug("Update UI: No saved row key value. Restore target set to None.")
-                    # --- End Calculation ---
-
-                    # --- 5. Validation (Implicit) ---
-                    # No manual call to update detail panel here. Rely on CellHighlighted event.
-
-                except Exception as e:
-                    self.app_logger.error(
-                        f"Error populating task table or restoring cursor: {e}", exc_info=True
-                    )
-
-                # Update Stats Widgets
-                try:
-                    if tasks:
-                        total_tasks = len(tasks)
-                        status_counts = Counter(t.status for t in tasks)
-                        priority_counts = Counter(t.priority for t in tasks)
-                        done_count = status_counts.get("Done", 0)
-                        progress_percent = (
-                            (done_count / total_tasks) * 100 if total_tasks > 0 else 0
-                        )
-                        self.query_one(TaskProgress).update_progress(
-                            status_counts, progress_percent
-                        )
-                        self.query_one(
-                            PriorityBreakdown
-                        ).priority_counts = priority_counts
-                        # Refresh static widgets like PriorityBreakdown after updating counts
-                        self.query_one(PriorityBreakdown).refresh()
-                        dep_metrics = self._calculate_dependency_metrics(tasks)
-                        self.query_one(DependencyStatus).update_metrics(dep_metrics)
-                    else:
-                        # If there are no tasks, clear the stats
-                        self.query_one(TaskProgress).update_progress(Counter(), 0.0)
-                        self.query_one(PriorityBreakdown).priority_counts = Counter()
-                        self.query_one(PriorityBreakdown).refresh()
-                        self.query_one(DependencyStatus).update_metrics({})
-                except Exception as e:
-                    self.app_logger.error(
-                        f"Error updating stats widgets: {e}", exc_info=True
-                    )
+                self._render_view_model(table, PlanViewModel.for_project(current_plan))
+                self._prefetch_neighbour_plans()
         else:
             self.app_logger.debug("Skipping task UI update while selecting plan.")
 
@@ -963,72 +1072,116 @@ class TaskViewer(App):
         except Exception as e:
             self.app_logger.error(f"Error updating footer info: {e}")
 
+    def _render_view_model(self, table: DataTable, view_model: PlanViewModel,
+                           cursor_key: Optional[str] = None) -> None:
+        """Fills the task table and stats widgets, keeping the cursor on the same task.
+
+        `cursor_key` (a task id string) overrides the task under the cursor.
+        """
+        # --- 2. Save Cursor State ---
+        saved_row_key_value: Optional[str] = cursor_key
+        current_cursor_row = table.cursor_row if cursor_key is None else None
+        self.app_logger.debug("Update UI: Current cursor row before clear: %s", current_cursor_row)
+        if current_cursor_row is not None and 0 <= current_cursor_row < table.row_count:
+            try:
+                # Use coordinate_to_cell_key which requires a Coordinate object
+                cell_key = table.coordinate_to_cell_key(Coordinate(current_cursor_row, 0))
+                row_key = cell_key.row_key # Extract the RowKey
+                if row_key and row_key.value is not None:
+                     saved_row_key_value = str(row_key.value) # Task ID is stored as string key
+                     self.app_logger.debug("Update UI: Saved row key value: %s", saved_row_key_value)
+            except Exception:
+                self.app_logger.warning("Update UI: Could not get row key for current cursor.", exc_info=True)
+
+        # Clear Task Table
+        table.clear(columns=True)
+
+        # Populate Task Table from the view model
+        try:
+            table.add_columns(*TABLE_COLUMNS)
+            table.fixed_columns = 1
+            for row_key_str, cells in view_model.rows:
+                table.add_row(*cells, key=row_key_str)  # Use the string task ID as the key
+
+            # --- 4. Calculate and Store Target Row for Post-Update Restore ---
+            self._target_cursor_row_after_update = None # Reset first
+            target_row_index: int = 0 # Default to first row
+            if saved_row_key_value is not None:
+                target_row_index = view_model.row_index.get(saved_row_key_value, 0)
+                # Store the calculated index if a key was saved
+                self._target_cursor_row_after_update = target_row_index
+                self.app_logger.debug("Update UI: Storing target row for restore: %s. Found key: %s", self._target_cursor_row_after_update, saved_row_key_value in view_model.row_index)
+            else:
+                 self.app_logger.debug("Update UI: No saved row key value. Restore target set to None.")
+            # --- End Calculation ---
+
+            # --- 5. Validation (Implicit) ---
+            # No manual call to update detail panel here. Rely on CellHighlighted event.
+
+        except Exception as e:
+            self.app_logger.error(
+                f"Error populating task table or restoring cursor: {e}", exc_info=True
+            )
+
+        # Update Stats Widgets (only those whose values changed, see _flush_stats)
+        self.stats.publish_view_model(view_model)
+
+    def _on_stats_changed(self, changed: set) -> None:
+        """Queues the changed statistics; the widgets are updated once per frame."""
+        if not self._changed_stats:
+            self.call_after_refresh(self._flush_stats)
+        self._changed_stats |= changed
+
+    def _flush_stats(self) -> None:
+        """Pushes the statistics changed since the last frame into their widgets."""
+        changed, self._changed_stats = self._changed_stats, set()
+        stats = self.stats
+        try:
+            if changed & {"status_counts", "progress_percent"}:
+                self.query_one(TaskProgress).update_progress(stats.status_counts, stats.progress_percent)
+            if "priority_counts" in changed:
+                self.query_one(PriorityBreakdown).priority_counts = stats.priority_counts
+                # Refresh static widgets like PriorityBreakdown after updating counts
+                self.query_one(PriorityBreakdown).refresh()
+            if "dependency_metrics" in changed:
+                self.query_one(DependencyStatus).update_metrics(stats.dependency_metrics)
+            if "critical_path" in changed:
+                self.query_one(CriticalPathStatus).update_schedule(stats.critical_path)
+        except Exception as e:
+            self.app_logger.error(
+                f"Error updating stats widgets: {e}", exc_info=True
+            )
+
     # Helper methods remain mostly the same, accepting Task objects
     def _get_status_color(self, status: str) -> str:
-        return {
-            "Done": "green",
-            "in_progress": "yellow",
-            "pending": "blue",
-            "blocked": "red",
-        }.get(status, "white")
+        return STATUS_COLORS.get(status, DEFAULT_COLOR)
 
     def _get_priority_color(self, priority: str) -> str:
-        return {
-            "high": "red",
-            "medium": "yellow",
-            "low": "green",
-        }.get(priority, "white")
-
-    # This method now takes List[Task] Pydantic objects
-    def _calculate_dependency_metrics(self, tasks: List[Task]) -> Dict[str, Any]:
-        if not tasks:
-            return {}
-
-        task_map = {t.id: t for t in tasks}
-        done_ids = {t.id for t in tasks if t.status == "Done"}
-        dependents_count = Counter()
-        total_deps = 0
-        no_deps_count = 0
-        blocked_by_deps_count = 0
-        ready_tasks: List[Task] = []  # Explicitly type
-
-        for task in tasks:
-            deps = task.dependencies
-            total_deps += len(deps)
-            if not deps:
-                no_deps_count += 1
-
-            is_blocked = False
-            for dep_id in deps:
-                dependents_count[dep_id] += 1
-                if dep_id not in done_ids:
-                    is_blocked = True
-
-            if task.status != "Done":
-                if is_blocked:
-                    blocked_by_deps_count += 1
-                else:
-                    ready_tasks.append(task)
-
-        most_depended = dependents_count.most_common(1)
-        most_depended_id = most_depended[0][0] if most_depended else None
-        most_depended_count = most_depended[0][1] if most_depended else 0
-
-        next_task: Optional[Task] = None  # Explicitly type
-        if ready_tasks:
-            priority_order = {"high": 0, "medium": 1, "low": 2}
-            ready_tasks.sort(key=lambda t: (priority_order.get(t.priority, 99), t.id))
-            next_task = ready_tasks[0]
-
-        return {
-            "no_deps": no_deps_count,
-            "ready_to_work": len(ready_tasks),
-            "blocked_by_deps": blocked_by_deps_count,
-            "most_depended_id": most_depended_id,
-            "most_depended_count": most_depended_count,
-            "avg_deps": total_deps / len(tasks) if tasks else 0.0,
-            "next_task": next_task,  # Store the Task object itself
-        }
+        return PRIORITY_COLORS.get(priority, DEFAULT_COLOR)
+
+    def _neighbour_plans(self) -> List[Project]:
+        """The plans left/right switching would show next, without view models yet."""
+        valid_plan_paths = sorted(p for p, plan in self.all_plans.items() if plan is not None)
+        if self.current_plan_path not in valid_plan_paths or len(valid_plan_paths) <= 1:
+            return []
+        index = valid_plan_paths.index(self.current_plan_path)
+        neighbours = {valid_plan_paths[(index + step) % len(valid_plan_paths)] for step in (-1, 1)}
+        return [
+            self.all_plans[path] for path in sorted(neighbours)
+            if self.all_plans[path].cache.get(VIEW_MODEL_CACHE_KEY) is None
+        ]
+
+    def _prefetch_neighbour_plans(self) -> None:
+        """Builds the neighbouring plans' view models in a background thread."""
+        plans = self._neighbour_plans()
+        if not plans:
+            return
+
+        def warm() -> None:
+            for plan in plans:
+                PlanViewModel.for_project(plan)
+
+        self.run_worker(warm, name="prefetch-plans", group="prefetch", thread=True, exclusive=True)
 
     # Action methods moved from Metsuke.py
     def action_copy_log(self) -> None:
@@ -1042,11 +1195,12 @@ class TaskViewer(App):
             )
             return
 
-        if self.tui_handler and self.tui_handler.messages:
-            log_content = "\n".join(self.tui_handler.messages)
+        messages = self.tui_handler.snapshot() if self.tui_handler else []
+        if messages:
+            log_content = "\n".join(messages)
             try:
                 pyperclip.copy(log_content)
-                msg = f"{len(self.tui_handler.messages)} log lines copied to clipboard."
+                msg = f"{len(messages)} log lines copied to clipboard."
                 self.app_logger.info(msg)
                 self.notify(msg, title="Log Copied")
             except Exception as e:
@@ -1062,7 +1216,7 @@ class TaskViewer(App):
     def action_toggle_log(self) -> None:
         """Toggles the visibility of the log view panel."""
         try:
-            log_widget = self.query_one(Log)
+            log_widget = self._log_view()
             log_widget.display = not log_widget.display
             self.app_logger.info(
                 f"Log view display toggled {'on' if log_widget.display else 'off'}."
@@ -1091,6 +1245,112 @@ class TaskViewer(App):
         except Exception as e:
             self.app_logger.error(f"Error toggling log display: {e}")
 
+    # --- Panels mounted on first use ---
+    def _log_view(self) -> Log:
+        """Returns the Log, mounting it (with the messages logged so far) on first use."""
+        try:
+            return self.query_one(Log)
+        except NoMatches:
+            log_widget = Log(id="log-view", max_lines=200, highlight=True)
+            self.mount(log_widget, before=self.query_one(AppFooter))
+            if self.tui_handler:
+                self.tui_handler.attach(log_widget)
+            return log_widget
+
+    def action_toggle_timings(self) -> None:
+        """Shows or hides the timings panel (p50/p99 of the hot-path spans, memory use)."""
+        try:
+            panel = self.query_one(TimingsPanel)
+        except NoMatches:
+            panel = TimingsPanel(id="timings-panel")
+            self.mount(panel, before=self.query_one(AppFooter))
+            panel.display = False
+        panel.display = not panel.display
+        if panel.display:
+            self._memory_measured_at = None
+            self._refresh_timings_panel(panel)
+            if self._timings_timer is None:
+                self._timings_timer = self.set_interval(
+                    TIMINGS_REFRESH_SECONDS, lambda: self._refresh_timings_panel(panel)
+                )
+            else:
+                self._timings_timer.resume()
+        elif self._timings_timer is not None:
+            self._timings_timer.pause()
+
+    def _refresh_timings_panel(self, panel: TimingsPanel) -> None:
+        panel.update_timings(timing_snapshot())
+        now = time.monotonic()
+        if self._memory_measured_at is None or now - self._memory_measured_at >= MEMORY_REFRESH_SECONDS:
+            self._memory_measured_at = now
+            self._measure_memory(panel)
+
+    def _measure_memory(self, panel: TimingsPanel) -> None:
+        """Sizes the plans, log messages and task table rows in a worker thread."""
+        plans = [plan for plan in self.all_plans.values() if plan is not None]
+        messages = self.tui_handler.snapshot() if self.tui_handler else []
+        table = self.query_one("#task-table", DataTable)
+        # DataTable keeps its cells in `_data` (row key -> column key -> value)
+        table_rows = (table._data, table.rows)
+
+        def measure() -> None:
+            seen: set = set()
+            plans_memory = plan_footprint(plans, seen=seen)
+            rows = [
+                ("Plans", plans_memory["total_bytes"],
+                 f"{plans_memory['plans']} plans, {plans_memory['tasks']} tasks, "
+                 f"{plans_memory['bytes_per_task']} B/task"),
+                ("  tasks", plans_memory["tasks_bytes"], ""),
+                ("  descriptions", plans_memory["descriptions_bytes"],
+                 f"+ {format_bytes(plans_memory['mapped_bytes'])} mapped"),
+                ("  source snapshots", plans_memory["source_snapshot_bytes"], "kept for merging"),
+                ("  caches", plans_memory["cache_bytes"], "view models, indexes"),
+                ("Log messages", deep_sizeof(messages, seen=seen), f"{len(messages)} lines"),
+                ("Task table rows", deep_sizeof(*table_rows, seen=seen), f"{len(table_rows[1])} rows"),
+            ]
+            if tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                rows.append(("Traced heap", current, f"peak {format_bytes(peak)}"))
+            self.call_from_thread(panel.update_memory, rows)
+
+        self.run_worker(measure, name="measure-memory", group="memory", thread=True, exclusive=True)
+
+    def _plan_selection_table(self) -> DataTable:
+        """Returns the plan selection table, mounting it on first use."""
+        try:
+            return self.query_one("#plan-selection-table", DataTable)
+        except NoMatches:
+            table = DataTable(id="plan-selection-table")
+            self.query_one("#main-container").mount(table, after="#task-table")
+            return table
+
+    def action_toggle_profiler(self) -> None:
+        """Starts sampling update_ui/load_plans/save_plan, or stops and saves the profile."""
+        if self.profiler is None:
+            profiler = SamplingProfiler(focus=(TaskViewer.update_ui, load_plans, save_plan))
+            try:
+                profiler.start()
+            except ProfilerUnavailableError as e:
+                self.notify(str(e), title="Profiler", severity="warning")
+                return
+            self.profiler = profiler
+            self.app_logger.info("Sampling profiler started.")
+            self.notify("Profiling update_ui, load_plans and save_plan. Press Ctrl+R again to stop.",
+                        title="Profiler")
+            return
+
+        profiler, self.profiler = self.profiler, None
+        profiler.stop()
+        path = default_profile_dir(Path.cwd()) / f"{profile_stem('tui')}.collapsed"
+        try:
+            profiler.dump(path)
+        except OSError as e:
+            self.app_logger.error(f"Could not write profile to {path}: {e}")
+            self.notify(f"Could not write profile: {e}", title="Profiler", severity="error")
+            return
+        self.app_logger.info(f"Sampling profiler stopped; {profiler.samples} samples written to {path}")
+        self.notify(f"{profiler.samples} samples written to {path}", title="Profiler")
+
     def action_show_help(self) -> None:
         """Shows the help/context modal screen."""
         current_plan = self.all_plans.get(self.current_plan_path)
@@ -1116,14 +1376,15 @@ class TaskViewer(App):
             dashboard = self.query_one("#dashboard")
             task_table = self.query_one("#task-table", DataTable)
             detail_panel = self.query_one("#detail-panel") # Get detail panel reference
-            plan_table = self.query_one("#plan-selection-table", DataTable)
+            # Only mount the plan table once it is actually shown
+            plan_table = self._plan_selection_table() if selecting else None
             footer = self.query_one(AppFooter)
 
             # Show/hide dashboard and main content panels
             dashboard.display = not selecting
             task_table.display = not selecting # Hide task table when selecting
             detail_panel.display = not selecting # Hide detail panel when selecting
-            plan_table.display = selecting # Show plan table when selecting
+            self.query("#plan-selection-table").set(display=selecting) # Show plan table when selecting
 
             # Update footer and set focus
             if selecting: # Switching TO plan selection
@@ -1146,9 +1407,9 @@ class TaskViewer(App):
     def _populate_plan_selection_table(self) -> None:
         """Populates the plan selection table with discovered plans."""
         # ADD Debug log for self.all_plans
-        self.app_logger.debug(f"Populating plan table. self.all_plans = {self.all_plans!r}")
+        self.app_logger.debug("Populating plan table. self.all_plans = %r", self.all_plans)
         
-        table = self.query_one("#plan-selection-table", DataTable)
+        table = self._plan_selection_table()
         table.clear()
         # ADD Columns explicitly if clear removed them
         table.add_columns(" ", "Plan Name", "Path", "FullPath") # Ensure columns exist
@@ -1222,15 +1483,13 @@ class TaskViewer(App):
         )
 
         try:
-            # Manage focus handles the logic of setting 'focus: false' on the old plan
-            # and 'focus: true' on the new one, then saving them.
-            updated_plans, new_focus_path = manage_focus(
+            # Flip the focus flags in memory and show the plan right away; the
+            # two plan files are rewritten in the background.
+            new_focus_path, plans_to_save = apply_focus(
                 self.all_plans, new_focus_target=target_path
             )
-
-            # Update the internal state AFTER manage_focus has potentially saved files
-            self.all_plans = updated_plans
             self.current_plan_path = new_focus_path # Should be == target_path if successful
+            self._save_focus_in_background(plans_to_save)
 
             if self.current_plan_path == target_path:
                 self.app_logger.info(f"Successfully switched focus to {target_path.name}")
@@ -1252,6 +1511,18 @@ class TaskViewer(App):
             self.app_logger.exception(f"Error switching focus to {target_path.name}")
             self.notify(f"Error switching plan: {e}", severity="error")
 
+    def _save_focus_in_background(self, plans_to_save: List[tuple]) -> None:
+        if not plans_to_save:
+            return
+
+        def save() -> None:
+            if not save_focus_changes(plans_to_save):
+                self.call_from_thread(
+                    self.notify, "Could not save the focus change; see log", severity="error"
+                )
+
+        self.run_worker(save, name="save-focus", group="save-focus", thread=True)
+
     # --- Actions for Plan Switching (Left/Right Arrows) ---
     def action_previous_plan(self) -> None:
         """Switches focus to the previous plan file in the sorted list."""
@@ -1353,7 +1624,7 @@ class TaskViewer(App):
     # --- ADD on_key method to handle Enter/Escape in plan selection --- 
     async def on_key(self, event: events.Key) -> None:
         """Handle key presses, especially for plan selection."""
-        self.app_logger.debug(f"Key pressed: {event.key}, Selecting Plan: {self.selecting_plan}, Focused: {self.focused}")
+        self.app_logger.debug("Key pressed: %s, Selecting Plan: %s, Focused: %s", event.key, self.selecting_plan, self.focused)
 
         # Handle Escape key
         if event.key == "escape":
@@ -1405,7 +1676,7 @@ class TaskViewer(App):
             return # Handled
         
         # If not handled by the above, let the event bubble up for other bindings
-        self.app_logger.debug(f"Key {event.key} not handled by on_key logic.")
+        self.app_logger.debug("Key %s not handled by on_key logic.", event.key)
         
     def action_toggle_status(self) -> None:
         """Toggle task status between pending/in_progress/Done by modifying the plan file directly."""
@@ -1431,11 +1702,14 @@ class TaskViewer(App):
                     
                     # 更新selected_task引用
                     self.selected_task_for_detail = t
+                    project.invalidate_cache()
                     break
             
             # 保存到文件
             from ..core import save_plan
-            save_plan(project, self.current_plan_path)
+            if not save_plan(project, self.current_plan_path):
+                self.notify("Plan was changed elsewhere and could not be merged; see log", severity="error")
+                return
             
             # 完全刷新UI而不仅是更新单元格
             self.update_ui()
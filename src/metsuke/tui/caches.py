@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Caches that keep the TUI responsive on large plans."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from markdown_it import MarkdownIt
+
+# Bounds for MarkdownCache: documents kept, and their total source length
+MARKDOWN_CACHE_DOCUMENTS = 64
+MARKDOWN_CACHE_CHARS = 2_000_000
+
+
+class MarkdownCache:
+    """LRU cache of parsed Markdown token streams, keyed by (task id, text hash).
+
+    Pass `parser_factory` to `Markdown(parser_factory=...)` and call
+    `for_task` before each `Markdown.update`; revisiting a task then skips
+    parsing its description again. Entries are evicted least recently used
+    first once either bound is exceeded (the newest entry is always kept).
+    """
+
+    def __init__(self, max_documents: int = MARKDOWN_CACHE_DOCUMENTS,
+                 max_chars: int = MARKDOWN_CACHE_CHARS) -> None:
+        self.max_documents = max_documents
+        self.max_chars = max_chars
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[Optional[int], int], Tuple[str, List[Any]]]" = OrderedDict()
+        self._chars = 0
+        self._task_id: Optional[int] = None
+        self._parser: Optional[MarkdownIt] = None
+        # Markdown widgets parse in a worker thread
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def for_task(self, task_id: Optional[int]) -> None:
+        """Sets the task the next parser created by `parser_factory` caches for."""
+        self._task_id = task_id
+
+    def parser_factory(self) -> "_CachedParser":
+        return _CachedParser(self, self._task_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+    def parse(self, task_id: Optional[int], markdown: str) -> List[Any]:
+        key = (task_id, hash(markdown))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == markdown:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            if self._parser is None:
+                self._parser = MarkdownIt("gfm-like")
+            parser = self._parser
+        tokens = parser.parse(markdown)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._chars -= len(previous[0])
+            self._entries[key] = (markdown, tokens)
+            self._chars += len(markdown)
+            while len(self._entries) > 1 and (len(self._entries) > self.max_documents
+                                              or self._chars > self.max_chars):
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._chars -= len(evicted)
+        return tokens
+
+
+class _CachedParser:
+    """The `parse` interface `Markdown` expects from a MarkdownIt instance."""
+
+    __slots__ = ("_cache", "_task_id")
+
+    def __init__(self, cache: MarkdownCache, task_id: Optional[int]) -> None:
+        self._cache = cache
+        self._task_id = task_id
+
+    def parse(self, markdown: str) -> List[Any]:
+        return self._cache.parse(self._task_id, markdown)
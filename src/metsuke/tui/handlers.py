@@ -2,18 +2,22 @@
 """Event handlers for the Metsuke TUI (Logging, File Watching)."""
 
 import logging
+import logging.handlers
+import queue
+import threading
 from collections import deque
 from pathlib import Path
 import time # Import time for potential debouncing
-from typing import Dict, Optional # Add missing import
+from typing import Dict, List, Optional # Add missing import
 
 from textual.app import App
+from textual.message import Message
 from textual.widgets import Log
 
 # Conditional import for watchdog
 try:
     from watchdog.observers import Observer
-    from watchdog.events import FileSystemEventHandler, FileModifiedEvent, FileCreatedEvent, FileDeletedEvent, DirModifiedEvent, DirCreatedEvent, DirDeletedEvent # Import specific events
+    from watchdog.events import FileSystemEventHandler, FileModifiedEvent, FileCreatedEvent, FileDeletedEvent, FileMovedEvent, DirModifiedEvent, DirCreatedEvent, DirDeletedEvent # Import specific events
     _WATCHDOG_AVAILABLE = True
 except ImportError:
     _WATCHDOG_AVAILABLE = False
@@ -23,6 +27,7 @@ except ImportError:
     class FileModifiedEvent: pass
     class FileCreatedEvent: pass
     class FileDeletedEvent: pass
+    class FileMovedEvent: pass
     class DirModifiedEvent: pass
     class DirCreatedEvent: pass
     class DirDeletedEvent: pass
@@ -31,24 +36,127 @@ except ImportError:
 PLAN_FILE = Path("PROJECT_PLAN.yaml") # Assuming default, might need to be passed in
 
 # --- TUI Log Handler ---
+# Rotating log file defaults for TuiLogPipeline
+LOG_FILE_MAX_BYTES = 1_000_000
+LOG_FILE_BACKUPS = 3
+LOG_FORMAT = "%(asctime)s %(levelname)-8s %(name)s: %(message)s"
+LOG_DATE_FORMAT = "%H:%M:%S"
+
+
+class LogBatchReady(Message):
+    """Posted to the app when TuiLogHandler has messages waiting for the Log."""
+
+
 class TuiLogHandler(logging.Handler):
-    """A logging handler that writes records to a Textual Log widget."""
-    def __init__(self, log_widget: Log):
+    """Collects formatted log messages for the TUI's Log widget.
+
+    Records arrive on the `TuiLogPipeline` listener thread, never the UI
+    thread. Messages are kept for copying; once a Log is attached, the first
+    message of a batch posts `LogBatchReady` to the app, which writes the
+    whole batch with `write_pending` on its next frame.
+    """
+    def __init__(self, app: Optional[App] = None, max_lines: int = 200):
         super().__init__()
-        self.log_widget = log_widget
+        self.app = app
+        self.log_widget: Optional[Log] = None
         # Store messages in a deque with max length matching the widget
-        self.messages = deque(maxlen=getattr(log_widget, 'max_lines', None) or 200)
+        self.messages = deque(maxlen=max_lines)
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+
+    def attach(self, log_widget: Log) -> None:
+        """Starts writing to `log_widget`, replaying the messages kept so far."""
+        with self._lock:
+            self.log_widget = log_widget
+            self._pending.clear()
+            text = "".join(self.messages)
+        # Formatted messages already end with a newline
+        log_widget.write(text)
 
     def emit(self, record):
         try:
             msg = self.format(record)
-            # Use call_from_thread to safely update the widget from any thread
-            # self.log_widget.app.call_from_thread(self.log_widget.write, msg) # Old line
-            self.log_widget.write(msg) # New line - direct write
-            self.messages.append(msg) # Also store the message
+            with self._lock:
+                self.messages.append(msg) # Also store the message
+                if self.log_widget is None:
+                    return
+                first_in_batch = not self._pending
+                self._pending.append(msg)
+            if first_in_batch and self.app is not None:
+                self.app.post_message(LogBatchReady()) # Thread safe
         except Exception:
             self.handleError(record)
 
+    def write_pending(self) -> None:
+        """Writes the messages received since the last call to the Log (UI thread only)."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            log_widget = self.log_widget
+        if pending and log_widget is not None:
+            log_widget.write("".join(pending))
+
+    def snapshot(self) -> List[str]:
+        """The messages kept so far, oldest first."""
+        with self._lock:
+            return list(self.messages)
+
+
+class TuiLogPipeline:
+    """Routes a logger's records through a queue to the TUI and an optional file.
+
+    The logger is gated at `level`, so disabled records cost one level check.
+    Enabled records are only enqueued by the logging thread; a
+    `QueueListener` thread formats them and hands them to `handler` and, if
+    `log_file` is given, to a rotating file.
+    """
+    def __init__(self, handler: TuiLogHandler, level: int = logging.INFO,
+                 log_file: Optional[Path] = None, max_bytes: int = LOG_FILE_MAX_BYTES,
+                 backup_count: int = LOG_FILE_BACKUPS):
+        self.handler = handler
+        self.level = level
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self._queue_handler = logging.handlers.QueueHandler(self._queue)
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._file_handler: Optional[logging.Handler] = None
+        self._logger: Optional[logging.Logger] = None
+
+    def start(self, logger: logging.Logger) -> None:
+        formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+        # The TUI log shows one message per line
+        self.handler.setFormatter(logging.Formatter(LOG_FORMAT + "\n", datefmt=LOG_DATE_FORMAT))
+        handlers: List[logging.Handler] = [self.handler]
+        if self.log_file is not None:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            self._file_handler = logging.handlers.RotatingFileHandler(
+                self.log_file, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8"
+            )
+            self._file_handler.setFormatter(formatter)
+            handlers.append(self._file_handler)
+        self._listener = logging.handlers.QueueListener(self._queue, *handlers)
+        self._listener.start()
+
+        logger.setLevel(self.level)
+        # Avoid adding handler if already added (e.g., if app restarts)
+        if self._queue_handler not in logger.handlers:
+            logger.addHandler(self._queue_handler)
+        logger.propagate = False  # Don't pass logs up to root
+        self._logger = logger
+
+    def stop(self) -> None:
+        """Detaches from the logger and writes out everything still queued."""
+        if self._logger is not None:
+            self._logger.removeHandler(self._queue_handler)
+            self._logger = None
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self._file_handler is not None:
+            self._file_handler.close()
+            self._file_handler = None
+
 
 # --- Watchdog Event Handler (Modified) ---
 class DirectoryEventHandler(FileSystemEventHandler):
@@ -137,10 +245,12 @@ class DirectoryEventHandler(FileSystemEventHandler):
              self._dispatch_to_app("deleted", deleted_path)
         # else: ignore deletion of non-matching files/subdirs
 
-    # on_moved can be complex, potentially treat as delete + create
-    # For simplicity, we might ignore moves or rely on separate create/delete events
-    # def on_moved(self, event):
-    #     pass
+    def on_moved(self, event: FileMovedEvent):
+        """Called when a file is renamed; plans are saved by renaming a temp file over them."""
+        if isinstance(event, FileMovedEvent):
+            path = self._should_process(event.dest_path)
+            if path:
+                self._dispatch_to_app("modified", path)
 
 # Remove old PlanFileEventHandler
 # class PlanFileEventHandler(FileSystemEventHandler):
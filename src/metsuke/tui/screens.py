@@ -64,6 +64,8 @@ class HelpScreen(ModalScreen):
 *   `Delete`: Delete selected task/subtask
 *   `Up/Down`: Navigate tasks
 *   `Left/Right`: Navigate focus plans
+*   `Ctrl+R`: Start/stop the sampling profiler (writes to `.metsuke/profiles/`)
+*   `Ctrl+T`: Show/hide hot-path timings (p50/p99 per span) and memory use
 *   `?`: Show this help screen\
 """)
             yield Static("Press Esc to close.", classes="close-hint")
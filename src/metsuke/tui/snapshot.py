@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Warm-start snapshot of the last TUI view.
+
+On exit the TUI saves the focused plan's view model (a window of table rows
+around the cursor, plus the dashboard statistics) to
+`.metsuke/tui_snapshot.json`. On the next start it paints that snapshot
+straight away and replaces it once the plans have been loaded, so the first
+frame does not wait for plan parsing. Only a bounded number of rows is
+kept, so painting it costs the same for any plan size.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+
+from ..core import METSUKE_DIR_NAME
+from ..models import ProjectMeta
+from .view_model import PlanViewModel
+
+SNAPSHOT_NAME = "tui_snapshot.json"
+SNAPSHOT_VERSION = 1
+# Table rows kept around the cursor
+SNAPSHOT_ROWS = 400
+
+logger = logging.getLogger("metsuke.tui.snapshot")
+
+
+class ViewSnapshot(NamedTuple):
+    plan_path: Path
+    project: ProjectMeta
+    view_model: PlanViewModel
+    cursor_key: Optional[str]
+    total_rows: int
+
+
+def default_snapshot_path(base_dir: Path) -> Path:
+    """Returns the snapshot kept in `base_dir/.metsuke/`."""
+    return base_dir / METSUKE_DIR_NAME / SNAPSHOT_NAME
+
+
+def save_snapshot(path: Path, plan_path: Path, project: ProjectMeta, view_model: PlanViewModel,
+                  cursor_key: Optional[str]) -> None:
+    """Writes the snapshot atomically, keeping `SNAPSHOT_ROWS` rows around `cursor_key`."""
+    cursor = view_model.row_index.get(cursor_key, 0) if cursor_key is not None else 0
+    start = max(0, min(cursor - SNAPSHOT_ROWS // 2, len(view_model.rows) - SNAPSHOT_ROWS))
+    data: Dict[str, Any] = {
+        "version": SNAPSHOT_VERSION,
+        "plan_path": str(plan_path.resolve()),
+        "project": project.model_dump(mode="json"),
+        "cursor_key": cursor_key,
+        "total_rows": len(view_model.rows),
+        "view_model": view_model.to_data(start, start + SNAPSHOT_ROWS),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def load_snapshot(path: Path) -> Optional[ViewSnapshot]:
+    """Reads a snapshot; None if there is none or it is unreadable or outdated."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SNAPSHOT_VERSION:
+            return None
+        return ViewSnapshot(
+            plan_path=Path(data["plan_path"]),
+            project=ProjectMeta.model_validate(data["project"]),
+            view_model=PlanViewModel.from_data(data["view_model"]),
+            cursor_key=data.get("cursor_key"),
+            total_rows=data["total_rows"],
+        )
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable TUI snapshot {path}: {e}")
+        return None
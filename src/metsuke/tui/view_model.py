@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""Precomputed per-plan display data for the TUI.
+
+A `PlanViewModel` holds everything `TaskViewer.update_ui` shows for a plan:
+the task table rows as ready-made Rich `Text` cells, and the dashboard
+statistics. It is built once per plan version and cached on the `Project`
+(see `PlanViewModel.for_project`), so switching back to a plan only
+re-populates the widgets. Call `Project.invalidate_cache()` after changing
+tasks in place.
+
+`DashboardStats` holds the statistics currently on screen and tells its
+subscribers which of them changed, so unchanged widgets are left alone.
+"""
+
+import logging
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from rich.text import Text
+
+from ..exceptions import PlanValidationError
+from ..models import Project, Task
+from ..schedule import critical_path
+from ..table import TaskTable
+
+CACHE_KEY = "tui.view_model"
+
+STATUS_COLORS = {"Done": "green", "in_progress": "yellow", "pending": "blue", "blocked": "red"}
+PRIORITY_COLORS = {"high": "red", "medium": "yellow", "low": "green"}
+DEFAULT_COLOR = "white"
+TABLE_COLUMNS = ("ID", "Title", "Prio", "Status", "Deps")
+# Dashboard statistics, as named by PlanViewModel and DashboardStats
+STATS_FIELDS = ("status_counts", "priority_counts", "progress_percent", "dependency_metrics", "critical_path")
+
+logger = logging.getLogger("metsuke.tui.view_model")
+
+# Status and priority cells are shared by all rows with the same value
+_status_cells: Dict[str, Text] = {}
+_priority_cells: Dict[str, Text] = {}
+
+
+def _cell(value: str, style: str = "") -> Text:
+    # Plain Text cells skip the markup parsing DataTable applies to strings
+    return Text(value, style=style, no_wrap=True, end="")
+
+
+def _styled_cell(cells: Dict[str, Text], colors: Dict[str, str], value: str) -> Text:
+    cell = cells.get(value)
+    if cell is None:
+        cell = _cell(value, colors.get(value, DEFAULT_COLOR))
+        cells[value] = cell
+    return cell
+
+
+def dependency_metrics(tasks: List[Task], task_table: TaskTable) -> Dict[str, Any]:
+    """Dashboard dependency metrics, with the suggested task as a `Task` (`next_task`)."""
+    if not tasks:
+        return {}
+    metrics = task_table.dependency_metrics()
+    next_task_id = metrics.pop("next_task_id", None)
+    metrics["next_task"] = tasks[task_table.row_of(next_task_id)] if next_task_id is not None else None
+    return metrics
+
+
+def critical_path_summary(task_table: TaskTable) -> Dict[str, Any]:
+    """Summarizes the critical path for the CriticalPathStatus widget."""
+    try:
+        schedule = critical_path(task_table)
+    except PlanValidationError as e:
+        logger.warning(f"Cannot compute critical path: {e}")
+        return {"error": "Dependency cycle detected"}
+    with_slack = sum(
+        1 for row in range(len(task_table))
+        if schedule.duration[row] > 0 and schedule.slack[row] > 0
+    )
+    return {"path": schedule.critical_path, "with_slack": with_slack}
+
+
+class PlanViewModel:
+    """Table rows and dashboard statistics for one plan version."""
+
+    __slots__ = ("rows", "row_index", "status_counts", "priority_counts", "progress_percent",
+                 "dependency_metrics", "critical_path")
+
+    def __init__(self, project: Project) -> None:
+        tasks = project.tasks
+        # (row key, cells) per task; the key is the task id as a string
+        self.rows: List[Tuple[str, Tuple[Any, ...]]] = []
+        for task in tasks:
+            key = str(task.id)
+            self.rows.append((key, (
+                _cell(key),
+                _cell(task.title),
+                _styled_cell(_priority_cells, PRIORITY_COLORS, task.priority),
+                _styled_cell(_status_cells, STATUS_COLORS, task.status),
+                _cell(", ".join(map(str, task.dependencies)) or "None"),
+            )))
+        self.row_index: Dict[str, int] = {key: row for row, (key, _) in enumerate(self.rows)}
+
+        if tasks:
+            task_table = TaskTable.from_project(project)
+            self.status_counts: Counter = task_table.status_counts()
+            self.priority_counts: Counter = task_table.priority_counts()
+            self.progress_percent: float = task_table.progress_percent()
+            self.dependency_metrics: Dict[str, Any] = dependency_metrics(tasks, task_table)
+            self.critical_path: Dict[str, Any] = critical_path_summary(task_table)
+        else:
+            self.status_counts = Counter()
+            self.priority_counts = Counter()
+            self.progress_percent = 0.0
+            self.dependency_metrics = {}
+            self.critical_path = {}
+
+    def to_data(self, start: int = 0, stop: Optional[int] = None) -> Dict[str, Any]:
+        """JSON-ready copy of rows `start:stop` and all statistics (see `from_data`)."""
+        metrics = dict(self.dependency_metrics)
+        next_task = metrics.get("next_task")
+        if next_task is not None:
+            metrics["next_task"] = next_task.model_dump(mode="json", exclude={"description"})
+        return {
+            "rows": [[cell.plain for cell in cells] for _, cells in self.rows[start:stop]],
+            "status_counts": dict(self.status_counts),
+            "priority_counts": dict(self.priority_counts),
+            "progress_percent": self.progress_percent,
+            "dependency_metrics": metrics,
+            "critical_path": self.critical_path,
+        }
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "PlanViewModel":
+        """Rebuilds a view model saved with `to_data`."""
+        view_model = cls.__new__(cls)
+        view_model.rows = [
+            (key, (_cell(key), _cell(title), _styled_cell(_priority_cells, PRIORITY_COLORS, priority),
+                   _styled_cell(_status_cells, STATUS_COLORS, status), _cell(deps)))
+            for key, title, priority, status, deps in data["rows"]
+        ]
+        view_model.row_index = {key: row for row, (key, _) in enumerate(view_model.rows)}
+        view_model.status_counts = Counter(data["status_counts"])
+        view_model.priority_counts = Counter(data["priority_counts"])
+        view_model.progress_percent = data["progress_percent"]
+        metrics = dict(data["dependency_metrics"])
+        if metrics.get("next_task") is not None:
+            metrics["next_task"] = Task.model_validate(metrics["next_task"])
+        view_model.dependency_metrics = metrics
+        view_model.critical_path = data["critical_path"]
+        return view_model
+
+    @classmethod
+    def for_project(cls, project: Project) -> "PlanViewModel":
+        """Returns the view model cached on `project`, building it on first use."""
+        view_model = project.cache.get(CACHE_KEY)
+        if view_model is None:
+            generation = project.cache.generation
+            view_model = cls(project)
+            # Not cached if the plan was edited while this was being built
+            project.cache.set(CACHE_KEY, view_model, generation)
+        return view_model
+
+
+def _display_value(value: Any) -> Any:
+    # Tasks compare by what the dashboard shows of them, not by their full state
+    if isinstance(value, Task):
+        return (value.id, value.title, value.priority, tuple(value.dependencies))
+    if isinstance(value, dict):
+        return {key: _display_value(item) for key, item in value.items()}
+    return value
+
+
+class DashboardStats:
+    """The dashboard statistics on screen, with change notifications.
+
+    `publish` stores new values and calls each subscriber once with the names
+    of the fields that actually changed; publishing equal values notifies
+    nobody.
+    """
+
+    def __init__(self) -> None:
+        # None until first published, so the first values always notify
+        self.status_counts: Optional[Counter] = None
+        self.priority_counts: Optional[Counter] = None
+        self.progress_percent: Optional[float] = None
+        self.dependency_metrics: Optional[Dict[str, Any]] = None
+        self.critical_path: Optional[Dict[str, Any]] = None
+        self._subscribers: List[Callable[[Set[str]], None]] = []
+
+    def subscribe(self, callback: Callable[[Set[str]], None]) -> None:
+        self._subscribers.append(callback)
+
+    def publish(self, **values: Any) -> Set[str]:
+        """Sets the given `STATS_FIELDS` and returns (and notifies) those that changed."""
+        changed = set()
+        for field, value in values.items():
+            if field not in STATS_FIELDS:
+                raise AttributeError(f"Unknown dashboard statistic: {field}")
+            if _display_value(getattr(self, field)) != _display_value(value):
+                setattr(self, field, value)
+                changed.add(field)
+        if changed:
+            for callback in self._subscribers:
+                callback(changed)
+        return changed
+
+    def publish_view_model(self, view_model: Optional[PlanViewModel]) -> Set[str]:
+        """Publishes a plan's statistics, or empty ones for no plan."""
+        if view_model is None:
+            return self.publish(status_counts=Counter(), priority_counts=Counter(), progress_percent=0.0,
+                                dependency_metrics={}, critical_path={})
+        return self.publish(**{field: getattr(view_model, field) for field in STATS_FIELDS})
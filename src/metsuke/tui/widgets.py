@@ -14,6 +14,7 @@ from textual.reactive import reactive, var
 from textual.binding import Binding
 from rich.text import Text
 from rich.panel import Panel
+from rich.table import Table
 
 # Import Pydantic models from the core package
 # Assuming models.py is one level up from tui directory
@@ -76,7 +77,7 @@ class ProjectInfo(Static):
         """Updates the renderable content based on current state."""
         # --- Debug Logging Start ---
         # Log the arguments passed in
-        logging.getLogger(__name__).debug(f"_render_display called with: project={project!r}, plan_path={plan_path!r}")
+        logging.getLogger(__name__).debug("_render_display called with: project=%r, plan_path=%r", project, plan_path)
         # --- Debug Logging End ---
         if project: # Use the passed argument
             try:
@@ -102,7 +103,7 @@ class ProjectInfo(Static):
             if project.license: # Add license on a new line if present
                 info_text += f"\n[{license_style}]License: {project.license}[/]"
             # Use Text object for centering
-            logging.getLogger(__name__).debug(f"Generated info_text: {info_text!r}")
+            logging.getLogger(__name__).debug("Generated info_text: %r", info_text)
             self.update(Text.from_markup(info_text, justify="center"))
             logging.getLogger(__name__).debug("ProjectInfo update call completed within if.")
         else:
@@ -115,7 +116,7 @@ class ProjectInfo(Static):
                     display_path = plan_path.name
                 error_text = f"[b red]Error loading:[/] [{path_style}]{display_path}[/]"
             # Use Text object for centering
-            logging.getLogger(__name__).debug(f"Generated error_text: {error_text!r}")
+            logging.getLogger(__name__).debug("Generated error_text: %r", error_text)
             self.update(Text.from_markup(error_text, justify="center"))
             logging.getLogger(__name__).debug("ProjectInfo update call completed within else.")
 
@@ -140,7 +141,7 @@ class TaskProgress(Container):
         yield ProgressBar(total=100.0, show_eta=False, id="overall-progress-bar")
 
     def update_progress(self, counts: Dict[str, int], progress_percent: float) -> None:
-        logging.getLogger(__name__).info(f"TaskProgress received counts: {counts}, progress: {progress_percent:.1f}%")
+        logging.getLogger(__name__).debug("TaskProgress received counts: %s, progress: %.1f%%", counts, progress_percent)
         self.counts = counts
         self.progress_percent = progress_percent
 
@@ -197,7 +198,7 @@ class DependencyStatus(Static):
 
     def update_metrics(self, metrics: Dict[str, Any]) -> None:
         """Updates the widget with pre-calculated dependency metrics."""
-        logging.getLogger(__name__).info(f"DependencyStatus received metrics: {metrics}")
+        logging.getLogger(__name__).debug("DependencyStatus received metrics: %s", metrics)
         self.metrics = metrics
         self.refresh()
 
@@ -227,12 +228,49 @@ class DependencyStatus(Static):
         return "\n".join(lines)
 
 
+class CriticalPathStatus(Static):
+    """Displays the critical path of unfinished work."""
+
+    summary: var[Dict[str, Any]] = var({}) # Holds the computed schedule summary
+
+    # Maximum number of task ids listed before the chain is abbreviated
+    MAX_LISTED_TASKS = 8
+
+    def update_schedule(self, summary: Dict[str, Any]) -> None:
+        """Updates the widget with a pre-computed schedule summary."""
+        self.summary = summary
+        self.refresh()
+
+    def render(self) -> str:
+        lines = ["[b bright_white]Critical Path[/]", "--- "]
+        if self.summary.get("error"):
+            lines.append(f"[red]{self.summary['error']}[/]")
+            return "\n".join(lines)
+
+        path: List[int] = self.summary.get("path", [])
+        if not path:
+            lines.append("[i]No unfinished work on any dependency chain.[/i]")
+            return "\n".join(lines)
+
+        lines.append(f"• Length: [b]{len(path)}[/] task(s) in sequence")
+        if len(path) > self.MAX_LISTED_TASKS:
+            shown = path[: self.MAX_LISTED_TASKS - 1]
+            chain = " → ".join(f"#{task_id}" for task_id in shown) + f" → … → #{path[-1]}"
+        else:
+            chain = " → ".join(f"#{task_id}" for task_id in path)
+        lines.append(f"• Chain: {chain}")
+        lines.append(f"• Tasks with slack: {self.summary.get('with_slack', 0)}")
+        return "\n".join(lines)
+
+
 # --- New Custom Footer ---
 class AppFooter(Container):
     """A custom footer that displays bindings and dynamic info."""
 
     # Add state for the current plan path
     current_plan_path: var[Optional[Path]] = var(None)
+    # Seconds from launch until the plans were loaded (shown once known)
+    startup_seconds: var[Optional[float]] = var(None)
 
     DEFAULT_CSS = """
     /* Using App CSS for layout */
@@ -297,8 +335,66 @@ class AppFooter(Container):
 
         # Combine time and plan path
         info_text = f"{now_str} | {plan_str}"
+        if self.startup_seconds is not None:
+            info_text += f" | Ready in {self.startup_seconds:.2f}s"
         info_widget.update(info_text) 
 
     # Add watch method for the new reactive variable
     def watch_current_plan_path(self, new_path: Optional[Path]) -> None:
-         self.update_info() # Trigger update when path changes 
\ No newline at end of file
+         self.update_info() # Trigger update when path changes
+
+    def watch_startup_seconds(self, seconds: Optional[float]) -> None:
+        self.update_info() 
+
+def format_bytes(count: int) -> str:
+    """`count` bytes in B, KiB, MiB or GiB."""
+    value = float(count)
+    for unit in ("B", "KiB", "MiB"):
+        if abs(value) < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+class TimingsPanel(Static):
+    """Shows the hot-path timing spans (see `metsuke.timing`) and the memory
+    held by plans and UI buffers (see `metsuke.memory`); hidden by default."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._timings: Optional[Table] = None
+        self._memory: Optional[Table] = None
+
+    def update_timings(self, summaries: Dict[str, Dict[str, float]]) -> None:
+        """Renders one row per span: count, p50, p99 and max in milliseconds."""
+        table = Table(title="Timings (ms)", title_justify="left", box=None, padding=(0, 2),
+                      expand=False)
+        table.add_column("Span")
+        for column in ("Count", "p50", "p99", "Max"):
+            table.add_column(column, justify="right")
+        for name, summary in summaries.items():
+            table.add_row(
+                name, str(summary["count"]), f"{summary['p50_ms']:.2f}",
+                f"{summary['p99_ms']:.2f}", f"{summary['max_ms']:.2f}",
+            )
+        if not summaries:
+            table.add_row("[i]Nothing recorded yet[/i]", "", "", "", "")
+        self._timings = table
+        self._render_tables()
+
+    def update_memory(self, rows: List[Tuple[str, int, str]]) -> None:
+        """Renders one row per (part, bytes, note)."""
+        table = Table(title="Memory", title_justify="left", box=None, padding=(0, 2), expand=False)
+        table.add_column("Held by")
+        table.add_column("Size", justify="right")
+        table.add_column("")
+        for name, count, note in rows:
+            table.add_row(name, format_bytes(count), f"[dim]{note}[/dim]")
+        self._memory = table
+        self._render_tables()
+
+    def _render_tables(self) -> None:
+        grid = Table.grid(padding=(0, 4))
+        tables = [table for table in (self._timings, self._memory) if table is not None]
+        grid.add_row(*tables)
+        self.update(grid)
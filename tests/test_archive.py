@@ -0,0 +1,50 @@
+# tests/test_archive.py
+import pytest
+
+from src.metsuke.archive import archivable_ids, archive_done_tasks, load_archived_task
+from src.metsuke.core import load_plans, save_plan
+from src.metsuke.models import Project, ProjectMeta, Task
+from src.metsuke.table import TaskTable
+
+
+def _project():
+    return Project(
+        project=ProjectMeta(name="Demo", version="0.1.0"),
+        tasks=[
+            Task(id=1, title="Old", status="Done", priority="low"),
+            Task(id=2, title="Needed", status="Done", priority="low", dependencies=[1]),
+            Task(id=3, title="Open", status="pending", priority="high", dependencies=[2]),
+            Task(id=4, title="Loose", status="Done", priority="medium"),
+        ],
+    )
+
+
+def test_archivable_ids_skip_tasks_open_work_depends_on():
+    assert archivable_ids(_project()) == [1, 4]
+
+
+@pytest.mark.parametrize("compression", ["gzip", "lzma"])
+def test_archive_moves_tasks_to_sidecar_and_loads_them_lazily(tmp_path, compression):
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    assert save_plan(_project(), plan_path)
+    project = load_plans([plan_path])[plan_path]
+
+    archive_path, ids = archive_done_tasks(plan_path, project, compression=compression)
+
+    assert ids == [1, 4] and archive_path.parent == tmp_path
+    reloaded = load_plans([plan_path])[plan_path]
+    assert [task.id for task in reloaded.tasks] == [2, 3]
+    assert reloaded.archived == {1: archive_path.name, 4: archive_path.name}
+    assert load_archived_task(plan_path, reloaded, 4).title == "Loose"
+    assert load_archived_task(plan_path, reloaded, 3) is None
+
+    # Task 2 depends on archived task 1, which counts as Done
+    reloaded.tasks[0].status = "pending"
+    table = TaskTable.from_project(reloaded)
+    assert [table.ids[row] for row in table.ready_rows()] == [2]
+
+
+def test_empty_archive_map_is_not_written(tmp_path):
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    assert save_plan(_project(), plan_path)
+    assert "archived" not in plan_path.read_text(encoding="utf-8")
@@ -0,0 +1,51 @@
+# tests/test_benchmarks.py
+from benchmarks.generator import generate_plan, write_plans
+from benchmarks.run import compare, measure
+from src.metsuke.core import load_plans
+
+
+def test_generated_plans_are_seeded_and_acyclic():
+    plan = generate_plan(500, seed=7, dependency_density=0.5, max_dependencies=3, description_chars=120)
+    assert plan == generate_plan(500, seed=7, dependency_density=0.5, max_dependencies=3,
+                                 description_chars=120)
+    assert plan != generate_plan(500, seed=8, dependency_density=0.5, max_dependencies=3,
+                                 description_chars=120)
+    with_deps = [task for task in plan.tasks if task.dependencies]
+    assert 200 < len(with_deps) < 300
+    assert all(0 < len(task.dependencies) <= 3 and max(task.dependencies) < task.id for task in with_deps)
+    assert all(len(task.description) >= 120 for task in plan.tasks)
+
+
+def test_written_plans_load_and_results_compare(tmp_path):
+    paths = write_plans(tmp_path, plan_count=2, task_count=20, seed=1, description_chars=0)
+    loaded = load_plans(paths)
+    assert [len(loaded[path].tasks) for path in paths] == [20, 20]
+    assert [loaded[path].focus for path in paths] == [True, False]
+
+    stats = measure(lambda: None, repeat=3)
+    assert stats["repeat"] == 3 and stats["min_s"] <= stats["median_s"] <= stats["max_s"]
+    old = {"parameters": {}, "results": {"20": {"load_plans": {"median_s": 0.2}}}}
+    new = {"parameters": {}, "results": {"20": {"load_plans": {"median_s": 0.1}, "save_plan": {"median_s": 0.3}}}}
+    lines = compare(old, new)
+    assert "-50.0%" in lines[1] and lines[2].endswith("new")
+
+
+def test_reload_report_counts_superseded_lost_and_duplicate_saves():
+    from benchmarks.reload import Repaint, analyze, render_revision
+
+    assert render_revision("title: rev-000000", 42) == b"title: rev-000042"
+    writes = [(1, 0.0), (2, 1.0), (3, 1.1), (4, 2.0)]
+    repaints = [
+        Repaint(1, handled=0.1, updated=0.2, repainted=0.25),
+        Repaint(None, handled=1.2, updated=1.3, repainted=1.35),  # half-written file
+        Repaint(3, handled=1.6, updated=1.7, repainted=1.75),
+        Repaint(3, handled=1.8, updated=1.9, repainted=1.95),
+    ]
+
+    report = analyze(writes, repaints, file_changes=5)
+
+    assert (report["superseded"], report["lost"], report["duplicate"]) == (1, 1, 1)
+    assert (report["failed"], report["unchanged"]) == (1, 1)
+    assert report["latency"]["count"] == 3
+    assert report["latency"]["max_ms"] == 750.0
+    assert report["stages"]["watch"]["count"] == 2
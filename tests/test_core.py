@@ -34,4 +34,141 @@ def test_load_plans_parses_project_name():
     except Exception as e:
         pytest.fail(f"load_plans failed unexpectedly: {e}")
 
-# TODO: Add more tests for core functionality (e.g., loading non-existent file, invalid YAML, etc.) 
\ No newline at end of file
+# TODO: Add more tests for core functionality (e.g., loading non-existent file, invalid YAML, etc.) 
+
+
+def test_save_plan_omits_unset_estimates(tmp_path):
+    from src.metsuke.core import save_plan
+    from src.metsuke.models import Estimate, Project, ProjectMeta, Task
+
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    project = Project(
+        project=ProjectMeta(name="Demo", version="0.1.0"),
+        tasks=[
+            Task(id=1, title="Estimated", status="pending", priority="high",
+                 estimate=Estimate(min=1, likely=2, max=4)),
+            Task(id=2, title="Unestimated", status="pending", priority="low"),
+        ],
+    )
+
+    assert save_plan(project, plan_path)
+    assert plan_path.read_text(encoding="utf-8").count("estimate:") == 1
+    reloaded = load_plans([plan_path])[plan_path]
+    assert reloaded.tasks[0].estimate == Estimate(min=1, likely=2, max=4)
+    assert reloaded.tasks[1].estimate is None
+
+
+def _write_demo_plan(plan_path):
+    from src.metsuke.core import save_plan
+    from src.metsuke.models import Project, ProjectMeta, Task
+
+    project = Project(
+        project=ProjectMeta(name="Demo", version="0.1.0"),
+        tasks=[Task(id=i, title=f"Task {i}", status="pending", priority="medium") for i in (1, 2, 3)],
+    )
+    assert save_plan(project, plan_path)
+
+
+def test_save_plan_merges_concurrent_edits_to_different_tasks(tmp_path):
+    from src.metsuke.core import save_plan
+    from src.metsuke.models import Task
+
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    _write_demo_plan(plan_path)
+    first = load_plans([plan_path])[plan_path]
+    second = load_plans([plan_path])[plan_path]
+
+    first.tasks[0].status = "Done"
+    assert save_plan(first, plan_path)
+    second.tasks[1].status = "in_progress"
+    second.tasks.append(Task(id=4, title="Added", status="pending", priority="low"))
+    assert save_plan(second, plan_path)
+
+    merged = load_plans([plan_path])[plan_path]
+    assert [t.status for t in merged.tasks] == ["Done", "in_progress", "pending", "pending"]
+    assert merged == second
+
+
+def test_save_plan_refuses_conflicting_edits(tmp_path):
+    from src.metsuke.core import save_plan
+
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    _write_demo_plan(plan_path)
+    first = load_plans([plan_path])[plan_path]
+    second = load_plans([plan_path])[plan_path]
+
+    first.tasks[0].status = "Done"
+    assert save_plan(first, plan_path)
+    second.tasks[0].status = "blocked"
+    assert not save_plan(second, plan_path)
+
+    assert load_plans([plan_path])[plan_path].tasks[0].status == "Done"
+
+
+def test_apply_focus_changes_flags_without_saving(tmp_path):
+    from src.metsuke.core import apply_focus, save_focus_changes, save_plan
+    from src.metsuke.models import Project, ProjectMeta
+
+    paths = [tmp_path / f"PROJECT_PLAN_{name}.yaml" for name in ("a", "b")]
+    plans = {}
+    for index, path in enumerate(paths):
+        plans[path] = Project(project=ProjectMeta(name=path.stem, version="1"), focus=index == 0)
+        assert save_plan(plans[path], path)
+    before = [path.read_bytes() for path in paths]
+
+    focus_path, changed = apply_focus(plans, new_focus_target=paths[1])
+
+    assert focus_path == paths[1] and not plans[paths[0]].focus and plans[paths[1]].focus
+    assert [path for _, path in changed] == paths
+    assert [path.read_bytes() for path in paths] == before
+    assert save_focus_changes(changed)
+    assert load_plans([paths[1]])[paths[1]].focus
+
+
+def test_loading_takes_no_lock_and_locks_are_released(tmp_path):
+    from src.metsuke import core
+
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    _write_demo_plan(plan_path)
+    core.plan_lock_path(plan_path).unlink()
+
+    assert load_plans([plan_path])[plan_path] is not None
+    assert not core.plan_lock_path(plan_path).exists()
+    with core.plan_lock(plan_path), core.plan_lock(plan_path):
+        assert plan_path.resolve() in core._held_locks
+    assert plan_path.resolve() not in core._held_locks
+
+
+def test_plan_keeps_the_loaded_bytes_instead_of_a_parsed_copy(tmp_path):
+    from src.metsuke.core import save_plan
+
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    _write_demo_plan(plan_path)
+    plan = load_plans([plan_path])[plan_path]
+
+    assert plan.source.content == plan_path.read_bytes()
+    plan.tasks[2].status = "Done"
+    plan_path.write_bytes(plan_path.read_bytes().replace(b"title: Task 1", b"title: Renamed"))
+    assert save_plan(plan, plan_path)
+    assert [(t.title, t.status) for t in load_plans([plan_path])[plan_path].tasks] == [
+        ("Renamed", "pending"), ("Task 2", "pending"), ("Task 3", "Done"),
+    ]
+
+
+def test_repair_drops_invalid_estimates(tmp_path):
+    from src.metsuke.core import repair_yaml_file
+
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    _write_demo_plan(plan_path)
+    text = plan_path.read_text(encoding="utf-8")
+    plan_path.write_text(text.replace("title: Task 2\n", "title: Task 2\n    estimate: {min: 5, likely: 1, max: 2}\n")
+                         .replace("title: Task 3\n", "title: Task 3\n    estimate: {min: 1, likely: 2, max: 3}\n"),
+                         encoding="utf-8")
+
+    plan = load_plans([plan_path])[plan_path]
+
+    assert plan is not None
+    assert plan.tasks[1].estimate is None
+    assert plan.tasks[2].estimate.max == 3
+    assert "min: 5" not in plan_path.read_text(encoding="utf-8")
+    assert not repair_yaml_file(plan_path)
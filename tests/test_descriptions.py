@@ -0,0 +1,122 @@
+# tests/test_descriptions.py
+import pytest
+
+from src.metsuke.core import load_plans, save_plan
+from src.metsuke.descriptions import LazyDescription
+from src.metsuke.exceptions import PlanLoadingError
+
+PLAN = """\
+project:
+  name: Demo
+  version: 0.1.0
+context: |
+  Notes that look like a task:
+    description: >
+      not a description
+tasks:
+  - id: 1
+    title: Folded
+    description: >-
+      First line
+      continues here.
+
+      Second paragraph.
+    status: pending
+    priority: high
+    dependencies: []
+  - description: |2
+        indented code
+      plain
+    id: 2
+    title: Literal first key
+    status: Done
+    priority: low
+  - id: 3
+    title: Plain
+    description: short one
+    status: pending
+    priority: low
+"""
+
+
+def test_lazy_load_matches_full_load(tmp_path):
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    plan_path.write_text(PLAN, encoding="utf-8")
+
+    full = load_plans([plan_path])[plan_path]
+    lazy = load_plans([plan_path], lazy_descriptions=True)[plan_path]
+
+    assert isinstance(lazy.tasks[0]._lazy_description, LazyDescription)
+    assert lazy.context == full.context
+    assert [task.description for task in lazy.tasks] == [task.description for task in full.tasks]
+    assert lazy.model_dump() == full.model_dump()
+    # Reading does not keep the text
+    assert lazy.tasks[0].__dict__["description"] is None
+
+
+def test_lazy_plan_saves_and_merges_descriptions(tmp_path):
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    plan_path.write_text(PLAN, encoding="utf-8")
+    original = load_plans([plan_path])[plan_path]
+    lazy = load_plans([plan_path], lazy_descriptions=True)[plan_path]
+
+    other = load_plans([plan_path])[plan_path]
+    other.tasks[0].status = "Done"
+    assert save_plan(other, plan_path)
+
+    lazy.tasks[1].description = "Rewritten"
+    lazy.tasks[2].status = "in_progress"
+    assert save_plan(lazy, plan_path)
+
+    saved = load_plans([plan_path])[plan_path]
+    assert saved.tasks[0].status == "Done"
+    assert saved.tasks[0].description == original.tasks[0].description
+    assert saved.tasks[1].description == "Rewritten"
+    assert saved.tasks[2].status == "in_progress"
+
+
+def test_lazy_load_falls_back_when_fast_parse_disagrees(tmp_path):
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    plan_path.write_text(PLAN.replace("title: Plain", "title: yes"), encoding="utf-8")
+
+    lazy = load_plans([plan_path], lazy_descriptions=True)[plan_path]
+
+    assert lazy.tasks[2].title == "yes"
+    assert lazy.tasks[0].description.startswith("First line")
+
+
+def test_unmapped_lazy_load_survives_in_place_rewrite(tmp_path):
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    plan_path.write_text(PLAN, encoding="utf-8")
+    full = load_plans([plan_path])[plan_path]
+
+    lazy = load_plans([plan_path], lazy_descriptions=True, map_descriptions=False)[plan_path]
+    # Truncate and rewrite in place, as some editors save
+    with open(plan_path, "w", encoding="utf-8") as f:
+        f.write("project:\n")
+
+    assert [task.description for task in lazy.tasks] == [task.description for task in full.tasks]
+
+
+def test_mapped_lazy_load_reports_in_place_truncation(tmp_path):
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    plan_path.write_text(PLAN, encoding="utf-8")
+
+    mapped = load_plans([plan_path], lazy_descriptions=True)[plan_path]
+    with open(plan_path, "w", encoding="utf-8") as f:
+        f.write("project:\n")
+
+    with pytest.raises(PlanLoadingError, match="truncated"):
+        mapped.tasks[0].description
+
+
+def test_lazy_loads_of_the_same_contents_compare_equal(tmp_path):
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    plan_path.write_text(PLAN, encoding="utf-8")
+
+    first = load_plans([plan_path], lazy_descriptions=True)[plan_path]
+    second = load_plans([plan_path], lazy_descriptions=True, map_descriptions=False)[plan_path]
+    assert first == second
+
+    plan_path.write_text(PLAN.replace("continues here", "goes on"), encoding="utf-8")
+    assert load_plans([plan_path], lazy_descriptions=True)[plan_path] != first
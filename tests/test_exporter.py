@@ -0,0 +1,79 @@
+# tests/test_exporter.py
+import math
+
+import pytest
+
+from src.metsuke.exporter import ColumnarPlan, write_columnar, write_csv, write_jsonl
+from src.metsuke.importer import import_tasks
+from src.metsuke.core import load_plans
+from src.metsuke.exceptions import PlanValidationError
+from src.metsuke.models import Estimate, Project, ProjectMeta, Task
+
+
+def _project():
+    return Project(
+        project=ProjectMeta(name="Demo", version="0.1.0"),
+        tasks=[
+            Task(id=3, title="Design", description="Multi\nline", status="Done", priority="high"),
+            Task(id=5, title="Build ✓", status="pending", priority="low", dependencies=[3],
+                 estimate=Estimate(min=1, likely=2, max=4)),
+            Task(id=8, title="Ship", status="blocked", priority="medium", dependencies=[3, 5]),
+        ],
+    )
+
+
+def test_columnar_export_round_trips_through_mmap_reader(tmp_path):
+    target = tmp_path / "plan.mtc"
+    assert write_columnar(_project(), target) == 3
+
+    with ColumnarPlan(target) as plan:
+        assert len(plan) == 3
+        assert list(plan.column("ids")) == [3, 5, 8]
+        assert [plan.status(row) for row in range(3)] == ["Done", "pending", "blocked"]
+        assert [plan.priority(row) for row in range(3)] == ["high", "low", "medium"]
+        assert plan.title(1) == "Build ✓"
+        assert plan.description(0) == "Multi\nline"
+        assert plan.dependencies(2) == [3, 5]
+        assert plan.column("est_likely")[1] == 2.0 and math.isnan(plan.column("est_likely")[0])
+        assert plan.meta["project"]["name"] == "Demo"
+
+
+def test_row_exports_can_be_imported_again(tmp_path):
+    for writer, suffix in ((write_csv, ".csv"), (write_jsonl, ".jsonl")):
+        exported = tmp_path / f"plan{suffix}"
+        writer(_project(), exported, chunk_size=2)
+        target = tmp_path / f"PROJECT_PLAN{suffix}.yaml"
+
+        import_tasks(exported, target, "Demo")
+
+        tasks = load_plans([target])[target].tasks
+        assert [(t.title, t.status, t.dependencies) for t in tasks] == [
+            ("Design", "Done", []), ("Build ✓", "pending", [1]), ("Ship", "blocked", [1, 2]),
+        ]
+        assert tasks[1].estimate == Estimate(min=1, likely=2, max=4)
+        assert tasks[0].description == "Multi\nline"
+
+
+def test_export_streams_rows_from_the_plan_file(tmp_path):
+    from src.metsuke.core import save_plan
+    from src.metsuke.exporter import export_plan
+
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    assert save_plan(_project(), plan_path)
+
+    for fmt in ("csv", "jsonl"):
+        streamed, count = export_plan(plan_path, fmt, tmp_path / "streamed", chunk_size=2)
+        loaded, _ = export_plan(plan_path, fmt, tmp_path / "loaded", chunk_size=2, project=_project())
+        assert count == 3
+        assert streamed.read_bytes() == loaded.read_bytes()
+
+    plan_path.write_text(plan_path.read_text(encoding="utf-8").replace("status: blocked", "status: later"),
+                         encoding="utf-8")
+    invalid = plan_path.read_bytes()
+    for fmt in ("csv", "columnar"):
+        with pytest.raises(PlanValidationError, match="status"):
+            export_plan(plan_path, fmt, tmp_path / "invalid")
+    assert not list((tmp_path / "invalid").glob("PROJECT_PLAN.*"))
+    # Exporting never repairs (or backs up) the plan
+    assert plan_path.read_bytes() == invalid
+    assert not list(tmp_path.glob("PROJECT_PLAN.yaml.backup.*"))
@@ -0,0 +1,76 @@
+# tests/test_importer.py
+import json
+
+import pytest
+
+from src.metsuke.core import load_plans
+from src.metsuke.exceptions import PlanValidationError
+from src.metsuke.importer import existing_outputs, import_tasks
+
+
+def test_import_csv_resolves_external_ids(tmp_path):
+    source = tmp_path / "tickets.csv"
+    source.write_text(
+        "key,Summary,status,priority,dependencies\n"
+        "ABC-7,Design,Done,high,\n"
+        "ABC-3,Build,,,ABC-7\n"
+        "ABC-9,Ship,pending,low,ABC-3; ABC-7\n",
+        encoding="utf-8",
+    )
+    target = tmp_path / "plans" / "PROJECT_PLAN_tickets.yaml"
+
+    written = import_tasks(source, target, "Tickets", columns={"id": "key", "title": "Summary"})
+
+    assert written == [(target, 3)]
+    project = load_plans([target])[target]
+    assert project.project.name == "Tickets"
+    assert [(t.id, t.title, t.status, t.priority, t.dependencies) for t in project.tasks] == [
+        (1, "Design", "Done", "high", []),
+        (2, "Build", "pending", "medium", [1]),
+        (3, "Ship", "pending", "low", [2, 1]),
+    ]
+
+
+def test_import_jsonl_shards_keep_dependencies_together(tmp_path):
+    source = tmp_path / "tickets.jsonl"
+    # Two chains, interleaved: T0 <- T2 <- T4 and T1 <- T3, plus a loose T5
+    deps = {2: ["T0"], 4: ["T2"], 3: ["T1"]}
+    rows = [{"id": f"T{i}", "title": f"Ticket {i}", "dependencies": deps.get(i, [])} for i in range(6)]
+    source.write_text("\n".join(json.dumps(row) for row in rows), encoding="utf-8")
+    target = tmp_path / "PROJECT_PLAN_tickets.yaml"
+
+    written = import_tasks(source, target, "Tickets", shard_size=3)
+
+    assert [(path.name, count) for path, count in written] == [
+        ("PROJECT_PLAN_tickets_001.yaml", 3),
+        ("PROJECT_PLAN_tickets_002.yaml", 3),
+    ]
+    plans = load_plans([path for path, _ in written])
+    assert [[(t.id, t.dependencies) for t in plans[path].tasks] for path, _ in written] == [
+        [(1, []), (3, [1]), (5, [3])],
+        [(2, []), (4, [2]), (6, [])],
+    ]
+    assert existing_outputs(target, sharded=True) == [path for path, _ in written]
+    assert existing_outputs(target, sharded=False) == []
+
+
+def test_import_shard_grows_for_a_chain_longer_than_the_shard_size(tmp_path):
+    source = tmp_path / "tickets.jsonl"
+    rows = [{"id": f"T{i}", "title": f"Ticket {i}", "dependencies": [f"T{i + 1}"] if i < 3 else []}
+            for i in range(5)]
+    source.write_text("\n".join(json.dumps(row) for row in rows), encoding="utf-8")
+
+    written = import_tasks(source, tmp_path / "PROJECT_PLAN_tickets.yaml", "Tickets", shard_size=2)
+
+    assert [count for _, count in written] == [4, 1]
+
+
+def test_import_writes_nothing_on_bad_rows(tmp_path):
+    source = tmp_path / "tickets.jsonl"
+    source.write_text('{"id": 1, "title": "A"}\n{"id": 2, "title": "B", "dependencies": [7]}\n', encoding="utf-8")
+    target = tmp_path / "PROJECT_PLAN_tickets.yaml"
+
+    with pytest.raises(PlanValidationError, match="tickets.jsonl:2: unknown dependency '7'"):
+        import_tasks(source, target, "Tickets")
+
+    assert list(tmp_path.iterdir()) == [source]
@@ -0,0 +1,63 @@
+# tests/test_leases.py
+import time
+from pathlib import Path
+
+from src.metsuke.leases import LeaseStore
+from src.metsuke.models import Project, ProjectMeta, Task
+
+
+def _project():
+    return Project(
+        project=ProjectMeta(name="Demo", version="0.1.0"),
+        tasks=[
+            Task(id=1, title="Done", status="Done", priority="low"),
+            Task(id=2, title="Low", status="pending", priority="low", dependencies=[1]),
+            Task(id=3, title="High", status="pending", priority="high"),
+            Task(id=4, title="Blocked", status="pending", priority="high", dependencies=[2]),
+        ],
+    )
+
+
+def test_claims_follow_next_task_order_and_skip_held_tasks(tmp_path):
+    store = LeaseStore.for_directory(tmp_path)
+    plan = tmp_path / "PROJECT_PLAN.yaml"
+    project = _project()
+
+    assert store.claim(plan, project, "a").task_id == 3
+    assert store.claim(plan, project, "b").task_id == 2
+    assert store.claim(plan, project, "c") is None
+    assert [(lease.task_id, lease.agent) for lease in store.active(plan)] == [(2, "b"), (3, "a")]
+
+
+def test_heartbeat_and_release_require_the_holder(tmp_path):
+    store = LeaseStore.for_directory(tmp_path)
+    plan = tmp_path / "PROJECT_PLAN.yaml"
+    lease = store.claim(plan, _project(), "a")
+
+    assert store.heartbeat(plan, lease.task_id, "b") is None
+    assert store.heartbeat(plan, lease.task_id, "a").expires_at >= lease.expires_at
+    assert not store.release(plan, lease.task_id, "b")
+    assert store.release(plan, lease.task_id, "a")
+    assert store.active(plan) == []
+
+
+def test_expired_leases_are_reclaimable(tmp_path):
+    store = LeaseStore.for_directory(tmp_path, ttl=0.01)
+    plan = tmp_path / "PROJECT_PLAN.yaml"
+    project = _project()
+
+    assert store.claim(plan, project, "a").task_id == 3
+    time.sleep(0.02)
+    assert store.claim(plan, project, "b").task_id == 3
+
+
+def test_store_is_found_from_the_plan_path(tmp_path, monkeypatch):
+    plan = tmp_path / "plans" / "PROJECT_PLAN_api.yaml"
+    plan.parent.mkdir()
+    monkeypatch.chdir(tmp_path)
+    assert LeaseStore.for_plan(Path("plans") / plan.name).claim(plan, _project(), "a").task_id == 3
+    monkeypatch.chdir(tmp_path / "plans")
+    assert LeaseStore.for_plan(Path(plan.name)).claim(plan, _project(), "b").task_id == 2
+
+    assert LeaseStore.for_plan(plan).db_path == tmp_path / ".metsuke" / "leases.db"
+    assert LeaseStore.for_plan(tmp_path / "PROJECT_PLAN.yaml").db_path == tmp_path / ".metsuke" / "leases.db"
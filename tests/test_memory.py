@@ -0,0 +1,36 @@
+# tests/test_memory.py
+import pytest
+
+from benchmarks.generator import write_plans
+from src.metsuke.core import load_plans
+from src.metsuke.memory import deep_sizeof, plan_footprint, traced
+
+# Bytes held per loaded task (200-character descriptions); about 2.1 KB
+# when this was set. Raise it only for a deliberate trade of memory.
+BYTES_PER_TASK_BUDGET = 3000
+BUDGET_TASKS = 400
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    shared = "x" * 1000
+    alone = deep_sizeof([shared])
+    assert deep_sizeof([shared, shared]) < alone + 100
+
+    seen: set = set()
+    deep_sizeof(shared, seen=seen)
+    assert deep_sizeof([shared], seen=seen) < 100
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_memory_per_task_stays_within_budget(tmp_path, lazy):
+    paths = write_plans(tmp_path, 1, BUDGET_TASKS, seed=0, description_chars=200)
+    load_plans(paths, lazy_descriptions=lazy)  # one-time module caches
+
+    loaded, kept, _ = traced(lambda: load_plans(paths, lazy_descriptions=lazy))
+    footprint = plan_footprint(loaded.values())
+
+    assert footprint["tasks"] == BUDGET_TASKS
+    assert footprint["descriptions_bytes"] > 0 and footprint["source_snapshot_bytes"] > 0
+    assert (footprint["mapped_bytes"] > 0) == lazy
+    assert footprint["bytes_per_task"] <= BYTES_PER_TASK_BUDGET
+    assert kept / BUDGET_TASKS <= BYTES_PER_TASK_BUDGET
@@ -0,0 +1,71 @@
+# tests/test_operations.py
+import json
+
+import pytest
+
+from src.metsuke.core import load_plans, save_plan
+from src.metsuke.exceptions import PlanValidationError
+from src.metsuke.models import Project, ProjectMeta, Task
+from src.metsuke.operations import apply_operations
+from src.metsuke.session import PlanSession
+
+
+@pytest.fixture
+def plan_path(tmp_path):
+    path = tmp_path / "PROJECT_PLAN.yaml"
+    project = Project(
+        project=ProjectMeta(name="Demo", version="0.1.0"),
+        tasks=[Task(id=i, title=f"Task {i}", status="pending", priority="medium") for i in range(1, 21)],
+    )
+    assert save_plan(project, path)
+    return path
+
+
+def _ops(*ops):
+    return [json.dumps(op) for op in ops]
+
+
+def test_apply_operations_with_ranges_and_references(plan_path):
+    with PlanSession(plan_path) as session:
+        counts = apply_operations(session, _ops(
+            {"op": "set_status", "id": "5..8", "status": "Done"},
+            {"op": "add", "title": "Docs", "priority": "high", "ref": "docs"},
+            {"op": "add", "title": "Publish", "dependencies": ["@docs", 1]},
+            {"op": "update", "id": [2, "@docs"], "set": {"priority": "low"}},
+            {"op": "delete", "id": "18..20"},
+        ))
+
+    project = load_plans([plan_path])[plan_path]
+    tasks = {task.id: task for task in project.tasks}
+    assert counts == {"updated": 2, "added": 2, "deleted": 1}
+    assert [task_id for task_id, task in tasks.items() if task.status == "Done"] == [5, 6, 7, 8]
+    assert tasks[21].title == "Docs" and tasks[21].priority == "low"
+    assert tasks[22].dependencies == [21, 1]
+    assert max(tasks) == 22 and 18 not in tasks
+
+
+def test_apply_operations_reports_line_and_saves_nothing(plan_path):
+    before = plan_path.read_bytes()
+
+    with pytest.raises(PlanValidationError, match="Line 3"):
+        with PlanSession(plan_path) as session:
+            apply_operations(session, _ops(
+                {"op": "set_status", "id": 1, "status": "Done"},
+                {"op": "add_dependency", "id": 2, "dependency": 1},
+                {"op": "add_dependency", "id": 1, "dependency": 2},
+            ))
+
+    assert plan_path.read_bytes() == before
+
+
+def test_delete_selection_ignores_dependencies_inside_it(plan_path):
+    with PlanSession(plan_path) as session:
+        session.add_dependency(5, 6)
+        session.add_dependency(6, 7)
+        session.add_dependency(8, 7)
+        with pytest.raises(PlanValidationError, match="Cannot delete task 7: task\\(s\\) 8 depend on it"):
+            apply_operations(session, _ops({"op": "delete", "id": [5, 6, 7]}))
+        counts = apply_operations(session, _ops({"op": "delete", "id": [5, 6]}))
+
+    assert counts == {"deleted": 1}
+    assert [task.id for task in load_plans([plan_path])[plan_path].tasks] == [1, 2, 3, 4] + list(range(7, 21))
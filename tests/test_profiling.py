@@ -0,0 +1,31 @@
+# tests/test_profiling.py
+import time
+
+from src.metsuke.profiling import SamplingProfiler
+
+
+def _busy(seconds):
+    end = time.process_time() + seconds
+    total = 0
+    while time.process_time() < end:
+        total += sum(range(100))
+    return total
+
+
+def _idle_caller():
+    return _busy(0.1)
+
+
+def test_sampling_profiler_keeps_stacks_from_focus_frame(tmp_path):
+    profiler = SamplingProfiler(interval=0.001, focus=[_busy])
+    profiler.start()
+    try:
+        _idle_caller()
+    finally:
+        profiler.stop()
+
+    assert profiler.samples > 0
+    lines = (profiler.dump(tmp_path / "profiles" / "test.collapsed")
+             .read_text(encoding="utf-8").splitlines())
+    assert lines and all(line.startswith("_busy (") for line in lines)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == profiler.samples
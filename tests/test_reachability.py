@@ -0,0 +1,50 @@
+# tests/test_reachability.py
+from src.metsuke.models import Project, ProjectMeta, Task
+from src.metsuke.reachability import ReachabilityIndex
+
+
+def _project(edges):
+    tasks = [Task(id=task_id, title=f"Task {task_id}", status="pending", priority="low", dependencies=deps)
+             for task_id, deps in edges.items()]
+    return Project(project=ProjectMeta(name="Graph", version="0.1.0"), tasks=tasks)
+
+
+def test_transitive_queries_in_both_directions():
+    project = _project({1: [], 2: [1], 3: [1], 4: [2, 3], 5: [], 6: [4, 99]})
+    index = ReachabilityIndex.for_project(project)
+
+    assert index.transitive_dependencies(6) == [1, 2, 3, 4]
+    assert index.transitive_dependents(1) == [2, 3, 4, 6]
+    assert index.depends_on(6, 1)
+    assert not index.depends_on(1, 6)
+    assert not index.depends_on(5, 1)
+    assert index.count_dependents(5) == 0
+
+
+def test_cycles_reach_every_member():
+    index = ReachabilityIndex.for_project(_project({1: [3], 2: [1], 3: [2], 4: [3]}))
+
+    assert index.transitive_dependencies(4) == [1, 2, 3]
+    assert index.depends_on(1, 1)
+
+
+def test_index_is_cached_with_the_plan_without_affecting_equality():
+    project = _project({1: [], 2: [1]})
+    twin = _project({1: [], 2: [1]})
+
+    index = ReachabilityIndex.for_project(project)
+
+    assert ReachabilityIndex.for_project(project) is index
+    assert project == twin
+    project.tasks[0].dependencies.append(2)
+    project.invalidate_cache()
+    assert ReachabilityIndex.for_project(project) is not index
+
+
+def test_cycle_below_an_acyclic_prefix_reaches_both_ways():
+    index = ReachabilityIndex.for_project(_project({1: [], 2: [1], 3: [2, 4], 4: [3]}))
+
+    assert index.transitive_dependents(1) == [2, 3, 4]
+    assert index.depends_on(4, 1)
+    assert index.transitive_dependencies(4) == [1, 2, 3, 4]
+    assert index.count_dependents(2) == 2
@@ -0,0 +1,73 @@
+# tests/test_salvage.py
+from src.metsuke.core import load_plans, repair_yaml_file
+from src.metsuke.salvage import salvage_plan
+
+BROKEN = """\
+# Header comment
+project:
+  name: Demo
+  version: 0.1.0
+context: Salvage test
+tasks:
+  - id: 1
+    title: Good
+    status: pending
+    priority: high
+    dependencies: []
+  - id: 2
+    title: "Broken quote
+    status: pending
+    priority: low
+  - id: 3
+    title: Bad indent
+      status: pending
+     priority: low
+  - id: 4
+    title: Also good
+    status: Done
+    priority: medium
+    dependencies: [1]
+title: stray unindented field
+focus: true
+"""
+
+
+def test_salvage_keeps_parseable_tasks_and_reports_the_rest():
+    salvage = salvage_plan(BROKEN)
+
+    assert [task["id"] for task in salvage.data["tasks"]] == [1, 4]
+    assert salvage.tasks_kept == 2
+    assert salvage.data["project"] == {"name": "Demo", "version": "0.1.0"}
+    assert salvage.data["context"] == "Salvage test"
+    assert salvage.data["focus"] is True
+    assert [(chunk.task_id, chunk.start_line, chunk.end_line) for chunk in salvage.lost] == [
+        (2, 12, 15), (3, 16, 19), (None, 25, 25),
+    ]
+    assert salvage.lost[0].describe().startswith("task 2 (Broken quote) at lines 12-15: ")
+
+
+def test_salvage_of_unrecognisable_text_keeps_nothing():
+    assert salvage_plan("just some prose, no plan here\n").data is None
+
+
+def test_repair_salvages_plan_that_does_not_parse(tmp_path):
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    plan_path.write_text(BROKEN, encoding="utf-8")
+
+    assert repair_yaml_file(plan_path, salvage=True)
+
+    plan = load_plans([plan_path])[plan_path]
+    assert [task.id for task in plan.tasks] == [1, 4]
+    assert plan.context == "Salvage test"
+    backups = list(tmp_path.glob("PROJECT_PLAN.yaml.backup.*"))
+    assert len(backups) == 1 and backups[0].read_text(encoding="utf-8") == BROKEN
+
+
+def test_load_leaves_unparseable_plan_untouched(tmp_path):
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    plan_path.write_bytes(BROKEN.encode("utf-8"))
+
+    assert load_plans([plan_path])[plan_path] is None
+    assert plan_path.read_bytes() == BROKEN.encode("utf-8")
+    assert not repair_yaml_file(plan_path)
+    assert plan_path.read_bytes() == BROKEN.encode("utf-8")
@@ -0,0 +1,101 @@
+# tests/test_schedule.py
+import pytest
+
+from src.metsuke.exceptions import PlanValidationError
+from src.metsuke.models import Task
+from src.metsuke.schedule import critical_path, WEIGHT_TIME
+from src.metsuke.table import TaskTable
+
+
+def _task(task_id, deps=(), status="pending", spent=0.0):
+    return Task(id=task_id, title=f"Task {task_id}", status=status, priority="medium",
+                dependencies=list(deps), time_spent_seconds=spent)
+
+
+def test_critical_path_follows_longest_unfinished_chain():
+    # 1 -> 2 -> 4 and 1 -> 3 -> 4, with 3 taking longer
+    table = TaskTable.from_tasks([
+        _task(1, spent=2.0),
+        _task(2, [1], spent=1.0),
+        _task(3, [1], spent=5.0),
+        _task(4, [2, 3], spent=1.0),
+    ])
+
+    schedule = critical_path(table, weight=WEIGHT_TIME)
+
+    assert schedule.critical_path == [1, 3, 4]
+    assert schedule.length == 8.0
+    assert schedule.slack[table.row_of(2)] == 4.0
+    assert schedule.slack[table.row_of(3)] == 0.0
+    assert schedule.earliest_start[table.row_of(4)] == 7.0
+
+
+def test_critical_path_ignores_done_tasks_and_unknown_dependencies():
+    table = TaskTable.from_tasks([
+        _task(1, status="Done"),
+        _task(2, [1, 99]),
+        _task(3, [2]),
+    ])
+
+    schedule = critical_path(table)
+
+    assert schedule.critical_path == [2, 3]
+    assert schedule.length == 2.0
+
+
+def test_critical_path_levels_match_row_loop(monkeypatch):
+    pytest.importorskip("numpy")
+    from src.metsuke import schedule
+
+    tasks = [
+        _task(i, [dep for dep in (i // 2, i - 3, 999) if dep >= 1 and dep != i], spent=float(i % 7))
+        for i in range(1, 201)
+    ]
+    table = TaskTable.from_tasks(tasks)
+
+    monkeypatch.setattr(schedule, "MIN_LEVEL_WIDTH", 0)
+    by_level = critical_path(table, weight=WEIGHT_TIME)
+    monkeypatch.setattr(schedule, "MIN_LEVEL_WIDTH", len(table) + 1)
+    by_row = critical_path(table, weight=WEIGHT_TIME)
+
+    assert by_level._replace(table=None) == by_row._replace(table=None)
+    assert by_level.length > 0 and by_level.critical_path
+
+
+def test_critical_path_reports_cycles():
+    table = TaskTable.from_tasks([_task(1, [2]), _task(2, [1]), _task(3)])
+
+    with pytest.raises(PlanValidationError, match="1, 2"):
+        critical_path(table)
+
+
+def test_forecast_with_fixed_estimates_matches_critical_path():
+    pytest.importorskip("numpy")
+    from src.metsuke.models import Estimate
+    from src.metsuke.schedule import forecast, WEIGHT_ESTIMATE
+
+    tasks = [_task(1), _task(2, [1]), _task(3, [1]), _task(4, [2, 3]), _task(5, status="Done")]
+    for task, hours in zip(tasks, [2.0, 1.0, 5.0, 1.0, 3.0]):
+        task.estimate = Estimate(min=hours, likely=hours, max=hours)
+    table = TaskTable.from_tasks(tasks)
+
+    result = forecast(table, simulations=20, seed=0, batch_size=7)
+
+    assert result.percentiles == {50: 8.0, 90: 8.0}
+    assert result.open_tasks == 4
+    assert critical_path(table, weight=WEIGHT_ESTIMATE).length == 8.0
+
+
+def test_forecast_batches_account_for_the_dependency_gather():
+    pytest.importorskip("numpy")
+    from src.metsuke.schedule import _batch_size, _level_groups, _sorted_levels
+
+    # Every task of the second half depends on every task of the first
+    tasks = [_task(i) for i in range(1, 51)] + [_task(i, range(1, 51)) for i in range(51, 101)]
+    table = TaskTable.from_tasks(tasks)
+    groups = _level_groups(table, _sorted_levels(table)[1])
+
+    budget = 8 * 1024 * 1024
+    # 2,500 gathered parent columns per simulation on top of the 100-task rows
+    assert _batch_size(len(table), groups, budget) == budget // (8 * (2 * 100 + 2500 + 50))
+    assert _batch_size(len(table), [], budget) == budget // (8 * 200)
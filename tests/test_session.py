@@ -0,0 +1,78 @@
+# tests/test_session.py
+import pytest
+
+from src.metsuke.core import load_plans, save_plan
+from src.metsuke.exceptions import PlanValidationError
+from src.metsuke.models import Project, ProjectMeta, Task
+from src.metsuke.session import PlanSession
+
+
+@pytest.fixture
+def plan_path(tmp_path):
+    path = tmp_path / "PROJECT_PLAN.yaml"
+    project = Project(
+        project=ProjectMeta(name="Demo", version="0.1.0"),
+        tasks=[
+            Task(id=1, title="First", status="pending", priority="high"),
+            Task(id=2, title="Second", status="pending", priority="low", dependencies=[1]),
+        ],
+    )
+    assert save_plan(project, path)
+    return path
+
+
+def test_session_commits_all_edits_in_one_write(plan_path):
+    with PlanSession(plan_path) as session:
+        session.set_status(1, "Done")
+        new_id = session.add("Third", priority="medium", dependencies=[2])
+        session.update(2, title="Second (renamed)")
+
+    project = load_plans([plan_path])[plan_path]
+    assert new_id == 3
+    assert [(t.id, t.status, t.title) for t in project.tasks] == [
+        (1, "Done", "First"), (2, "pending", "Second (renamed)"), (3, "pending", "Third"),
+    ]
+    assert project.tasks[2].dependencies == [2]
+    assert not list(plan_path.parent.glob("*.tmp"))
+
+
+def test_session_rolls_back_on_error(plan_path):
+    before = plan_path.read_bytes()
+
+    with pytest.raises(PlanValidationError, match="cycle"):
+        with PlanSession(plan_path) as session:
+            session.set_status(2, "Done")
+            session.add_dependency(1, 2)
+
+    assert plan_path.read_bytes() == before
+
+
+def test_session_validates_touched_tasks(plan_path):
+    with PlanSession(plan_path) as session:
+        with pytest.raises(PlanValidationError):
+            session.set_status(1, "finished")
+        with pytest.raises(PlanValidationError, match="unknown task 99"):
+            session.add("Orphan", dependencies=[99])
+        with pytest.raises(PlanValidationError, match="Unknown task field\\(s\\): prority"):
+            session.add("Typo", prority="high")
+        with pytest.raises(PlanValidationError, match="Unknown task field\\(s\\): prority"):
+            session.update(1, prority="high")
+        with pytest.raises(PlanValidationError, match="depend on it"):
+            session.delete(1)
+        session.delete(2)
+
+    assert [t.id for t in load_plans([plan_path])[plan_path].tasks] == [1]
+
+
+def test_session_deletes_in_bulk_and_reuses_freed_ids(plan_path):
+    with PlanSession(plan_path) as session:
+        first = session.add("Bulk 0")
+        for index in range(1, 2000):
+            session.add(f"Bulk {index}", dependencies=[first + index - 1])
+        session.delete_many(range(first + 1000, first + 2000))
+        session.delete(2)
+        session.add("Second again", task_id=2)
+
+    project = load_plans([plan_path])[plan_path]
+    assert [task.id for task in project.tasks] == [1] + list(range(first, first + 1000)) + [2]
+    assert project.tasks[-1].title == "Second again"
@@ -0,0 +1,91 @@
+# tests/test_streaming.py
+from pathlib import Path
+
+from benchmarks.generator import write_plans
+from src.metsuke import core
+from src.metsuke.core import load_plans
+from src.metsuke.memory import traced
+from src.metsuke.streaming import load_plan_streaming, validate_plan_stream
+
+PLAN = """\
+# Header comment
+project:
+  name: Demo
+  version: 0.1.0
+tasks:
+  - id: 1
+    title: yes
+    status: pending
+    priority: high
+    dependencies: [010]
+  - id: two
+    title: Bad
+    status: todo
+    priority: high
+  - id: 3
+    title: Estimate
+    status: Done
+    priority: low
+    estimate:
+      min: 5
+      likely: 1
+      max: 2
+focus: true
+"""
+
+
+def test_streamed_plan_matches_full_load(tmp_path):
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    plan_path.write_text(PLAN.replace("id: two", "id: 2").replace("todo", "pending")
+                         .replace("min: 5", "min: 0.5"), encoding="utf-8")
+
+    streamed = load_plan_streaming(plan_path)
+    full = load_plans([plan_path])[plan_path]
+
+    assert streamed == full
+    assert streamed.tasks[0].title == "yes" and streamed.tasks[0].dependencies == [10]
+    assert streamed.source.digest == full.source.digest
+
+
+def test_issues_name_task_field_and_line(tmp_path):
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    plan_path.write_text(PLAN, encoding="utf-8")
+
+    result = validate_plan_stream(plan_path)
+
+    assert (result.tasks, result.issue_count) == (3, 3)
+    assert [(issue.line, issue.location) for issue in result.issues] == [
+        (11, "tasks[1].id"), (13, "tasks[1].status"), (20, "tasks[2].estimate"),
+    ]
+    assert result.issues[0].format(plan_path).startswith("PROJECT_PLAN.yaml:11: tasks[1].id: ")
+
+    plan_path.write_text(PLAN + "archived: [\n", encoding="utf-8")
+    result = validate_plan_stream(plan_path, max_issues=1)
+    assert result.header is None and len(result.issues) == 1
+    assert result.issues[-1].location == "tasks[1].id" and result.issue_count == 4
+    assert validate_plan_stream(plan_path).issues[-1].location == "yaml"
+
+
+def test_validation_memory_does_not_grow_with_plan_size(tmp_path):
+    peaks = []
+    for count in (100, 2000):
+        path = write_plans(tmp_path / str(count), 1, count, description_chars=200)[0]
+        result, _, peak = traced(lambda: validate_plan_stream(path))
+        assert result.ok and result.tasks == count
+        peaks.append(peak)
+    assert peaks[1] < peaks[0] * 1.5
+
+
+def test_load_plans_streams_large_files(tmp_path, monkeypatch):
+    good = write_plans(tmp_path, 1, 20, description_chars=50)[0]
+    bad = tmp_path / "plans" / "PROJECT_PLAN_bad.yaml"
+    bad.parent.mkdir()
+    bad.write_text(PLAN, encoding="utf-8")
+    expected = load_plans([good])[good]
+
+    monkeypatch.setattr(core, "STREAMING_LOAD_BYTES", 1)
+    loaded = load_plans([good, bad], lazy_descriptions=True)
+
+    assert loaded[good] == expected
+    assert loaded[bad] is None
+    assert bad.read_text(encoding="utf-8") == PLAN  # not auto-repaired
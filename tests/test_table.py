@@ -0,0 +1,88 @@
+# tests/test_table.py
+import random
+from collections import Counter
+
+import pytest
+
+from src.metsuke import table as table_module
+from src.metsuke.models import Project, ProjectMeta, Task
+from src.metsuke.table import TaskTable
+
+
+def _random_project(seed: int, n_tasks: int = 200) -> Project:
+    rng = random.Random(seed)
+    tasks = []
+    for task_id in range(1, n_tasks + 1):
+        # Mostly backward edges, plus the occasional unknown id
+        deps = rng.sample(range(1, task_id), k=min(task_id - 1, rng.randint(0, 3)))
+        if rng.random() < 0.05:
+            deps.append(n_tasks + 100)
+        tasks.append(Task(
+            id=task_id,
+            title=f"Task {task_id}",
+            status=rng.choice(["pending", "in_progress", "Done", "blocked"]),
+            priority=rng.choice(["low", "medium", "high"]),
+            dependencies=deps,
+        ))
+    return Project(project=ProjectMeta(name="Bench", version="0.1.0"), tasks=tasks)
+
+
+def _reference_metrics(tasks):
+    """The original per-task implementation from the TUI."""
+    done_ids = {t.id for t in tasks if t.status == "Done"}
+    dependents_count = Counter()
+    total_deps = no_deps = blocked = 0
+    ready = []
+    for task in tasks:
+        total_deps += len(task.dependencies)
+        if not task.dependencies:
+            no_deps += 1
+        is_blocked = False
+        for dep_id in task.dependencies:
+            dependents_count[dep_id] += 1
+            if dep_id not in done_ids:
+                is_blocked = True
+        if task.status != "Done":
+            if is_blocked:
+                blocked += 1
+            else:
+                ready.append(task)
+    most = dependents_count.most_common(1)
+    order = {"high": 0, "medium": 1, "low": 2}
+    ready.sort(key=lambda t: (order[t.priority], t.id))
+    return {
+        "no_deps": no_deps,
+        "ready_to_work": len(ready),
+        "blocked_by_deps": blocked,
+        "most_depended_id": most[0][0] if most else None,
+        "most_depended_count": most[0][1] if most else 0,
+        "avg_deps": total_deps / len(tasks),
+        "next_task_id": ready[0].id if ready else None,
+    }
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "pure-python"])
+def numpy_mode(request, monkeypatch):
+    if request.param and not table_module._NUMPY_AVAILABLE:
+        pytest.skip("numpy not installed")
+    monkeypatch.setattr(table_module, "_NUMPY_AVAILABLE", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_task_table_matches_reference_metrics(numpy_mode, seed):
+    project = _random_project(seed)
+    table = TaskTable.from_project(project)
+
+    assert table.dependency_metrics() == _reference_metrics(project.tasks)
+    assert table.status_counts() == Counter(t.status for t in project.tasks)
+    assert table.priority_counts() == Counter(t.priority for t in project.tasks)
+
+
+def test_task_table_empty(numpy_mode):
+    table = TaskTable.from_tasks([])
+
+    assert len(table) == 0
+    assert table.dependency_metrics() == {}
+    assert table.status_counts() == Counter()
+    assert table.progress_percent() == 0.0
@@ -0,0 +1,31 @@
+# tests/test_timing.py
+from src.metsuke import timing
+from src.metsuke.core import load_plans, save_plan
+from src.metsuke.models import Project, ProjectMeta, Task
+from src.metsuke.timing import Histogram
+
+
+def test_histogram_percentiles_use_fixed_buckets():
+    hist = Histogram()
+    for _ in range(98):
+        hist.record(0.001)
+    hist.record(0.5)
+    hist.record(2.0)
+    # Upper bucket bounds: within one bucket (about 19%) of the true value
+    assert 0.001 <= hist.percentile(50) < 0.0012
+    assert 0.5 <= hist.percentile(99) < 0.6
+    assert hist.percentile(100) == 2.0
+    assert hist.summary()["count"] == 100
+
+
+def test_load_and_save_record_spans(tmp_path):
+    timing.reset()
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    save_plan(Project(project=ProjectMeta(name="Demo", version="0.1.0"),
+                      tasks=[Task(id=1, title="Setup", status="pending", priority="high")]), plan_path)
+    load_plans([plan_path])
+
+    spans = timing.snapshot()
+    for name in ("save_plan", "plan_read", "yaml_parse", "model_validate"):
+        assert spans[name]["count"] == 1
+    assert spans["save_plan"]["max_ms"] >= spans["save_plan"]["p50_ms"] > 0
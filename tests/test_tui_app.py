@@ -0,0 +1,51 @@
+# tests/test_tui_app.py
+import asyncio
+import logging
+
+from textual.widgets import Log
+
+from src.metsuke.core import save_plan
+from src.metsuke.models import Project, ProjectMeta, Task
+from src.metsuke.tui.app import TaskViewer
+from src.metsuke.tui.handlers import TuiLogHandler, TuiLogPipeline
+
+
+def test_optional_panels_are_mounted_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    plan_path = tmp_path / "PROJECT_PLAN.yaml"
+    save_plan(Project(
+        project=ProjectMeta(name="Demo", version="0.1.0"),
+        tasks=[Task(id=1, title="Setup", status="pending", priority="high")],
+    ), plan_path)
+
+    async def run() -> None:
+        app = TaskViewer([plan_path], snapshot_path=tmp_path / "snapshot.json")
+        async with app.run_test() as pilot:
+            assert not app.query(Log) and not app.query("#plan-selection-table")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            assert set(app.startup_timings) == {"first_frame", "plans_loaded"}
+
+            await pilot.press("ctrl+d")
+            log_widget = app.query_one(Log)
+            assert log_widget.display and log_widget.line_count > 0
+
+            await pilot.press("ctrl+b")
+            assert app.query_one("#plan-selection-table").row_count == 1
+
+    asyncio.run(run())
+
+
+def test_log_pipeline_gates_levels_and_writes_file(tmp_path):
+    handler = TuiLogHandler()
+    pipeline = TuiLogPipeline(handler, level=logging.INFO, log_file=tmp_path / "logs" / "tui.log")
+    logger = logging.getLogger("metsuke.tui.test_pipeline")
+    pipeline.start(logger)
+    logger.debug("cursor moved to %s", 1)
+    logger.info("loaded %d plans", 2)
+    pipeline.stop()
+
+    assert not logger.handlers
+    messages = handler.snapshot()
+    assert len(messages) == 1 and messages[0].endswith("loaded 2 plans\n")
+    assert (tmp_path / "logs" / "tui.log").read_text(encoding="utf-8").endswith("loaded 2 plans\n")
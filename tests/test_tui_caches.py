@@ -0,0 +1,88 @@
+# tests/test_tui_caches.py
+from src.metsuke.models import Project, ProjectMeta, Task
+from src.metsuke.tui.caches import MarkdownCache
+from src.metsuke.tui.view_model import STATS_FIELDS, DashboardStats, PlanViewModel
+
+
+def test_markdown_cache_reuses_tokens_per_task_and_text():
+    cache = MarkdownCache()
+    cache.for_task(1)
+    first = cache.parser_factory().parse("# Title\n\nBody")
+    assert cache.parser_factory().parse("# Title\n\nBody") is first
+    assert cache.parser_factory().parse("# Title\n\nChanged") is not first
+
+    cache.for_task(2)
+    assert cache.parser_factory().parse("# Title\n\nBody") is not first
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_markdown_cache_evicts_least_recently_used():
+    cache = MarkdownCache(max_documents=2, max_chars=20)
+    for task_id in (1, 2, 3):
+        cache.parse(task_id, f"task {task_id}")
+    assert len(cache) == 2
+    cache.parse(3, "x" * 50)
+    assert len(cache) == 1
+    cache.parse(3, "x" * 50)
+    assert cache.hits == 1
+
+
+def test_plan_view_model_is_cached_until_invalidated():
+    project = Project(
+        project=ProjectMeta(name="Demo", version="0.1.0"),
+        tasks=[
+            Task(id=1, title="[b]Setup[/b]", status="Done", priority="high"),
+            Task(id=2, title="Build", status="pending", priority="low", dependencies=[1]),
+        ],
+    )
+    view_model = PlanViewModel.for_project(project)
+    assert PlanViewModel.for_project(project) is view_model
+    assert [key for key, _ in view_model.rows] == ["1", "2"]
+    assert view_model.rows[0][1][1].plain == "[b]Setup[/b]"
+    assert view_model.rows[1][1][3].style == "blue"
+    assert view_model.dependency_metrics["next_task"].id == 2
+
+    project.tasks[1].status = "Done"
+    project.invalidate_cache()
+    assert PlanViewModel.for_project(project).status_counts["Done"] == 2
+
+
+def test_view_model_built_across_an_invalidation_is_not_cached(monkeypatch):
+    project = Project(
+        project=ProjectMeta(name="Demo", version="0.1.0"),
+        tasks=[Task(id=1, title="Build", status="pending", priority="low")],
+    )
+    build = PlanViewModel.__init__
+
+    def edited_while_building(self, plan):
+        build(self, plan)
+        # What the toggle action does while a prefetch worker is building
+        project.tasks[0].status = "Done"
+        project.invalidate_cache()
+
+    monkeypatch.setattr(PlanViewModel, "__init__", edited_while_building)
+    stale = PlanViewModel.for_project(project)
+    monkeypatch.undo()
+
+    assert stale.status_counts["Done"] == 0
+    assert PlanViewModel.for_project(project).status_counts["Done"] == 1
+
+
+def test_dashboard_stats_notify_only_changed_fields():
+    project = Project(
+        project=ProjectMeta(name="Demo", version="0.1.0"),
+        tasks=[Task(id=1, title="Setup", status="pending", priority="high"),
+               Task(id=2, title="Build", status="pending", priority="low", dependencies=[1])],
+    )
+    stats = DashboardStats()
+    notified = []
+    stats.subscribe(notified.append)
+
+    assert stats.publish_view_model(PlanViewModel.for_project(project)) == set(STATS_FIELDS)
+    # A reload with equal content (new Task objects) changes nothing
+    assert stats.publish_view_model(PlanViewModel(project.model_copy(deep=True))) == set()
+
+    project.tasks[1].priority = "high"
+    project.invalidate_cache()
+    assert stats.publish_view_model(PlanViewModel.for_project(project)) == {"priority_counts"}
+    assert notified == [set(STATS_FIELDS), {"priority_counts"}]
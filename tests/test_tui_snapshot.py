@@ -0,0 +1,34 @@
+# tests/test_tui_snapshot.py
+from src.metsuke.models import Project, ProjectMeta, Task
+from src.metsuke.tui import snapshot
+from src.metsuke.tui.snapshot import load_snapshot, save_snapshot
+from src.metsuke.tui.view_model import PlanViewModel
+
+
+def test_snapshot_keeps_rows_around_cursor_and_stats(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_ROWS", 4)
+    project = Project(
+        project=ProjectMeta(name="Demo", version="0.1.0"),
+        tasks=[Task(id=i, title=f"Task {i}", status="Done" if i < 3 else "pending", priority="high",
+                    dependencies=[i - 1] if i > 1 else []) for i in range(1, 11)],
+    )
+    view_model = PlanViewModel.for_project(project)
+    path = tmp_path / ".metsuke" / "tui_snapshot.json"
+
+    save_snapshot(path, tmp_path / "PROJECT_PLAN.yaml", project.project, view_model, cursor_key="6")
+    restored = load_snapshot(path)
+
+    assert restored.plan_path == (tmp_path / "PROJECT_PLAN.yaml").resolve()
+    assert restored.cursor_key == "6" and restored.total_rows == 10
+    assert [key for key, _ in restored.view_model.rows] == ["4", "5", "6", "7"]
+    assert restored.view_model.rows[0][1][3].style == "blue"
+    assert restored.view_model.status_counts == view_model.status_counts
+    assert restored.view_model.dependency_metrics["next_task"].id == 3
+    assert restored.view_model.critical_path == view_model.critical_path
+
+
+def test_unreadable_snapshot_is_ignored(tmp_path):
+    path = tmp_path / "tui_snapshot.json"
+    assert load_snapshot(path) is None
+    path.write_text("{not json", encoding="utf-8")
+    assert load_snapshot(path) is None